@@ -0,0 +1,98 @@
+"""
+Microbenchmark for decoding large Data API payloads.
+
+Compares, on synthetic trade-history and heatmap payloads:
+  per-row   json.loads + Model(**row) per row (the original tool code path)
+  bytes     compiled TypeAdapter.validate_json over the raw body
+  decoded   compiled TypeAdapter.validate_python over json.loads output (cached responses)
+  trusted   json.loads, rows passed through without models (RANGER_TRUSTED_UPSTREAM=true)
+  dump      serializing the validated result as the MCP tool layer does
+
+Usage:
+    python benchmarks/bench_validation.py [--rows 1000 10000 100000 1000000] [--repeat 3]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+os.environ.setdefault("RANGER_API_KEY", "bench")
+os.environ.setdefault("RANGER_SOR_BASE_URL", "http://sor.invalid")
+os.environ.setdefault("RANGER_DATA_BASE_URL", "http://data.invalid")
+
+import pydantic_core  # noqa: E402
+
+from ranger_mcp.bulk import validate_list, validate_model  # noqa: E402
+from ranger_mcp.models import GetTradeHistoryResponse, LiquidationHeatmapEntry  # noqa: E402
+
+
+def json_array(items) -> bytes:
+    # Encoded row by row, so 1M-row payloads never exist as one list of dicts
+    return b"[" + b",".join(json.dumps(item).encode() for item in items) + b"]"
+
+
+def trades_body(rows: int) -> bytes:
+    trades = ({
+        "id": f"t{i}", "symbol": "SOL-PERP", "side": "Long" if i % 2 else "Short",
+        "quantity": 1.0 + i % 7, "entry_price": 150.0 + i % 13, "fill_price": 151.0,
+        "position_leverage": 2.0, "realized_pnl": (i % 11) - 5.0, "fees_paid": 0.1,
+        "order_type": "market", "order_action": "open", "is_closed": bool(i % 3),
+        "created_at": "2025-01-01T00:00:00Z", "opened_at": "2025-01-01T00:00:00Z",
+        "platform": "DRIFT", "tx_signature": f"sig{i}",
+    } for i in range(rows))
+    return b'{"trades":' + json_array(trades) + b"}"
+
+
+def heatmap_body(rows: int) -> bytes:
+    entries = ({
+        "symbol": f"SYM{i % 50}-PERP", "platform": ("DRIFT", "FLASH", "JUPITER")[i % 3],
+        "start": f"2025-01-{1 + i % 28:02d}T00:00:00Z", "total_liquidated_usd": float(i % 1000),
+    } for i in range(rows))
+    return json_array(entries)
+
+
+def best_of(fn, arg, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def bench(name: str, body: bytes, model, per_row, validate, repeat: int) -> None:
+    # (setup, timed step) per case. Inputs are built untimed, one case at a
+    # time, so only one decoded copy of a large payload is alive at once
+    cases = {
+        "per-row": (lambda: body, lambda raw: per_row(json.loads(raw))),
+        "bytes": (lambda: body, lambda raw: validate(model, raw, trusted=False)),
+        "decoded": (lambda: json.loads(body), lambda data: validate(model, data, trusted=False)),
+        "trusted": (lambda: body, lambda raw: validate(model, raw, trusted=True)),
+        "dump": (lambda: validate(model, body, trusted=False),
+                 lambda result: json.dumps(pydantic_core.to_jsonable_python(result))),
+    }
+    baseline = None
+    for case, (setup, fn) in cases.items():
+        seconds = best_of(fn, setup(), repeat)
+        baseline = baseline or seconds
+        print(f"{name:<14} {case:<8} {seconds * 1000:10.1f} ms  {baseline / seconds:5.2f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'payload':<14} {'path':<8} {'best':>13}  vs per-row")
+    for rows in args.rows:
+        bench(f"trades/{rows}", trades_body(rows), GetTradeHistoryResponse,
+              lambda data: GetTradeHistoryResponse(**data), validate_model, args.repeat)
+        bench(f"heatmap/{rows}", heatmap_body(rows), LiquidationHeatmapEntry,
+              lambda data: [LiquidationHeatmapEntry(**item) for item in data], validate_list, args.repeat)
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
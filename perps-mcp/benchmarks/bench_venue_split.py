@@ -0,0 +1,62 @@
+"""
+Microbenchmark for VenueSplitModel.estimate.
+
+Fits two venues from six observed quotes (as tests/test_venue_split.py
+does) and times estimates for growing numbers of target sizes. The split
+should stay well under a millisecond per size.
+
+Usage:
+    python benchmarks/bench_venue_split.py [--sizes 1 10 100 1000] [--repeat 5]
+"""
+import argparse
+import os
+import time
+
+os.environ.setdefault("RANGER_API_KEY", "bench")
+os.environ.setdefault("RANGER_SOR_BASE_URL", "http://sor.invalid")
+os.environ.setdefault("RANGER_DATA_BASE_URL", "http://data.invalid")
+
+from ranger_mcp.models import QuoteParams, QuoteResponse  # noqa: E402
+from ranger_mcp.venue_split import VenueSplitModel  # noqa: E402
+
+PARAMS = QuoteParams(
+    fee_payer="payer", symbol="SOL", side="Long", size=1.0, collateral=50.0,
+    size_denomination="SOL", adjustment_type="Increase")
+
+
+def quote(venue_name: str, size: float, unit_price: float, liquidity: float) -> QuoteResponse:
+    return QuoteResponse(
+        venues=[{
+            "venue_name": venue_name, "collateral": 10.0, "size": size,
+            "quote": {"base": unit_price, "total": unit_price, "fee_breakdown": {}},
+            "order_available_liquidity": liquidity, "venue_available_liquidity": 10 * liquidity,
+        }],
+        total_collateral=10.0, total_size=size, average_price=unit_price)
+
+
+def model() -> VenueSplitModel:
+    split = VenueSplitModel()
+    for size in (1.0, 5.0, 20.0):
+        split.observe(PARAMS, quote("Jupiter", size, 100 + size, 0.5))
+        split.observe(PARAMS, quote("Drift", size, 100.5 + 0.2 * size, 1000.0))
+    return split
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    split = model()
+    for count in args.sizes:
+        sizes = [0.5 + i for i in range(count)]
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            split.estimate("SOL", "Long", sizes)
+            best = min(best, time.perf_counter() - start)
+        print(f"{count:>6} sizes  {best * 1e3:8.3f} ms  {best * 1e6 / count:8.1f} us/size")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+End-to-end load benchmark for the ranger_mcp hub.
+
+Starts the local mock Ranger API (ranger_mcp.mock_api), drives the hub over
+each transport with concurrent tool calls, and reports throughput and
+p50/p95/p99 latency per tool. Results are written as JSON so runs can be
+diffed between versions:
+
+    python benchmarks/load.py --output benchmarks/baselines/local.json
+    python benchmarks/load.py --compare benchmarks/baselines/local.json
+
+Transports:
+  memory  in-process client (hub overhead without any MCP transport)
+  stdio   hub in a subprocess over stdin/stdout
+  sse     hub in a subprocess over HTTP/SSE (python -m ranger_mcp)
+
+With --workers N the SSE hub runs N processes on one port, and --sessions K
+spreads the calls over K client sessions so they can land on different
+workers. Every tool also reports how many upstream requests it caused:
+
+    python benchmarks/load.py --transports sse --workers 4 --sessions 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from pathlib import Path
+from typing import Any, AsyncIterator
+
+FEE_PAYER = "11111111111111111111111111111111"
+QUOTE = {
+    "fee_payer": FEE_PAYER, "symbol": "SOL", "side": "Long", "size": 1.0, "collateral": 10.0,
+    "size_denomination": "SOL", "collateral_denomination": "USDC", "adjustment_type": "Increase",
+}
+
+# One representative call per tool. Tools are benchmarked in this order, so
+# the venue-split estimate runs after quotes have been observed.
+WORKLOAD: dict[str, dict[str, Any]] = {
+    "ranger_status": {},
+    "sor_get_trade_quote": {"params": QUOTE},
+    "sor_get_quote_curve": {"params": QUOTE, "sizes": [0.5, 1, 2, 4], "venue_sets": [["Jupiter"], ["Drift"]]},
+    "sor_estimate_venue_split": {"symbol": "SOL", "side": "Long", "sizes": [0.5, 1, 2]},
+    "sor_increase_position": {"params": QUOTE},
+    "sor_decrease_position": {"params": {**QUOTE, "adjustment_type": "DecreaseDrift"}},
+    "sor_close_position": {"params": {
+        "fee_payer": FEE_PAYER, "symbol": "SOL", "side": "Long", "adjustment_type": "CloseAll"}},
+    "sor_quote_and_build": {"params": QUOTE},
+    "sor_build_batch": {"legs": [
+        {**QUOTE, "fee_payer": f"{FEE_PAYER[:-1]}{i}", "size": 1.0 + i} for i in range(8)]},
+    "sor_withdraw_balance_drift": {"params": {"fee_payer": FEE_PAYER, "symbol": "USDC", "amount": 10}},
+    "data_get_positions": {"public_key": FEE_PAYER},
+    "data_get_positions_batch": {"public_keys": [f"{FEE_PAYER}{i}" for i in range(8)]},
+    "data_get_trade_history": {"public_key": FEE_PAYER},
+    "data_get_trade_history_page": {"public_key": FEE_PAYER, "window_hours": 24, "windows_per_page": 4},
+    "data_query_trade_history": {"public_key": FEE_PAYER, "symbols": ["SOL-PERP"], "limit": 100},
+    "data_get_latest_liquidations": {},
+    "data_get_liquidation_feed": {"limit": 100},
+    "data_get_liquidation_totals": {},
+    "data_get_liquidation_capitulation_signals": {},
+    "data_get_liquidation_heatmap": {},
+    "data_get_largest_liquidations": {},
+    "data_get_funding_rate_arbs": {},
+    "data_get_accumulated_funding_rates": {"symbol": "SOL-PERP"},
+    "data_get_accumulated_borrow_rates": {"symbol": "SOL-PERP"},
+    "data_get_extreme_funding_rates": {},
+    "data_get_oi_weighted_funding_rates": {},
+    "data_get_funding_rate_trend": {"symbol": "SOL-PERP"},
+    "data_scan_capitulation_signals": {"thresholds": [1.5, 2.0], "windows": [12, 24]},
+    "data_scan_funding_rate_trends": {"thresholds": [1.0], "windows": [24]},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def wait_for_port(port: int, timeout: float = 20.0) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Port {port} did not open within {timeout}s")
+            await asyncio.sleep(0.1)
+
+
+def stop(process: subprocess.Popen) -> None:
+    # uvicorn waits for open SSE streams on SIGTERM, so don't wait forever. A
+    # --workers supervisor needs its own 5 s grace to stop its workers first
+    process.terminate()
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+@asynccontextmanager
+async def mock_api(args) -> AsyncIterator[str]:
+    port = free_port()
+    process = subprocess.Popen([
+        sys.executable, "-m", "ranger_mcp.mock_api", "--port", str(port),
+        "--latency-ms", str(args.latency_ms), "--jitter-ms", str(args.jitter_ms),
+        "--rows", str(args.rows), "--error-rate", str(args.error_rate), "--rate-limit", str(args.rate_limit)])
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        await wait_for_port(port)
+        yield base_url
+    finally:
+        stop(process)
+
+
+def hub_env(args, base_url: str) -> dict[str, str]:
+    return {
+        **os.environ,
+        "RANGER_API_KEY": "sk_mock",
+        "RANGER_SOR_BASE_URL": base_url,
+        "RANGER_DATA_BASE_URL": base_url,
+        "RANGER_CACHE_ENABLED": "false" if args.no_cache else "true",
+        "RANGER_STORE_DIR": tempfile.mkdtemp(prefix="ranger-mcp-load-"),
+    }
+
+
+@asynccontextmanager
+async def connect(transport: str, env: dict[str, str], workers: int = 1, sessions: int = 1) -> AsyncIterator[list[Any]]:
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    if transport == "memory":
+        # Settings are read at import time, so configure before importing the hub
+        os.environ.update(env)
+        from ranger_mcp.hub import ranger_mcp
+        async with AsyncExitStack() as stack:
+            yield [await stack.enter_async_context(Client(ranger_mcp)) for _ in range(sessions)]
+    elif transport == "stdio":
+        command = "from ranger_mcp.hub import ranger_mcp; ranger_mcp.run('stdio')"
+        async with Client(StdioTransport(sys.executable, ["-c", command], env=env)) as client:
+            yield [client]
+    elif transport == "sse":
+        port = free_port()
+        process = subprocess.Popen(
+            [sys.executable, "-m", "ranger_mcp", "--workers", str(workers)],
+            env={**env, "FASTMCP_SERVER_PORT": str(port), "FASTMCP_SERVER_LOG_LEVEL": "WARNING"})
+        try:
+            await wait_for_port(port)
+            async with AsyncExitStack() as stack:
+                yield [await stack.enter_async_context(Client(f"http://127.0.0.1:{port}/sse"))
+                       for _ in range(sessions)]
+        finally:
+            stop(process)
+    else:
+        raise ValueError(f"Unknown transport: {transport}")
+
+
+def summarize(latencies: list[float], errors: int, wall: float) -> dict[str, float]:
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else float("nan")
+    return {
+        "requests": len(latencies) + errors,
+        "errors": errors,
+        "throughput_rps": round((len(latencies) + errors) / wall, 2) if wall else 0.0,
+        "p50_ms": round(p50 * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else float("nan"),
+    }
+
+
+async def upstream_requests(base_url: str) -> int:
+    import httpx
+    async with httpx.AsyncClient() as client:
+        return (await client.get(f"{base_url}/_mock/stats")).json()["total"]
+
+
+async def run_tool(clients: list, tool: str, arguments: dict[str, Any], requests: int, concurrency: int) -> dict[str, float]:
+    latencies: list[float] = []
+    errors = 0
+    remaining = requests
+
+    async def worker(client):
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            started = time.perf_counter()
+            try:
+                await client.call_tool(tool, arguments)
+                latencies.append(time.perf_counter() - started)
+            except Exception:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(clients[i % len(clients)]) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - started)
+
+
+async def run(args) -> dict[str, Any]:
+    tools = args.tools or list(WORKLOAD)
+    results: dict[str, Any] = {}
+    async with mock_api(args) as base_url:
+        env = hub_env(args, base_url)
+        for transport in args.transports:
+            results[transport] = {}
+            async with connect(transport, env, args.workers, args.sessions) as clients:
+                for tool in tools:
+                    # One warm-up call fills connection pools and caches
+                    await run_tool(clients, tool, WORKLOAD[tool], 1, 1)
+                    before = await upstream_requests(base_url)
+                    stats = await run_tool(clients, tool, WORKLOAD[tool], args.requests, args.concurrency)
+                    stats["upstream_requests"] = await upstream_requests(base_url) - before
+                    results[transport][tool] = stats
+                    print(f"{transport:<7} {tool:<42} {stats['throughput_rps']:>9.1f} rps  "
+                          f"p50 {stats['p50_ms']:>8.2f}  p95 {stats['p95_ms']:>8.2f}  "
+                          f"p99 {stats['p99_ms']:>8.2f} ms  errors {stats['errors']}  "
+                          f"upstream {stats['upstream_requests']}", flush=True)
+    return results
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Prints the relative change of each metric against a baseline run."""
+    print(f"\n{'transport':<9} {'tool':<42} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}   (change vs baseline)")
+    for transport, tools in current["results"].items():
+        for tool, stats in tools.items():
+            before = baseline.get("results", {}).get(transport, {}).get(tool)
+            if not before:
+                continue
+            deltas = []
+            for metric in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms"):
+                old, new = before[metric], stats[metric]
+                deltas.append(f"{(new - old) / old * 100:+7.1f}%" if old else "     n/a")
+            print(f"{transport:<9} {tool:<42} {' '.join(deltas)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transports", nargs="+", default=["memory", "stdio", "sse"],
+                        choices=["memory", "stdio", "sse"])
+    parser.add_argument("--tools", nargs="+", choices=list(WORKLOAD), help="Subset of tools to benchmark")
+    parser.add_argument("--requests", type=int, default=200, help="Calls per tool")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent calls per tool")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Mock upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=50, help="Rows per mock list payload")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Mock upstream requests/second before 429")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the hub response cache")
+    parser.add_argument("--workers", type=int, default=1, help="SSE hub worker processes")
+    parser.add_argument("--sessions", type=int, default=1, help="Client sessions the calls are spread over")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to diff against")
+    args = parser.parse_args()
+
+    from importlib.metadata import version
+    results = asyncio.run(run(args))
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fastmcp": version("fastmcp"),
+            "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        },
+        "results": results,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2, default=str) + "\n")
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+Cold-start benchmark for the ranger_mcp hub.
+
+Measures, over several fresh interpreters:
+  import      wall time of `python -c "import ranger_mcp.hub"`, plus the
+              `-X importtime` breakdown (total, and time spent in ranger_mcp's
+              own modules)
+  stdio       time from spawning the hub over stdio to a completed
+              `initialize`, and to the first `tools/list` response
+
+Results are written as JSON so runs can be diffed between versions:
+
+    python benchmarks/startup.py --output benchmarks/baselines/startup.json
+    python benchmarks/startup.py --compare benchmarks/baselines/startup.json
+
+The run exits with status 1 when a result is over its BUDGETS entry.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+# Upper bounds in milliseconds. own_modules_ms is generous next to the ~20 ms
+# measured, but well under the ~180 ms of importing the sub-servers, models
+# and numpy eagerly
+BUDGETS = {"own_modules_ms": 100.0}
+
+IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def hub_env() -> dict[str, str]:
+    return {
+        **os.environ,
+        "RANGER_API_KEY": "sk_startup",
+        "RANGER_SOR_BASE_URL": "http://127.0.0.1:9",
+        "RANGER_DATA_BASE_URL": "http://127.0.0.1:9",
+        "RANGER_STORE_DIR": tempfile.mkdtemp(prefix="ranger-mcp-startup-"),
+    }
+
+
+def parse_importtime(stderr: str) -> dict[str, tuple[int, int]]:
+    """Maps module name to (self, cumulative) microseconds from `-X importtime` output."""
+    modules = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            modules[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return modules
+
+
+def measure_import(env: dict[str, str]) -> dict[str, Any]:
+    started = time.perf_counter()
+    subprocess.run([sys.executable, "-c", "import ranger_mcp.hub"], env=env, check=True)
+    wall = time.perf_counter() - started
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import ranger_mcp.hub"],
+        env=env, check=True, capture_output=True, text=True)
+    modules = parse_importtime(result.stderr)
+    own = {name: times[0] for name, times in modules.items() if name.split(".")[0] == "ranger_mcp"}
+    return {
+        "wall_ms": wall * 1000,
+        "importtime_ms": modules["ranger_mcp.hub"][1] / 1000,
+        "own_modules_ms": sum(own.values()) / 1000,
+        "modules": sorted(own),
+    }
+
+
+async def measure_stdio(env: dict[str, str]) -> dict[str, float]:
+    from fastmcp import Client
+    from fastmcp.client.transports import StdioTransport
+
+    command = "from ranger_mcp.hub import ranger_mcp; ranger_mcp.run('stdio')"
+    started = time.perf_counter()
+    async with Client(StdioTransport(sys.executable, ["-c", command], env=env)) as client:
+        initialized = time.perf_counter()
+        tools = await client.list_tools()
+        listed = time.perf_counter()
+    return {
+        "initialize_ms": (initialized - started) * 1000,
+        "first_tools_list_ms": (listed - started) * 1000,
+        "tools": len(tools),
+    }
+
+
+def median(runs: list[dict[str, Any]], key: str) -> float:
+    return round(statistics.median(run[key] for run in runs), 2)
+
+
+def run(args) -> dict[str, Any]:
+    env = hub_env()
+    imports = [measure_import(env) for _ in range(args.runs)]
+    stdio = [asyncio.run(measure_stdio(env)) for _ in range(args.runs)]
+    results = {
+        "import_wall_ms": median(imports, "wall_ms"),
+        "importtime_ms": median(imports, "importtime_ms"),
+        "own_modules_ms": median(imports, "own_modules_ms"),
+        "initialize_ms": median(stdio, "initialize_ms"),
+        "first_tools_list_ms": median(stdio, "first_tools_list_ms"),
+    }
+    for name, value in results.items():
+        print(f"{name:<22} {value:>9.1f}")
+    print(f"{'tools':<22} {stdio[0]['tools']:>9}")
+    print(f"modules imported with the hub: {', '.join(imports[0]['modules'])}")
+    return {**results, "tools": stdio[0]["tools"], "modules": imports[0]["modules"]}
+
+
+def compare(current: dict[str, Any], baseline: dict[str, Any]) -> None:
+    """Prints the relative change of each timing against a baseline run."""
+    print("\n(change vs baseline)")
+    for name, value in current["results"].items():
+        old = baseline.get("results", {}).get(name)
+        if isinstance(value, float) and isinstance(old, (int, float)) and old:
+            print(f"{name:<22} {(value - old) / old * 100:+7.1f}%")
+
+
+def over_budget(results: dict[str, Any]) -> list[str]:
+    """Results above their BUDGETS entry, printed and returned."""
+    over = [name for name, budget in BUDGETS.items() if results[name] > budget]
+    for name in over:
+        print(f"{name} is over budget: {results[name]:.1f} ms > {BUDGETS[name]:.0f} ms")
+    return over
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per measurement (median is reported)")
+    parser.add_argument("--output", type=Path, help="Write results as JSON")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to diff against")
+    args = parser.parse_args()
+
+    from importlib.metadata import version
+    report = {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "fastmcp": version("fastmcp"),
+            "config": {"runs": args.runs},
+        },
+        "results": run(args),
+        "budgets": BUDGETS,
+    }
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(report, indent=2) + "\n")
+    if args.compare:
+        compare(report, json.loads(args.compare.read_text()))
+    if over_budget(report["results"]):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 from ranger_mcp.hub import ranger_mcp
+import argparse
 import sys
 from pathlib import Path
 
@@ -12,6 +13,17 @@ if str(src_path) not in sys.path:
 
 
 def main():
+    parser = argparse.ArgumentParser(prog="python -m ranger_mcp", description="Run the Ranger MCP hub over SSE")
+    parser.add_argument("--workers", type=int, help="Worker processes sharing the port (default: RANGER_WORKERS or 1)")
+    args = parser.parse_args()
+
+    from ranger_mcp.settings import settings
+    workers = args.workers or settings.workers
+    if workers > 1:
+        from ranger_mcp.workers import run_workers
+        run_workers(workers, ranger_mcp.settings.host, ranger_mcp.settings.port, ranger_mcp.settings.log_level.lower())
+        return
+
     # Run the main hub server
     # This will use stdio by default, compatible with Claude Desktop
     ranger_mcp.run(transport="sse")
@@ -0,0 +1,164 @@
+from typing import Any, Callable, Hashable, Iterable
+
+import numpy as np
+
+from ranger_mcp.models import CapitulationScan, CapitulationSignal, FundingRateTrend, FundingTrendScan
+
+
+def _series_key(row: dict[str, Any]) -> Hashable:
+    return row["symbol"], row["platform"]
+
+
+def pivot_timeline(
+    rows: Iterable[dict[str, Any]],
+    time_field: str,
+    value_field: str,
+    fill: float = np.nan,
+    key: Callable[[dict[str, Any]], Hashable] = _series_key,
+) -> tuple[list[Hashable], list[str], np.ndarray]:
+    """
+    Pivots API rows into a series x time matrix in one pass. Returns the
+    series keys (``key(row)``, by default (symbol, platform)), the timestamps
+    in time order and a float64 matrix with one column per timestamp;
+    buckets a series has no row for are set to ``fill``.
+    """
+    keys: dict[Hashable, int] = {}
+    times: dict[str, int] = {}
+    series_idx, time_idx, values = [], [], []
+    for row in rows:
+        series_idx.append(keys.setdefault(key(row), len(keys)))
+        time_idx.append(times.setdefault(row[time_field], len(times)))
+        values.append(float(row[value_field]))
+    matrix = np.full((len(keys), len(times)), fill, dtype=np.float64)
+    labels = np.array(list(times), dtype=object)
+    if values:
+        # Timestamps are ISO-8601 strings, so lexical order is time order
+        order = np.argsort(labels, kind="stable")
+        column = np.empty(len(times), dtype=np.intp)
+        column[order] = np.arange(len(times))
+        matrix[np.array(series_idx), column[np.array(time_idx)]] = values
+        labels = labels[order]
+    return list(keys), list(labels), matrix
+
+
+def pivot_series(
+    rows: Iterable[dict[str, Any]],
+    time_field: str,
+    value_field: str,
+    fill: float = np.nan,
+) -> tuple[list[tuple[str, str]], np.ndarray]:
+    """
+    Pivots API rows into a (symbol, platform) x time matrix in one pass.
+    Returns the series keys and a float64 matrix with columns in time order;
+    buckets a series has no row for are set to ``fill``.
+    """
+    keys, _, matrix = pivot_timeline(rows, time_field, value_field, fill)
+    return keys, matrix
+
+
+def rolling_stats(matrix: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Mean, population std and Z-score of every point against the ``window``
+    points before it, for all series at once. NaNs are skipped. Points with
+    no prior data get a NaN mean; a zero std gives a zero Z-score.
+    """
+    valid = ~np.isnan(matrix)
+    values = np.where(valid, matrix, 0.0)
+    pad = np.zeros((matrix.shape[0], 1))
+    s1 = np.concatenate([pad, np.cumsum(values, axis=1)], axis=1)
+    s2 = np.concatenate([pad, np.cumsum(values * values, axis=1)], axis=1)
+    sn = np.concatenate([pad, np.cumsum(valid, axis=1, dtype=np.float64)], axis=1)
+
+    end = np.arange(matrix.shape[1])  # baseline is [end - window, end)
+    start = np.maximum(end - window, 0)
+    n = sn[:, end] - sn[:, start]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = (s1[:, end] - s1[:, start]) / n
+        var = (s2[:, end] - s2[:, start]) / n - mean * mean
+        # Cancellation in the running sums leaves tiny residues where the true variance is 0
+        var = np.where(var > 1e-12 * mean * mean, var, 0.0)
+        std = np.sqrt(var)
+        z = (matrix - mean) / std
+    z = np.where(np.isfinite(z), z, 0.0)
+    return mean, std, z
+
+
+def _latest_column(matrix: np.ndarray) -> np.ndarray:
+    """Index of each series' most recent non-NaN point."""
+    valid = ~np.isnan(matrix)
+    return matrix.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+
+
+def scan_capitulation(
+    heatmap: list[dict[str, Any]],
+    windows: list[int],
+    thresholds: list[float],
+) -> list[CapitulationScan]:
+    """
+    Capitulation signals from liquidation heatmap rows: the latest bucket's
+    liquidated USD vs. the previous ``window`` buckets, for every
+    symbol x platform pair and every window/threshold combination.
+    """
+    keys, matrix = pivot_series(heatmap, "start", "total_liquidated_usd", fill=0.0)
+    scans = []
+    for window in windows:
+        if matrix.shape[1] == 0:
+            scans.extend(CapitulationScan(window=window, threshold=t, signals=[]) for t in thresholds)
+            continue
+        mean, std, z = rolling_stats(matrix, window)
+        latest = matrix[:, -1]
+        mean, std, z = mean[:, -1], std[:, -1], z[:, -1]
+        for threshold in thresholds:
+            hits = np.flatnonzero(z >= threshold)
+            hits = hits[np.argsort(-z[hits], kind="stable")]
+            scans.append(CapitulationScan(window=window, threshold=threshold, signals=[
+                CapitulationSignal(
+                    symbol=keys[i][0],
+                    platform=keys[i][1],
+                    z_score=float(z[i]),
+                    total_liquidated=float(latest[i]),
+                    mean_liquidation=float(mean[i]),
+                    std_dev=float(std[i]),
+                )
+                for i in hits
+            ]))
+    return scans
+
+
+def scan_funding_trends(
+    rates: list[dict[str, Any]],
+    windows: list[int],
+    thresholds: list[float],
+) -> list[FundingTrendScan]:
+    """
+    Funding rate trends from accumulated rate rows: each series' latest rate
+    vs. its previous ``window`` points. The trend is upward/downward when the
+    Z-score is beyond +/- threshold, flat otherwise.
+    """
+    keys, matrix = pivot_series(rates, "created_at", "accumulated_rate")
+    rows = np.arange(len(keys))
+    scans = []
+    for window in windows:
+        if matrix.shape[1] == 0:
+            scans.extend(FundingTrendScan(window=window, threshold=t, trends=[]) for t in thresholds)
+            continue
+        mean, std, z = rolling_stats(matrix, window)
+        latest_col = _latest_column(matrix)
+        latest = matrix[rows, latest_col]
+        mean, std, z = mean[rows, latest_col], std[rows, latest_col], z[rows, latest_col]
+        mean, std = np.nan_to_num(mean), np.nan_to_num(std)
+        for threshold in thresholds:
+            labels = np.where(z > threshold, "upward", np.where(z < -threshold, "downward", "flat"))
+            scans.append(FundingTrendScan(window=window, threshold=threshold, trends=[
+                FundingRateTrend(
+                    symbol=keys[i][0],
+                    platform=keys[i][1],
+                    mean=float(mean[i]),
+                    std_dev=float(std[i]),
+                    z_score=float(z[i]),
+                    trend=str(labels[i]),
+                    latest=float(latest[i]),
+                )
+                for i in rows
+            ]))
+    return scans
@@ -0,0 +1,269 @@
+"""
+Vectorized backtests of Z-score signal rules over recorded data.
+
+The rule is the one in the mean reversion example: enter when a series'
+latest point is ``threshold`` standard deviations from its previous
+``window`` points, and hold for ``hold`` bars (extended by repeat signals).
+Signals come from recorded liquidation heatmap or funding rate rows; each
+signal series trades its symbol at the recorded quote price at or before the
+time its signal is known. A heatmap bucket's total is only known once the
+bucket ends, so heatmap signals trade at the end of their bucket. Every
+window/threshold/hold combination is evaluated over the whole history at
+once, and windows are spread over worker processes:
+
+    python -m ranger_mcp.backtest heatmap.jsonl quotes.jsonl \\
+        --windows 12 24 48 --thresholds 1.5 2 2.5 3 -2 --holds 1 4 12 --fee-bps 5
+
+Recordings are JSON arrays or JSON lines of Data API rows; quote rows need a
+symbol, a timestamp and a price (``created_at`` and ``average_price`` by default).
+Quote symbols must equal the signal rows' symbols (e.g. ``SOL-PERP``), or be
+mapped with ``--quote-symbol SOL-PERP=SOL``; a series without quotes never trades.
+"""
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Iterable, Literal, Sequence
+
+import numpy as np
+
+from ranger_mcp.analytics import pivot_timeline, rolling_stats
+from ranger_mcp.models import BacktestResult
+
+# Recorded signal kinds: (time field, value field) of their rows. Heatmap rows
+# are stamped with their bucket's start but known only at its end
+SIGNALS = {
+    "heatmap": ("start", "total_liquidated_usd"),
+    "funding": ("created_at", "accumulated_rate"),
+}
+
+# Per-result columns produced by the workers, in BacktestResult field order
+_COLUMNS = ("window", "threshold", "hold", "pnl", "trades", "hit_rate", "turnover", "exposure")
+
+
+def _epoch(value: str) -> float:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def load_rows(path: Path) -> list[dict[str, Any]]:
+    """Rows of a recording: a JSON array, or one JSON object per line."""
+    text = Path(path).read_text()
+    if text.lstrip().startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def align_prices(
+    symbols: Sequence[str],
+    times: Sequence[str],
+    quotes: Iterable[dict[str, Any]],
+    time_field: str = "created_at",
+    price_field: str = "average_price",
+    delay: float = 0.0,
+) -> np.ndarray:
+    """
+    The last recorded price of each symbol at or before ``delay`` seconds
+    after each of ``times``, as a len(symbols) x len(times) matrix. NaN
+    before a symbol's first quote, and throughout for a symbol that no quote
+    row's ``symbol`` equals exactly.
+    """
+    price_keys, price_times, prices = pivot_timeline(quotes, time_field, price_field, key=lambda row: row["symbol"])
+    aligned = np.full((len(symbols), len(times)), np.nan)
+    if not price_times or not times:
+        return aligned
+    # Forward-fill each price series, then look up the latest column at or before each time
+    columns = np.arange(prices.shape[1])
+    latest = np.maximum.accumulate(np.where(np.isnan(prices), 0, columns), axis=1)
+    filled = np.take_along_axis(prices, latest, axis=1)
+    at = np.searchsorted(
+        np.array([_epoch(t) for t in price_times]), [_epoch(t) + delay for t in times], side="right") - 1
+    index = {key: i for i, key in enumerate(price_keys)}
+    for row, symbol in enumerate(symbols):
+        if symbol in index:
+            aligned[row, at >= 0] = filled[index[symbol], at[at >= 0]]
+    return aligned
+
+
+def bucket_seconds(times: Sequence[str]) -> float:
+    """The bucket length of a regular timeline: the smallest gap between its times (0 for one time)."""
+    epochs = np.array([_epoch(t) for t in times])
+    gaps = np.diff(np.sort(epochs))
+    gaps = gaps[gaps > 0]
+    return float(gaps.min()) if len(gaps) else 0.0
+
+
+def _evaluate(
+    signal: np.ndarray,
+    prices: np.ndarray,
+    window: int,
+    thresholds: Sequence[float],
+    holds: Sequence[int],
+    direction: int,
+    fee: float,
+) -> np.ndarray:
+    """One row of _COLUMNS per threshold x hold, for a single Z-score window."""
+    series, bars = signal.shape
+    tradable = np.isfinite(prices)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.log(prices[:, 1:] / prices[:, :-1])
+    # Log return of a position held over bar t (from t to t + 1), cumulated with a leading 0
+    step = np.zeros((series, bars))
+    step[:, :-1] = np.where(np.isfinite(returns), returns, 0.0)
+    cumulative = np.zeros((series, bars + 1))
+    np.cumsum(step, axis=1, out=cumulative[:, 1:])
+    _, _, z = rolling_stats(signal, window)
+
+    results = np.zeros((len(thresholds) * len(holds), len(_COLUMNS)))
+    out = 0
+    for threshold in thresholds:
+        entries = (z >= threshold if threshold >= 0 else z <= threshold) & tradable
+        # Signals in the last ``hold`` bars keep a position open: a windowed count of entries
+        counts = np.zeros((series, bars + 1), dtype=np.int64)
+        np.cumsum(entries, axis=1, out=counts[:, 1:])
+        for hold in holds:
+            active = np.zeros((series, bars + 2), dtype=np.int8)
+            head = min(hold, bars)
+            active[:, 1:head + 1] = counts[:, 1:head + 1] > 0
+            if hold < bars:
+                active[:, hold + 1:-1] = counts[:, hold + 1:] > counts[:, 1:bars + 1 - hold]
+            # Trades are runs of active bars. edges has the same (series, bars + 1)
+            # layout as cumulative, so flat run boundaries index it directly
+            edges = np.diff(active, axis=1)
+            starts, ends = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+            trade_pnl = direction * np.expm1(cumulative.flat[ends] - cumulative.flat[starts]) - 2 * fee
+            trades = len(trade_pnl)
+            results[out] = (
+                window, threshold, hold, trade_pnl.sum(), trades,
+                np.count_nonzero(trade_pnl > 0) / trades if trades else 0.0,
+                2 * trades / (series * bars) if bars else 0.0,
+                (ends - starts).sum() / (series * bars) if bars else 0.0,
+            )
+            out += 1
+    return results
+
+
+# Set once per worker process by _init_worker, so the matrices are not sent with every task
+_shared: dict[str, Any] = {}
+
+
+def _init_worker(signal: np.ndarray, prices: np.ndarray, direction: int, fee: float) -> None:
+    _shared.update(signal=signal, prices=prices, direction=direction, fee=fee)
+
+
+def _run_task(task: tuple[int, Sequence[float], Sequence[int]]) -> np.ndarray:
+    window, thresholds, holds = task
+    return _evaluate(_shared["signal"], _shared["prices"], window, thresholds, holds,
+                     _shared["direction"], _shared["fee"])
+
+
+def backtest_zscore(
+    signal: np.ndarray,
+    prices: np.ndarray,
+    windows: Sequence[int],
+    thresholds: Sequence[float],
+    holds: Sequence[int],
+    side: Literal["long", "short"] = "long",
+    fee_bps: float = 0.0,
+    workers: int | None = None,
+) -> list[BacktestResult]:
+    """
+    Evaluates the Z-score rule for every window x threshold x hold over a
+    series x time ``signal`` matrix, trading the aligned ``prices`` matrix.
+    ``fee_bps`` is charged on entry and on exit. Windows run in up to
+    ``workers`` processes (default: one per CPU). Results are ordered by
+    PnL, best first.
+    """
+    if signal.shape != prices.shape:
+        raise ValueError(f"signal {signal.shape} and prices {prices.shape} must have the same shape")
+    if min(windows, default=1) < 1 or min(holds, default=1) < 1:
+        raise ValueError("windows and holds must be at least 1")
+    direction, fee = (1 if side == "long" else -1), fee_bps / 10_000
+    tasks = [(window, list(thresholds), list(holds)) for window in windows]
+    workers = min(workers or os.cpu_count() or 1, len(tasks))
+    if workers > 1:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(signal, prices, direction, fee)) as pool:
+            blocks = list(pool.map(_run_task, tasks))
+    else:
+        blocks = [_evaluate(signal, prices, *task, direction, fee) for task in tasks]
+    table = np.concatenate(blocks) if blocks else np.zeros((0, len(_COLUMNS)))
+    table = table[np.argsort(-table[:, 3], kind="stable")]
+    return [
+        BacktestResult(window=int(w), threshold=float(t), hold=int(h), pnl=float(p), trades=int(n),
+                       hit_rate=float(hr), turnover=float(to), exposure=float(ex))
+        for w, t, h, p, n, hr, to, ex in table
+    ]
+
+
+def backtest_recording(
+    signal_rows: Iterable[dict[str, Any]],
+    quote_rows: Iterable[dict[str, Any]],
+    kind: Literal["heatmap", "funding"],
+    windows: Sequence[int],
+    thresholds: Sequence[float],
+    holds: Sequence[int],
+    quote_time_field: str = "created_at",
+    quote_price_field: str = "average_price",
+    bucket: float | None = None,
+    quote_symbols: dict[str, str] | None = None,
+    **options: Any,
+) -> list[BacktestResult]:
+    """
+    backtest_zscore over recorded signal rows, with each series trading its
+    symbol's quotes, or those of ``quote_symbols[symbol]`` when mapped. Heatmap
+    signals trade at the end of their bucket, which is ``bucket`` seconds long
+    (by default the smallest gap between bucket starts).
+    """
+    time_field, value_field = SIGNALS[kind]
+    # Heatmap buckets without liquidations are zero; missing funding points are gaps
+    keys, times, signal = pivot_timeline(
+        signal_rows, time_field, value_field, fill=0.0 if kind == "heatmap" else np.nan)
+    delay = 0.0
+    if kind == "heatmap":
+        delay = bucket if bucket is not None else bucket_seconds(times)
+    quote_symbols = quote_symbols or {}
+    prices = align_prices([quote_symbols.get(symbol, symbol) for symbol, _ in keys], times, quote_rows,
+                          quote_time_field, quote_price_field, delay=delay)
+    return backtest_zscore(signal, prices, windows, thresholds, holds, **options)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest Z-score signal rules over recorded data.")
+    parser.add_argument("signals", type=Path, help="Recorded heatmap or funding rate rows (JSON or JSON lines)")
+    parser.add_argument("quotes", type=Path, help="Recorded quote rows with symbol, timestamp and price")
+    parser.add_argument("--kind", choices=sorted(SIGNALS), default="heatmap")
+    parser.add_argument("--windows", type=int, nargs="+", default=[24])
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[2.0])
+    parser.add_argument("--holds", type=int, nargs="+", default=[1])
+    parser.add_argument("--side", choices=["long", "short"], default="long")
+    parser.add_argument("--fee-bps", type=float, default=0.0)
+    parser.add_argument("--quote-time-field", default="created_at")
+    parser.add_argument("--quote-price-field", default="average_price")
+    parser.add_argument("--bucket-seconds", type=float, default=None,
+                        help="Heatmap bucket length (default: the smallest gap between bucket starts)")
+    parser.add_argument("--quote-symbol", nargs="+", default=[], metavar="SIGNAL=QUOTE",
+                        help="Quote symbol of a signal symbol, e.g. SOL-PERP=SOL. Unmapped symbols must match "
+                             "the quote rows exactly; series without quotes never trade")
+    parser.add_argument("--workers", type=int, default=None, help="Processes (default: one per CPU)")
+    parser.add_argument("--top", type=int, default=20, help="Parameter sets to print, best PnL first")
+    args = parser.parse_args()
+    quote_symbols = dict(pair.split("=", 1) for pair in args.quote_symbol)
+    results = backtest_recording(
+        load_rows(args.signals), load_rows(args.quotes), args.kind, args.windows, args.thresholds, args.holds,
+        quote_time_field=args.quote_time_field, quote_price_field=args.quote_price_field,
+        bucket=args.bucket_seconds, quote_symbols=quote_symbols, side=args.side, fee_bps=args.fee_bps,
+        workers=args.workers)
+    print(f"{'window':>6} {'threshold':>9} {'hold':>5} {'pnl':>10} {'trades':>7} {'hit_rate':>8} "
+          f"{'turnover':>8} {'exposure':>8}")
+    for r in results[:args.top]:
+        print(f"{r.window:>6} {r.threshold:>9.2f} {r.hold:>5} {r.pnl:>10.4f} {r.trades:>7} {r.hit_rate:>8.2%} "
+              f"{r.turnover:>8.4f} {r.exposure:>8.2%}")
+
+
+if __name__ == "__main__":
+    main()
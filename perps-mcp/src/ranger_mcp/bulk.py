@@ -0,0 +1,104 @@
+import json
+from functools import lru_cache
+from typing import Any, TypeVar, get_args, get_origin
+
+from pydantic import BaseModel, TypeAdapter
+
+from ranger_mcp.metrics import track_validation
+from ranger_mcp.settings import settings
+
+M = TypeVar("M", bound=BaseModel)
+
+# Fields that the models coerce to decimal strings with a pre-validator.
+# Trusted decoding skips the models, so it applies the coercion itself.
+_DECIMAL_STRING_FIELDS: dict[str, tuple[str, ...]] = {
+    "FundingRateArb": ("rate_diff",),
+    "AccumulatedRate": ("accumulated_rate",),
+    "OiWeightedFundingRate": ("oi_weighted_funding_rate",),
+}
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: type[M]) -> TypeAdapter[list[M]]:
+    """Compiled validator for a list of ``model``, built once per model."""
+    return TypeAdapter(list[model])
+
+
+@lru_cache(maxsize=None)
+def model_adapter(model: type[M]) -> TypeAdapter[M]:
+    """Compiled validator for a single ``model``, built once per model."""
+    return TypeAdapter(model)
+
+
+def _decode(payload: Any) -> Any:
+    return json.loads(payload) if isinstance(payload, (bytes, bytearray, str)) else payload
+
+
+@lru_cache(maxsize=None)
+def _coercions(model: type[BaseModel]) -> tuple[tuple[str, type[BaseModel] | None], ...]:
+    """
+    Fields of ``model`` that trusted rows must rewrite: (field, None) for
+    decimal strings, (field, nested model) for lists/models that contain them.
+    Empty for models whose rows can be passed through untouched.
+    """
+    plan: list[tuple[str, type[BaseModel] | None]] = [
+        (name, None) for name in _DECIMAL_STRING_FIELDS.get(model.__name__, ())]
+    for name, field in model.model_fields.items():
+        annotation = field.annotation
+        if get_origin(annotation) is list:
+            (annotation,) = get_args(annotation)
+        if isinstance(annotation, type) and issubclass(annotation, BaseModel) and _coercions(annotation):
+            plan.append((name, annotation))
+    return tuple(plan)
+
+
+def _coerce(model: type[BaseModel], row: dict[str, Any]) -> dict[str, Any]:
+    plan = _coercions(model)
+    if not plan:
+        return row
+    row = dict(row)  # decoded payloads may be shared cache entries
+    for name, nested in plan:
+        value = row.get(name)
+        if value is None:
+            continue
+        if nested is None:
+            row[name] = str(value)
+        elif isinstance(value, list):
+            row[name] = [_coerce(nested, item) for item in value]
+        else:
+            row[name] = _coerce(nested, value)
+    return row
+
+
+def validate_list(model: type[M], payload: Any, trusted: bool | None = None) -> list[M] | list[dict[str, Any]]:
+    """
+    Validates a list of ``model`` from raw JSON bytes or decoded data in one
+    pass through a compiled validator.
+
+    With ``trusted`` (defaults to the ``trusted_upstream`` setting) no models
+    are built: the decoded rows are returned as dicts, serializing to the same
+    JSON. Only use it for results that are returned to the client as-is.
+    """
+    if trusted is None:
+        trusted = settings.trusted_upstream
+    if trusted:
+        rows = _decode(payload)
+        return [_coerce(model, row) for row in rows] if _coercions(model) else rows
+    adapter = list_adapter(model)
+    with track_validation(model.__name__):
+        if isinstance(payload, (bytes, bytearray, str)):
+            return adapter.validate_json(payload)
+        return adapter.validate_python(payload)
+
+
+def validate_model(model: type[M], payload: Any, trusted: bool | None = None) -> M | dict[str, Any]:
+    """Single-object counterpart of validate_list; a dict in trusted mode."""
+    if trusted is None:
+        trusted = settings.trusted_upstream
+    if trusted:
+        return _coerce(model, _decode(payload))
+    adapter = model_adapter(model)
+    with track_validation(model.__name__):
+        if isinstance(payload, (bytes, bytearray, str)):
+            return adapter.validate_json(payload)
+        return adapter.validate_python(payload)
@@ -0,0 +1,359 @@
+import asyncio
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from ranger_mcp.prefetch import Prefetcher
+from ranger_mcp.ratelimit import Priority, priority_lane
+from ranger_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# A fetcher returns the decoded response and the size of its raw body in bytes
+Fetcher = Callable[[], Awaitable[tuple[Any, int]]]
+
+T = TypeVar("T")
+
+# Backoff between checks for another worker's response while it holds the lease
+LEASE_POLL_MIN = 0.005
+LEASE_POLL_MAX = 0.1
+
+
+def normalize_params(params: dict[str, Any] | None) -> tuple:
+    """
+    Builds a hashable, order-independent form of request params.
+    None values are dropped and list filters are sorted, so equivalent
+    requests share a key.
+    """
+    if not params:
+        return ()
+    items = []
+    for name, value in params.items():
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, set)):
+            value = tuple(sorted(str(v) for v in value))
+        items.append((name, value))
+    return tuple(sorted(items))
+
+
+def request_key(endpoint: str, params: dict[str, Any] | None = None) -> tuple[str, tuple]:
+    """Cache/coalescing key for an upstream request."""
+    return endpoint, normalize_params(params)
+
+
+@dataclass
+class _Entry:
+    value: Any
+    size: int
+    fresh_until: float
+    stale_until: float
+
+
+class SharedResponseStore:
+    """
+    Second-level cache shared by hub worker processes through one SQLite file.
+
+    Entries hold the JSON-encoded response with wall-clock expiry times, so any
+    worker can serve what another fetched. A lease row per key lets one worker
+    fetch a missing or expired entry while the others wait for it, so adding
+    workers does not multiply upstream calls for cached Data endpoints. WAL mode
+    keeps reads concurrent with the (short) writes; each call is a single
+    indexed statement. The cache runs them through ``run`` on the store's own
+    thread, so a locked database never blocks the event loop.
+    """
+
+    def __init__(self, path: Path, clock: Callable[[], float] = time.time) -> None:
+        self.path = path
+        self.clock = clock
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path, isolation_level=None, timeout=5.0, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=OFF")  # A lost cache write only costs a refetch
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, body BLOB, fresh_until REAL, stale_until REAL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS leases (key TEXT PRIMARY KEY, expires REAL)")
+        self._writes = 0
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="response-cache")
+
+    async def run(self, method: Callable[..., T], *args: Any) -> T:
+        """Runs one of the store's methods on its thread, off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, method, *args)
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        return json.dumps(key, separators=(",", ":"), default=str)
+
+    def get(self, key: Hashable) -> tuple[Any, int, float, float] | None:
+        """Returns (value, size, fresh_until, stale_until) if the entry is not past its stale window."""
+        row = self._db.execute(
+            "SELECT body, fresh_until, stale_until FROM entries WHERE key = ? AND stale_until > ?",
+            (self._key(key), self.clock())).fetchone()
+        if row is None:
+            return None
+        body, fresh_until, stale_until = row
+        return json.loads(body), len(body), fresh_until, stale_until
+
+    def put(self, key: Hashable, value: Any, ttl: float, stale_seconds: float) -> None:
+        now = self.clock()
+        body = json.dumps(value, separators=(",", ":")).encode()
+        self._db.execute(
+            "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+            (self._key(key), body, now + ttl, now + ttl + stale_seconds))
+        self._writes += 1
+        if self._writes % 256 == 0:
+            self._db.execute("DELETE FROM entries WHERE stale_until < ?", (now,))
+
+    def try_lease(self, key: Hashable, seconds: float) -> bool:
+        """Takes the fetch lease for ``key`` unless another live worker holds it."""
+        now = self.clock()
+        cursor = self._db.execute(
+            "INSERT INTO leases VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET expires = excluded.expires WHERE leases.expires < ?",
+            (self._key(key), now + seconds, now))
+        return cursor.rowcount == 1
+
+    def release(self, key: Hashable) -> None:
+        self._db.execute("DELETE FROM leases WHERE key = ?", (self._key(key),))
+
+    def clear(self) -> None:
+        self._db.execute("DELETE FROM entries")
+        self._db.execute("DELETE FROM leases")
+
+
+class ResponseCache:
+    """
+    TTL + LRU cache for decoded Data API responses, with stale-while-revalidate.
+
+    Cached values are shared between callers and must be treated as read-only.
+    With a ``shared`` store, local misses are looked up there before going
+    upstream, and fetched responses are written there for other workers.
+    With a ``prefetcher``, reads are reported to it so that popular entries
+    are refreshed before they expire.
+    """
+
+    def __init__(
+        self,
+        ttls: dict[str, float],
+        max_bytes: int,
+        stale_seconds: float = 0.0,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+        shared: SharedResponseStore | None = None,
+        lease_seconds: float = 10.0,
+        prefetcher: Prefetcher | None = None,
+    ) -> None:
+        self.ttls = ttls
+        self.max_bytes = max_bytes
+        self.stale_seconds = stale_seconds
+        self.enabled = enabled
+        self.clock = clock
+        self.shared = shared
+        self.lease_seconds = lease_seconds  # Longest wait for another worker's fetch
+        self.prefetcher = prefetcher
+        if prefetcher is not None:
+            prefetcher.cache = self
+        self._entries: OrderedDict[Hashable, _Entry] = OrderedDict()
+        self._bytes = 0
+        self._refreshing: dict[Hashable, asyncio.Task] = {}
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+        self.shared_hits = 0
+
+    def ttl_for(self, endpoint: str) -> float:
+        return self.ttls.get(endpoint, 0.0) if self.enabled else 0.0
+
+    async def get_or_fetch(self, endpoint: str, params: dict[str, Any] | None, fetch: Fetcher) -> Any:
+        """Returns a cached response for the request, fetching it on a miss."""
+        ttl = self.ttl_for(endpoint)
+        if ttl <= 0:
+            value, _ = await fetch()
+            return value
+
+        key = request_key(endpoint, params)
+        if self.prefetcher is not None:
+            self.prefetcher.record(key, ttl, fetch)
+        now = self.clock()
+        entry = self._entries.get(key)
+        if entry is not None:
+            if now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry.value
+            if now < entry.stale_until:
+                self._entries.move_to_end(key)
+                self.stale_hits += 1
+                self._schedule_refresh(key, ttl, fetch)
+                return entry.value
+            self._remove(key)
+
+        if self.shared is not None:
+            shared = await self.shared.run(self.shared.get, key)
+            if shared is not None:
+                value, size, fresh_until, stale_until = shared
+                self.shared_hits += 1
+                self._store_until(key, value, size, fresh_until, stale_until)
+                if fresh_until <= self.shared.clock():
+                    self._schedule_refresh(key, ttl, fetch)
+                return value
+
+        self.misses += 1
+        value, size = await self._fetch(key, ttl, fetch)
+        self._store(key, value, size, ttl)
+        return value
+
+    async def _fetch(self, key: Hashable, ttl: float, fetch: Fetcher) -> tuple[Any, int]:
+        """Fetches upstream, or waits for the worker that holds the shared lease."""
+        shared = self.shared
+        if shared is None:
+            return await fetch()
+        if not await shared.run(shared.try_lease, key, self.lease_seconds):
+            deadline, delay = self.clock() + self.lease_seconds, LEASE_POLL_MIN
+            while self.clock() < deadline:
+                await asyncio.sleep(min(delay, max(0.0, deadline - self.clock())))
+                delay = min(delay * 2, LEASE_POLL_MAX)
+                entry = await shared.run(shared.get, key)
+                if entry is not None and entry[2] > shared.clock():
+                    self.shared_hits += 1
+                    return entry[0], entry[1]
+                if await shared.run(shared.try_lease, key, self.lease_seconds):
+                    break  # The holder gave up without storing a response
+            else:
+                return await fetch()
+        return await self._fetch_leased(key, ttl, fetch)
+
+    async def _fetch_leased(self, key: Hashable, ttl: float, fetch: Fetcher) -> tuple[Any, int]:
+        """Fetches while holding the shared lease, publishes the response and releases it."""
+        if self.shared is None:
+            return await fetch()
+        try:
+            value, size = await fetch()
+            await self.shared.run(self.shared.put, key, value, ttl, self.stale_seconds)
+            return value, size
+        finally:
+            await self.shared.run(self.shared.release, key)
+
+    def _schedule_refresh(self, key: Hashable, ttl: float, fetch: Fetcher) -> None:
+        if key in self._refreshing:
+            return
+
+        async def refresh() -> None:
+            try:
+                # Nobody is waiting on a refresh, so it yields to foreground calls
+                with priority_lane(Priority.BACKGROUND):
+                    shared = self.shared
+                    if shared is not None and not await shared.run(shared.try_lease, key, self.lease_seconds):
+                        # Another worker is refreshing it; take whatever it stored last
+                        entry = await shared.run(shared.get, key)
+                        if entry is not None:
+                            self._store_until(key, *entry)
+                        return
+                    value, size = await self._fetch_leased(key, ttl, fetch)
+            except Exception as e:
+                self.refresh_errors += 1
+                logger.warning("Background refresh of %s failed: %s", key[0], e)
+            else:
+                self.refreshes += 1
+                self._store(key, value, size, ttl)
+            finally:
+                self._refreshing.pop(key, None)
+
+        self._refreshing[key] = asyncio.create_task(refresh())
+
+    def refresh(self, key: Hashable, ttl: float, fetch: Fetcher) -> None:
+        """Refreshes ``key`` in the background unless a refresh is already running."""
+        self._schedule_refresh(key, ttl, fetch)
+
+    def expiry(self, key: Hashable) -> float | None:
+        """When the entry for ``key`` stops being fresh; None if it is missing or being refreshed."""
+        entry = self._entries.get(key)
+        if entry is None or key in self._refreshing:
+            return None
+        return entry.fresh_until
+
+    def _store(self, key: Hashable, value: Any, size: int, ttl: float) -> None:
+        now = self.clock()
+        self._store_entry(key, _Entry(value, size, now + ttl, now + ttl + self.stale_seconds))
+
+    def _store_until(self, key: Hashable, value: Any, size: int, fresh_until: float, stale_until: float) -> None:
+        # Shared entries carry wall-clock expiry; convert to this cache's clock
+        offset = self.clock() - self.shared.clock()
+        self._store_entry(key, _Entry(value, size, fresh_until + offset, stale_until + offset))
+
+    def _store_entry(self, key: Hashable, entry: _Entry) -> None:
+        if entry.size > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = entry
+        self._bytes += entry.size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= evicted.size
+            self.evictions += 1
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._bytes = 0
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Hit/miss/eviction counters for ranger_status."""
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.stale_hits) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "refreshes": self.refreshes,
+            "refresh_errors": self.refresh_errors,
+            "shared": str(self.shared.path) if self.shared is not None else None,
+            "shared_hits": self.shared_hits,
+        }
+
+
+def shared_store(base_url: Any) -> SharedResponseStore | None:
+    """The store the hub's workers share for responses from ``base_url``, if sharing is on."""
+    if not settings.cache_shared:
+        return None
+    # One file per upstream, so hubs pointed at different APIs never mix entries
+    upstream = hashlib.sha1(str(base_url).encode()).hexdigest()[:12]
+    return SharedResponseStore(settings.store_dir / f"response-cache-{upstream}.sqlite")
+
+
+# Shared cache in front of _call_ranger_data_api
+response_cache = ResponseCache(
+    ttls=settings.cache_ttls,
+    max_bytes=settings.cache_max_bytes,
+    stale_seconds=settings.cache_stale_seconds,
+    enabled=settings.cache_enabled,
+    shared=shared_store(settings.data_base_url) if settings.cache_enabled else None,
+    prefetcher=Prefetcher(
+        budget=settings.prefetch_budget,
+        lead_seconds=settings.prefetch_lead_seconds,
+        min_reads=settings.prefetch_min_reads,
+        idle_seconds=settings.prefetch_idle_seconds,
+    ),
+)
@@ -0,0 +1,235 @@
+"""
+Record and replay of upstream SOR/Data API traffic.
+
+With RANGER_CASSETTE_MODE=record, every upstream exchange (request, raw
+response and its latency) is appended to RANGER_CASSETTE_PATH. With
+RANGER_CASSETTE_MODE=replay, upstream requests are answered from that file
+without any network access, after the recorded latency divided by
+RANGER_CASSETTE_SPEED (0 answers immediately). Only upstream latency is
+compressed: cache TTLs, the feed poller, prefetching and the rate limiter
+still run on wall-clock time, so replay is not a faster-than-real-time
+simulation.
+
+The file is a sequence of frames, each a 4-byte big-endian length followed
+by a zlib-compressed JSON header line and the raw (still content-encoded)
+response body. Frames are written with a single O_APPEND write, so several
+hub workers can record to the same file; a torn frame at the end (e.g.
+after a crash) is ignored on replay.
+
+Replay matches requests on upstream, method, path, query and JSON body.
+Responses recorded for the same request are served in recorded order, and
+the last one repeats once they run out. Requests never recorded get a 404.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import struct
+import time
+import zlib
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from ranger_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+_LENGTH = struct.Struct(">I")
+
+# Describe the connection rather than the response, so they are not replayed
+_HOP_HEADERS = {"connection", "keep-alive", "transfer-encoding", "set-cookie"}
+
+
+@dataclass
+class Exchange:
+    upstream: str
+    key: str  # See request_key
+    at: float  # Wall-clock time the request was sent; for inspection, replay does not use it
+    elapsed: float  # Seconds until the whole response had arrived
+    status: int
+    headers: list[tuple[str, str]]
+    content: bytes = b""
+
+
+def _path(request: httpx.Request) -> str:
+    # Base URLs with a trailing slash produce "//v1/..." paths
+    return re.sub("/+", "/", request.url.path)
+
+
+def request_key(upstream: str, request: httpx.Request) -> str:
+    """Identifies a request independently of host, header and JSON key order."""
+    query = "&".join(sorted(request.url.query.decode().split("&"))) if request.url.query else ""
+    body = request.content
+    try:
+        body = json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode() if body else b""
+    except ValueError:
+        pass
+    return f"{upstream} {request.method} {_path(request)}?{query} {body.decode('utf-8', 'replace')}"
+
+
+def encode(exchange: Exchange) -> bytes:
+    header = {name: value for name, value in asdict(exchange).items() if name != "content"}
+    frame = zlib.compress(json.dumps(header, separators=(",", ":")).encode() + b"\n" + exchange.content)
+    return _LENGTH.pack(len(frame)) + frame
+
+
+def read_cassette(path: Path) -> list[Exchange]:
+    """All complete frames of a cassette file, in recorded order."""
+    data, exchanges, offset = path.read_bytes(), [], 0
+    while offset + _LENGTH.size <= len(data):
+        (length,) = _LENGTH.unpack_from(data, offset)
+        frame = data[offset + _LENGTH.size:offset + _LENGTH.size + length]
+        if len(frame) < length:
+            logger.warning("Ignoring a torn frame at the end of %s", path)
+            break
+        header, _, content = zlib.decompress(frame).partition(b"\n")
+        fields = json.loads(header)
+        fields["headers"] = [tuple(pair) for pair in fields["headers"]]
+        exchanges.append(Exchange(**fields, content=content))
+        offset += _LENGTH.size + length
+    return exchanges
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Forwards requests to ``inner`` and appends each exchange to the cassette."""
+
+    def __init__(self, cassette: "Cassette", upstream: str, inner: httpx.AsyncBaseTransport) -> None:
+        self.cassette = cassette
+        self.upstream = upstream
+        self.inner = inner
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        at, start = time.time(), time.perf_counter()
+        response = await self.inner.handle_async_request(request)
+        try:
+            # The undecoded bytes, so the recorded Content-Encoding/Length headers still
+            # describe them (aiter_raw() refuses responses a transport already read)
+            content = b"".join([chunk async for chunk in response.stream])
+        finally:
+            await response.aclose()
+        elapsed = time.perf_counter() - start
+        headers = [(name, value) for name, value in response.headers.multi_items() if name not in _HOP_HEADERS]
+        self.cassette.append(Exchange(
+            self.upstream, request_key(self.upstream, request), at, elapsed, response.status_code, headers, content))
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Answers requests from recorded exchanges; never touches the network."""
+
+    def __init__(
+        self,
+        cassette: "Cassette",
+        upstream: str,
+        speed: float,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ) -> None:
+        self.cassette = cassette
+        self.upstream = upstream
+        self.speed = speed
+        self.sleep = sleep
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = request_key(self.upstream, request)
+        exchange = self.cassette.next(key)
+        if exchange is None:
+            logger.warning("No recorded response for %s", key)
+            return httpx.Response(
+                404, json={"message": f"No recorded response for {request.method} {_path(request)}"},
+                request=request)
+        # Latency compression only; nothing else in the hub runs on a replay clock
+        if self.speed > 0 and exchange.elapsed > 0:
+            await self.sleep(exchange.elapsed / self.speed)
+        return httpx.Response(exchange.status, headers=exchange.headers, content=exchange.content, request=request)
+
+
+class Cassette:
+    """
+    Upstream record/replay, configured by the RANGER_CASSETTE_* settings.
+    UpstreamClients asks it for each upstream's transport.
+    """
+
+    def __init__(self) -> None:
+        self.path: Path | None = None
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+        self._fd: int | None = None
+        self._exchanges: dict[str, list[Exchange]] | None = None
+        self._served: dict[str, int] = defaultdict(int)
+
+    @property
+    def mode(self) -> str:
+        return settings.cassette_mode
+
+    def _resolve_path(self) -> Path:
+        path = settings.cassette_path or settings.store_dir / "upstream.cassette"
+        if path != self.path:
+            self.close()
+            self.path = path
+        return path
+
+    def transport(self, upstream: str, inner: httpx.AsyncBaseTransport) -> httpx.AsyncBaseTransport:
+        """The transport for ``upstream``: ``inner`` itself unless recording or replaying."""
+        if self.mode == "record":
+            self._resolve_path()
+            return RecordingTransport(self, upstream, inner)
+        if self.mode == "replay":
+            self._resolve_path()
+            return ReplayTransport(self, upstream, settings.cassette_speed)
+        return inner
+
+    def append(self, exchange: Exchange) -> None:
+        if self._fd is None:
+            path = self._resolve_path()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        os.write(self._fd, encode(exchange))
+        self.recorded += 1
+
+    def next(self, key: str) -> Exchange | None:
+        """The next recorded response for a request key, repeating the last one."""
+        if self._exchanges is None:
+            path = self._resolve_path()
+            self._exchanges = defaultdict(list)
+            for exchange in read_cassette(path) if path.exists() else []:
+                self._exchanges[exchange.key].append(exchange)
+            logger.info("Replaying %d recorded requests from %s",
+                        sum(map(len, self._exchanges.values())), path)
+        recorded = self._exchanges.get(key)
+        if not recorded:
+            self.misses += 1
+            return None
+        served = self._served[key]
+        self._served[key] = served + 1
+        self.replayed += 1
+        return recorded[min(served, len(recorded) - 1)]
+
+    def close(self) -> None:
+        """Closes the recording and forgets loaded exchanges and replay positions."""
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+        self._exchanges = None
+        self._served.clear()
+
+    def status(self) -> dict[str, Any]:
+        """Record/replay state for ranger_status."""
+        return {
+            "mode": self.mode,
+            "path": str(self.path) if self.path else None,
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
+
+
+cassette = Cassette()
@@ -0,0 +1,103 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Literal
+
+import httpx
+from fastmcp import FastMCP
+from ranger_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+Upstream = Literal["sor", "data"]
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class UpstreamClients:
+    """
+    Long-lived, pooled HTTP clients for the upstream Ranger APIs.
+
+    Each upstream (SOR and Data) gets its own ``httpx.AsyncClient`` so the two
+    never compete for connections. Clients are created on first use and closed
+    when the last hub session using them ends.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport | None = None) -> None:
+        # Optional transport override, e.g. httpx.MockTransport in tests
+        self.transport = transport
+        self._clients: dict[str, httpx.AsyncClient] = {}
+        self._sessions = 0
+
+    def get(self, upstream: Upstream) -> httpx.AsyncClient:
+        """Returns the pooled client for an upstream, creating it if needed."""
+        client = self._clients.get(upstream)
+        if client is None or client.is_closed:
+            client = self._clients[upstream] = self._build(upstream)
+        return client
+
+    def _build(self, upstream: Upstream) -> httpx.AsyncClient:
+        http2 = settings.http2
+        if http2 and not _http2_available():
+            logger.warning(
+                "RANGER_HTTP2 is enabled but the 'h2' package is not installed; "
+                "falling back to HTTP/1.1 for the %s upstream", upstream)
+            http2 = False
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+        transport = self.transport
+        if settings.cassette_mode != "off":
+            from ranger_mcp.cassette import cassette
+
+            # A transport passed to the client ignores its limits and http2 arguments
+            transport = cassette.transport(
+                upstream, transport or httpx.AsyncHTTPTransport(limits=limits, http2=http2))
+        return httpx.AsyncClient(
+            timeout=settings.http_timeout,
+            limits=limits,
+            http2=http2,
+            transport=transport,
+        )
+
+    async def aclose(self) -> None:
+        """Closes all pooled clients. They are recreated on next use."""
+        clients, self._clients = self._clients, {}
+        for client in clients.values():
+            await client.aclose()
+
+    @asynccontextmanager
+    async def lifespan(self, server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+        """
+        Hub lifespan hook. The MCP server enters it once per client session,
+        so pools are only closed when the last session has ended.
+        """
+        self._sessions += 1
+        try:
+            yield {}
+        finally:
+            self._sessions -= 1
+            if self._sessions == 0:
+                await self.aclose()
+
+    def status(self) -> dict[str, Any]:
+        """Summarizes the open upstream pools for ranger_status."""
+        return {
+            "open_pools": sorted(
+                name for name, client in self._clients.items() if not client.is_closed),
+            "sessions": self._sessions,
+            "http2": settings.http2 and _http2_available(),
+            "max_connections": settings.http_max_connections,
+            "max_keepalive_connections": settings.http_max_keepalive_connections,
+        }
+
+
+# Shared by the SOR and Data sub-servers, owned by the hub lifespan
+upstream_clients = UpstreamClients()
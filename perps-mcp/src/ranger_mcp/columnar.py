@@ -0,0 +1,61 @@
+from array import array
+from typing import Any, Literal
+
+from fastmcp.exceptions import ToolError
+
+from ranger_mcp.models import ColumnarTable
+
+# How each field is encoded:
+#   "dict"  - dictionary-encoded: int codes into ColumnarTable.dictionaries[field]
+#   "float" - numeric column (decimal strings are parsed)
+#   "str"   - plain string column
+ColumnKind = Literal["dict", "float", "str"]
+
+HEATMAP_COLUMNS: dict[str, ColumnKind] = {
+    "symbol": "dict",
+    "platform": "dict",
+    "start": "dict",
+    "total_liquidated_usd": "float",
+}
+
+LARGEST_LIQUIDATION_COLUMNS: dict[str, ColumnKind] = {
+    "symbol": "dict",
+    "platform": "dict",
+    "timestamp": "str",
+    "quantity": "float",
+    "price": "float",
+    "value_usd": "float",
+    "liquidator_reward": "float",
+}
+
+ACCUMULATED_RATE_COLUMNS: dict[str, ColumnKind] = {
+    "platform": "dict",
+    "symbol": "dict",
+    "created_at": "dict",
+    "accumulated_rate": "float",
+    "base_granularity": "dict",
+}
+
+
+def to_columnar(rows: list[dict[str, Any]], columns: dict[str, ColumnKind]) -> ColumnarTable:
+    """
+    Encodes raw API rows column by column into compact typed arrays (float64
+    for numbers, int32 codes for dictionary-encoded strings), without building
+    a model per row. Invalid rows raise a ToolError.
+    """
+    data: dict[str, array | list[str]] = {}
+    dictionaries: dict[str, list[str]] = {}
+    try:
+        for name, kind in columns.items():
+            if kind == "float":
+                data[name] = array("d", (float(row[name]) for row in rows))
+            elif kind == "dict":
+                index: dict[str, int] = {}
+                data[name] = array("i", (index.setdefault(str(row[name]), len(index)) for row in rows))
+                dictionaries[name] = list(index)
+            else:
+                data[name] = [str(row[name]) for row in rows]
+    except (KeyError, TypeError, ValueError) as e:
+        raise ToolError(f"Unexpected row format in Ranger Data API response: {e!r}") from e
+    # Already validated column by column above
+    return ColumnarTable.model_construct(length=len(rows), columns=data, dictionaries=dictionaries)
@@ -1,17 +1,49 @@
+import asyncio
+import base64
+import json
+import logging
+import math
 import httpx
-from typing import Any, Literal
-from pydantic import Field
+from collections import deque
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, Any, AsyncIterator, Literal
+from pydantic import Field, ValidationError
 
 from fastmcp import FastMCP, Context
 from ranger_mcp.settings import settings
+from ranger_mcp.clients import upstream_clients
+from ranger_mcp.cache import response_cache, request_key
+from ranger_mcp.singleflight import upstream_flights
+from ranger_mcp.bulk import validate_list, validate_model
+from ranger_mcp.metrics import track_upstream
+from ranger_mcp.ratelimit import rate_limiter, request_priority
+from ranger_mcp.hedging import data_hedger
+from ranger_mcp.feed import LiquidationFeed
+from ranger_mcp.timeseries import rate_store
+from ranger_mcp.trade_store import trade_store
+from ranger_mcp.columnar import (
+    to_columnar, HEATMAP_COLUMNS, LARGEST_LIQUIDATION_COLUMNS, ACCUMULATED_RATE_COLUMNS
+)
 from ranger_mcp.models import (
     Platform, SizeDenomination,
-    GetPositionsResponse, GetTradeHistoryResponse, Liquidation, LiquidationTotals,
+    GetPositionsResponse, GetPositionsBatchResponse, AccountPositionsResult, GetTradeHistoryResponse, Trade, TradeHistoryPage, Liquidation, LiquidationTotals,
+    TradeHistoryQueryResponse,
+    LiquidationFeedPage,
     CapitulationSignal, LiquidationHeatmapEntry, LargestLiquidation, FundingRateArb,
-    AccumulatedRate, ExtremeFundingRates, OiWeightedFundingRate, FundingRateTrend
+    AccumulatedRate, ExtremeFundingRates, OiWeightedFundingRate, FundingRateTrend,
+    CapitulationScan, FundingTrendScan, ColumnarTable
 )
 from fastmcp.exceptions import ToolError
 
+logger = logging.getLogger(__name__)
+
+# Tools take it as "format" (an alias, so the Python name does not shadow the builtin)
+ResultFormat = Literal["rows", "columnar"]
+FORMAT_DESCRIPTION = (
+    "'rows' (default) returns a list of objects. 'columnar' returns column arrays with "
+    "dictionary-encoded symbol/platform and numeric rate columns, which is much smaller for large results."
+)
+
 # Data MCP Server instance
 data_mcp = FastMCP("RangerData")
 
@@ -22,32 +54,60 @@ def get_app_version() -> str:
     return "v2.1.0"
 
 
-async def _call_ranger_data_api(endpoint: str, params: dict[str, Any] | None = None) -> Any:
-    """Calls the Ranger Data API."""
+async def _call_ranger_data_api(endpoint: str, params: dict[str, Any] | None = None, raw: bool = False) -> Any:
+    """
+    Calls the Ranger Data API, serving read-only endpoints from the response cache.
+    Identical concurrent requests that miss the cache share one upstream call.
+    Returned data may be shared with other callers and must not be mutated.
+
+    With ``raw``, uncached endpoints return the undecoded body so it can be
+    validated straight from bytes (see ranger_mcp.bulk); cached endpoints
+    still return decoded data.
+    """
+    raw = raw and response_cache.ttl_for(endpoint) <= 0
+    key = ("data", raw, *request_key(endpoint, params))
+    return await response_cache.get_or_fetch(
+        endpoint, params,
+        lambda: upstream_flights.do(key, lambda: _fetch_ranger_data_api(endpoint, params, raw)))
+
+
+async def _fetch_ranger_data_api(
+    endpoint: str, params: dict[str, Any] | None = None, raw: bool = False
+) -> tuple[Any, int]:
+    """Calls the Ranger Data API upstream. Returns the body (decoded unless ``raw``) and its size in bytes."""
     headers = {"x-api-key": settings.api_key}
     url = f"{settings.data_base_url}{endpoint}"
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
-        try:
+    client = upstream_clients.get("data")
+
+    async def request() -> httpx.Response:
+        with track_upstream("data", endpoint) as call:
             response = await client.get(url, headers=headers, params=params)
-            response.raise_for_status()
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            status_code = e.response.status_code
-            error_detail = e.response.text
-            try:
-                error_detail = e.response.json().get("message", error_detail)
-            except Exception:
-                pass
-            error_msg = f"Ranger Data API Error ({status_code}): {error_detail}"
-            # Add specific error messages if needed
-            raise ToolError(error_msg) from e
-        except httpx.RequestError as e:
-            raise ToolError(
-                f"Network error calling Ranger Data API: {e}") from e
-        except Exception as e:
-            raise ToolError(
-                f"Unexpected error interacting with Ranger Data API: {e}") from e
+            call.status, call.received = response.status_code, len(response.content)
+            return response
+
+    try:
+        priority = request_priority.get()
+        response = await data_hedger.get(endpoint, lambda: rate_limiter.send("data", priority, request))
+        response.raise_for_status()
+        body = response.content if raw else response.json()
+        return body, len(response.content)
+    except httpx.HTTPStatusError as e:
+        status_code = e.response.status_code
+        error_detail = e.response.text
+        try:
+            error_detail = e.response.json().get("message", error_detail)
+        except Exception:
+            pass
+        error_msg = f"Ranger Data API Error ({status_code}): {error_detail}"
+        # Add specific error messages if needed
+        raise ToolError(error_msg) from e
+    except httpx.RequestError as e:
+        raise ToolError(
+            f"Network error calling Ranger Data API: {e}") from e
+    except Exception as e:
+        raise ToolError(
+            f"Unexpected error interacting with Ranger Data API: {e}") from e
 
 # --- Data Tools (Using tools because GET params are needed) ---
 
@@ -66,6 +126,16 @@ async def get_positions(
     """Retrieve user positions across venues, with optional filters."""
     if ctx:
         await ctx.info(f"Fetching positions for {public_key}")
+    return await _fetch_positions(public_key, platforms, symbols, from_date)
+
+
+async def _fetch_positions(
+    public_key: str,
+    platforms: list[Platform] | None,
+    symbols: list[str] | None,
+    from_date: str | None,
+    trusted: bool | None = None,
+) -> GetPositionsResponse:
     params = {
         "public_key": public_key,
         "platforms": platforms,
@@ -74,8 +144,48 @@ async def get_positions(
     }
     # Filter out None values before sending
     params = {k: v for k, v in params.items() if v is not None}
-    response_data = await _call_ranger_data_api("/v1/positions", params=params)
-    return GetPositionsResponse(**response_data)
+    response_data = await _call_ranger_data_api("/v1/positions", params=params, raw=True)
+    return validate_model(GetPositionsResponse, response_data, trusted=trusted)
+
+
+@data_mcp.tool(name="get_positions_batch")
+async def get_positions_batch(
+    public_keys: list[str] = Field(
+        min_length=1, description="List of Solana wallet addresses to fetch positions for"),
+    platforms: list[Platform] | None = Field(
+        default=None, description="Optional list of platforms to filter by, applied to every account"),
+    symbols: list[str] | None = Field(
+        default=None, description="Optional list of symbols to filter by, applied to every account"),
+    from_date: str | None = Field(
+        default=None, description="Optional earliest position date (YYYY-MM-DDTHH:MM:SSZ). Defaults to 2 days ago."),
+    max_concurrency: int | None = Field(
+        default=None, ge=1, description="Maximum concurrent upstream requests (defaults to the server setting)"),
+    ctx: Context | None = None
+) -> GetPositionsBatchResponse:
+    """
+    Retrieve positions for many accounts in one call. Accounts are fetched concurrently;
+    a failure for one account is reported in its result and does not fail the batch.
+    """
+    if ctx:
+        await ctx.info(f"Fetching positions for {len(public_keys)} accounts")
+    semaphore = asyncio.Semaphore(max_concurrency or settings.batch_max_concurrency)
+    done = 0
+
+    async def fetch_one(public_key: str) -> AccountPositionsResult:
+        nonlocal done
+        async with semaphore:
+            try:
+                response = await _fetch_positions(public_key, platforms, symbols, from_date, trusted=False)
+                result = AccountPositionsResult(public_key=public_key, positions=response.positions)
+            except (ToolError, ValidationError) as e:
+                result = AccountPositionsResult(public_key=public_key, error=str(e))
+        done += 1
+        if ctx:
+            await ctx.report_progress(done, len(public_keys))
+        return result
+
+    results = await asyncio.gather(*(fetch_one(key) for key in public_keys))
+    return GetPositionsBatchResponse(results=results)
 
 
 @data_mcp.tool(name="get_trade_history")
@@ -102,8 +212,216 @@ async def get_trade_history(
         "end_time": end_time,
     }
     params = {k: v for k, v in params.items() if v is not None}
-    response_data = await _call_ranger_data_api("/v1/trade_history", params=params)
-    return GetTradeHistoryResponse(**response_data)
+    response_data = await _call_ranger_data_api("/v1/trade_history", params=params, raw=True)
+    return validate_model(GetTradeHistoryResponse, response_data)
+
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+
+def _parse_time(value: str) -> datetime:
+    # fromisoformat only accepts a trailing 'Z' from Python 3.11
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _format_time(value: datetime) -> str:
+    return value.astimezone(timezone.utc).strftime(TIME_FORMAT)
+
+
+async def iter_trade_history(
+    public_key: str,
+    platforms: list[Platform] | None,
+    symbols: list[str] | None,
+    start: datetime,
+    end: datetime,
+    window: timedelta,
+    max_concurrency: int,
+    seen_ids: set[str] | None = None,
+) -> AsyncIterator[tuple[datetime, list[Trade]]]:
+    """
+    Fetches trade history in consecutive time windows and yields each window's
+    trades in created_at order, together with the window's end time.
+
+    Up to ``max_concurrency`` windows are fetched ahead of the consumer, so
+    memory is bounded by the window size, not the length of the range. Trades
+    on a window boundary can be returned by both neighbours; they are
+    de-duplicated by id against the previous window (or ``seen_ids``).
+    """
+    async def fetch(window_start: datetime, window_end: datetime) -> list[Trade]:
+        params = {
+            "public_key": public_key,
+            "platforms": platforms,
+            "symbols": symbols,
+            "start_time": _format_time(window_start),
+            "end_time": _format_time(window_end),
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        response_data = await _call_ranger_data_api("/v1/trade_history", params=params, raw=True)
+        trades = validate_model(GetTradeHistoryResponse, response_data, trusted=False).trades
+        return sorted(trades, key=lambda t: _parse_time(t.created_at))
+
+    def windows():
+        window_start = start
+        while window_start < end:
+            window_end = min(window_start + window, end)
+            yield window_start, window_end
+            window_start = window_end
+
+    pending: deque[tuple[datetime, asyncio.Task]] = deque()
+    upcoming = windows()
+    previous_ids = set(seen_ids or ())
+    try:
+        while True:
+            while len(pending) < max_concurrency:
+                next_window = next(upcoming, None)
+                if next_window is None:
+                    break
+                pending.append((next_window[1], asyncio.create_task(fetch(*next_window))))
+            if not pending:
+                return
+            window_end, task = pending.popleft()
+            trades = [t for t in await task if t.id not in previous_ids]
+            previous_ids = {t.id for t in trades}
+            yield window_end, trades
+    finally:
+        for _, task in pending:
+            task.cancel()
+
+
+def _encode_cursor(next_start: datetime, end: datetime, seen_ids: set[str]) -> str:
+    state = {"start": _format_time(next_start), "end": _format_time(end), "seen": sorted(seen_ids)}
+    return base64.urlsafe_b64encode(json.dumps(state).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, datetime, set[str]]:
+    try:
+        state = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return _parse_time(state["start"]), _parse_time(state["end"]), set(state["seen"])
+    except Exception as e:
+        raise ToolError(f"Invalid trade history cursor: {e}") from e
+
+
+@data_mcp.tool(name="get_trade_history_page")
+async def get_trade_history_page(
+    public_key: str = Field(description="User's Solana wallet address"),
+    platforms: list[Platform] | None = Field(
+        default=None, description="Optional platforms filter"),
+    symbols: list[str] | None = Field(
+        default=None, description="Optional symbols filter"),
+    start_time: str | None = Field(
+        default=None, description="Optional start time (YYYY-MM-DDTHH:MM:SSZ). Defaults to 30 days ago. Ignored when a cursor is given."),
+    end_time: str | None = Field(
+        default=None, description="Optional end time (YYYY-MM-DDTHH:MM:SSZ). Defaults to now. Ignored when a cursor is given."),
+    cursor: str | None = Field(
+        default=None, description="Cursor from the previous page's next_cursor. Pass the same filters again."),
+    window_hours: int = Field(
+        default=24, ge=1, le=24 * 31, description="Size of each upstream time window in hours"),
+    windows_per_page: int = Field(
+        default=7, ge=1, le=100, description="Number of windows returned per page"),
+    max_concurrency: int | None = Field(
+        default=None, ge=1, description="Maximum windows fetched concurrently (defaults to the server setting)"),
+    ctx: Context | None = None
+) -> TradeHistoryPage:
+    """
+    Retrieve trade history for long time ranges page by page, in created_at order.
+    Each page covers windows_per_page consecutive time windows fetched concurrently; keep
+    calling with next_cursor until it is null. Reports progress per window.
+    """
+    if cursor:
+        start, end, seen_ids = _decode_cursor(cursor)
+    else:
+        now = datetime.now(timezone.utc)
+        try:
+            end = _parse_time(end_time) if end_time else now
+            start = _parse_time(start_time) if start_time else end - timedelta(days=30)
+        except ValueError as e:
+            raise ToolError(f"Invalid time range: {e}") from e
+        seen_ids = set()
+    window = timedelta(hours=window_hours)
+    page_end = min(start + window * windows_per_page, end)
+    if ctx:
+        await ctx.info(f"Fetching trade history page for {public_key}: "
+                       f"{_format_time(start)} to {_format_time(page_end)}")
+
+    trades: list[Trade] = []
+    # The last page can hold fewer windows than windows_per_page
+    total, done = math.ceil((page_end - start) / window), 0
+    async for _, window_trades in iter_trade_history(
+            public_key, platforms, symbols, start, page_end, window,
+            max_concurrency or settings.batch_max_concurrency, seen_ids):
+        trades.extend(window_trades)
+        seen_ids = {t.id for t in window_trades}
+        done += 1
+        if ctx:
+            await ctx.report_progress(done, total)
+
+    return TradeHistoryPage(
+        trades=trades,
+        window_start=_format_time(start),
+        window_end=_format_time(page_end),
+        next_cursor=_encode_cursor(page_end, end, seen_ids) if page_end < end else None,
+    )
+
+
+@data_mcp.tool(name="query_trade_history")
+async def query_trade_history(
+    public_key: str = Field(description="User's Solana wallet address"),
+    platforms: list[Platform] | None = Field(
+        default=None, description="Optional platforms filter"),
+    symbols: list[str] | None = Field(
+        default=None, description="Optional symbols filter"),
+    tx_signature: str | None = Field(
+        default=None, description="Optional transaction signature: only the trades of that transaction"),
+    start_time: str | None = Field(
+        default=None, description="Optional start time (YYYY-MM-DDTHH:MM:SSZ), inclusive"),
+    end_time: str | None = Field(
+        default=None, description="Optional end time (YYYY-MM-DDTHH:MM:SSZ), exclusive"),
+    limit: int = Field(
+        default=100, ge=0, le=10000, description="Trades to return, newest first (0 for aggregates only)"),
+    refresh: bool = Field(
+        default=False, description="Sync with upstream now, even if the account was synced recently"),
+    ctx: Context | None = None
+) -> TradeHistoryQueryResponse:
+    """
+    Query an account's trade history from a local index, with realized PnL, fees and volume
+    totals overall, by platform (venue) and by symbol. The index is synced incrementally: only
+    trades newer than the last stored one are fetched (the first call backfills 30 days).
+    """
+    for value in (start_time, end_time):
+        if value:
+            try:
+                _parse_time(value)
+            except ValueError as e:
+                raise ToolError(f"Invalid time range: {e}") from e
+
+    async def fetch(start: datetime, end: datetime) -> list[dict[str, Any]]:
+        trades = []
+        async for _, window_trades in iter_trade_history(
+                public_key, None, None, start, end, timedelta(hours=24), settings.batch_max_concurrency):
+            trades.extend(trade.model_dump() for trade in window_trades)
+        return trades
+
+    try:
+        new_trades = await trade_store.sync(public_key, fetch, force=refresh)
+    except (ToolError, ValidationError) as e:
+        if (await trade_store.run(trade_store.account, public_key))[0] is None:
+            raise
+        logger.warning("Trade history sync of %s failed; answering from the local index: %s", public_key, e)
+        new_trades = 0
+    if ctx:
+        await ctx.info(f"Trade history of {public_key}: {new_trades} new trades synced")
+
+    trades, aggregates = await trade_store.run(
+        trade_store.query, public_key, limit=limit, symbols=symbols, platforms=platforms, tx_signature=tx_signature,
+        start=start_time, end=end_time)
+    synced_at = (await trade_store.run(trade_store.account, public_key))[1]
+    return TradeHistoryQueryResponse(
+        trades=trades,
+        **aggregates,
+        new_trades=new_trades,
+        synced_at=_format_time(datetime.fromtimestamp(synced_at, timezone.utc)) if synced_at else None,
+    )
 
 # --- Liquidations Tools ---
 
@@ -114,7 +432,45 @@ async def get_latest_liquidations(ctx: Context | None = None) -> list[Liquidatio
     if ctx:
         await ctx.info("Fetching latest liquidations")
     response_data = await _call_ranger_data_api("/v1/liquidations/latest")
-    return [Liquidation(**item) for item in response_data]
+    return validate_list(Liquidation, response_data)
+
+
+async def _poll_latest_liquidations() -> list[dict[str, Any]]:
+    # Bypasses the response cache (a cached copy would hide new events) but
+    # shares in-flight requests with data_get_latest_liquidations misses
+    endpoint = "/v1/liquidations/latest"
+    key = ("data", False, *request_key(endpoint, None))
+    rows, _ = await upstream_flights.do(key, lambda: _fetch_ranger_data_api(endpoint))
+    return rows
+
+
+# One poller shared by every feed reader and subscriber (see ranger_mcp.feed)
+liquidation_feed = LiquidationFeed(
+    _poll_latest_liquidations,
+    interval=settings.liquidation_feed_interval,
+    min_interval=settings.liquidation_feed_min_interval,
+    buffer_size=settings.liquidation_feed_buffer,
+    idle_seconds=settings.liquidation_feed_idle_seconds,
+)
+
+
+@data_mcp.tool(name="get_liquidation_feed")
+async def get_liquidation_feed(
+    cursor: int | None = Field(
+        default=None, ge=0, description="Cursor from the previous page; omit for the most recent events"),
+    limit: int = Field(default=100, ge=1, le=1000, description="Maximum events to return"),
+    ctx: Context | None = None
+) -> LiquidationFeedPage:
+    """
+    Returns liquidation events from the hub's shared feed, oldest first. Pass the returned
+    cursor back to get only newer events; nothing is lost between calls unless 'missed' is set.
+    Subscribe to the ranger://liquidations/feed resource to be notified of new events instead of polling.
+    """
+    if ctx:
+        await ctx.info(f"Reading liquidation feed (cursor: {cursor})")
+    page = await liquidation_feed.read(cursor, limit)
+    events = validate_list(Liquidation, page.pop("events"))
+    return LiquidationFeedPage(**page, events=events)
 
 
 @data_mcp.tool(name="get_liquidation_totals")
@@ -123,7 +479,7 @@ async def get_liquidation_totals(ctx: Context | None = None) -> LiquidationTotal
     if ctx:
         await ctx.info("Fetching liquidation totals")
     response_data = await _call_ranger_data_api("/v1/liquidations/totals")
-    return LiquidationTotals(**response_data)
+    return validate_model(LiquidationTotals, response_data)
 
 
 @data_mcp.tool(name="get_liquidation_capitulation_signals")
@@ -140,22 +496,25 @@ async def get_liquidation_capitulation_signals(
     params = {"threshold": threshold}
     params = {k: v for k, v in params.items() if v is not None}
     response_data = await _call_ranger_data_api("/v1/liquidations/capitulation", params=params)
-    return [CapitulationSignal(**item) for item in response_data]
+    return validate_list(CapitulationSignal, response_data)
 
 
 @data_mcp.tool(name="get_liquidation_heatmap")
 async def get_liquidation_heatmap(
     granularity: Literal["15m", "30m", "1h", "4h", "1d"] | None = Field(
         default="1h", description="Time bucket size (default: 1h)"),
+    result_format: ResultFormat = Field(default="rows", alias="format", description=FORMAT_DESCRIPTION),
     ctx: Context | None = None
-) -> list[LiquidationHeatmapEntry]:
+) -> list[LiquidationHeatmapEntry] | ColumnarTable:
     """Provides aggregated liquidation values (USD) bucketed by time granularity over the last 7 days."""
     if ctx:
         await ctx.info(f"Fetching liquidation heatmap (granularity: {granularity})")
     params = {"granularity": granularity}
     params = {k: v for k, v in params.items() if v is not None}
     response_data = await _call_ranger_data_api("/v1/liquidations/heatmap", params=params)
-    return [LiquidationHeatmapEntry(**item) for item in response_data]
+    if result_format == "columnar":
+        return to_columnar(response_data, HEATMAP_COLUMNS)
+    return validate_list(LiquidationHeatmapEntry, response_data)
 
 
 @data_mcp.tool(name="get_largest_liquidations")
@@ -164,15 +523,18 @@ async def get_largest_liquidations(
         default="1d", description="Time window to look back (default: 1d)"),
     limit: int | None = Field(
         default=50, ge=1, description="Maximum number of liquidations to return (default: 50)"),
+    result_format: ResultFormat = Field(default="rows", alias="format", description=FORMAT_DESCRIPTION),
     ctx: Context | None = None
-) -> list[LargestLiquidation]:
+) -> list[LargestLiquidation] | ColumnarTable:
     """Retrieves the largest individual liquidation events within a specified time window."""
     if ctx:
         await ctx.info(f"Fetching largest liquidations (granularity: {granularity}, limit: {limit})")
     params = {"granularity": granularity, "limit": limit}
     params = {k: v for k, v in params.items() if v is not None}
     response_data = await _call_ranger_data_api("/v1/liquidations/largest", params=params)
-    return [LargestLiquidation(**item) for item in response_data]
+    if result_format == "columnar":
+        return to_columnar(response_data, LARGEST_LIQUIDATION_COLUMNS)
+    return validate_list(LargestLiquidation, response_data)
 
 
 # --- Funding & Borrow Rates Tools ---
@@ -189,7 +551,15 @@ async def get_funding_rate_arbs(
     params = {"min_diff": min_diff}
     params = {k: v for k, v in params.items() if v is not None}
     response_data = await _call_ranger_data_api("/v1/funding_rates/arbs", params=params)
-    return [FundingRateArb(**item) for item in response_data]
+    return validate_list(FundingRateArb, response_data)
+
+
+async def _query_rate_series(endpoint: str, params: dict[str, Any]) -> list[dict[str, Any]]:
+    """Serves accumulated rate history from the on-disk store, syncing new rows when due."""
+    if rate_store is None:
+        return await _call_ranger_data_api(endpoint, params=params)
+    return await rate_store.query(
+        endpoint, params, lambda: _call_ranger_data_api(endpoint, params=params))
 
 
 @data_mcp.tool(name="get_accumulated_funding_rates")
@@ -200,16 +570,19 @@ async def get_accumulated_funding_rates(
         default=None, description="Time aggregation level"),
     platform: Platform | None = Field(
         default=None, description="Filter by platform"),
+    result_format: ResultFormat = Field(default="rows", alias="format", description=FORMAT_DESCRIPTION),
     ctx: Context | None = None
-) -> list[AccumulatedRate]:
+) -> list[AccumulatedRate] | ColumnarTable:
     """Retrieves historical accumulated funding rates."""
     if ctx:
         await ctx.info(f"Fetching accumulated funding rates ({symbol=}, {granularity=}, {platform=})")
     params = {"symbol": symbol,
               "granularity": granularity, "platform": platform}
     params = {k: v for k, v in params.items() if v is not None}
-    response_data = await _call_ranger_data_api("/v1/funding_rates/accumulated", params=params)
-    return [AccumulatedRate(**item) for item in response_data]
+    response_data = await _query_rate_series("/v1/funding_rates/accumulated", params)
+    if result_format == "columnar":
+        return to_columnar(response_data, ACCUMULATED_RATE_COLUMNS)
+    return validate_list(AccumulatedRate, response_data)
 
 
 @data_mcp.tool(name="get_accumulated_borrow_rates")
@@ -220,17 +593,20 @@ async def get_accumulated_borrow_rates(
         default=None, description="Time aggregation level"),
     platform: Platform | None = Field(
         default=None, description="Filter by platform"),
+    result_format: ResultFormat = Field(default="rows", alias="format", description=FORMAT_DESCRIPTION),
     ctx: Context | None = None
-) -> list[AccumulatedRate]:
+) -> list[AccumulatedRate] | ColumnarTable:
     """Retrieves historical accumulated borrow rates."""
     if ctx:
         await ctx.info(f"Fetching accumulated borrow rates ({symbol=}, {granularity=}, {platform=})")
     params = {"symbol": symbol,
               "granularity": granularity, "platform": platform}
     params = {k: v for k, v in params.items() if v is not None}
-    response_data = await _call_ranger_data_api("/v1/borrow_rates/accumulated", params=params)
+    response_data = await _query_rate_series("/v1/borrow_rates/accumulated", params)
+    if result_format == "columnar":
+        return to_columnar(response_data, ACCUMULATED_RATE_COLUMNS)
     # Re-use AccumulatedRate model as structure is the same
-    return [AccumulatedRate(**item) for item in response_data]
+    return validate_list(AccumulatedRate, response_data)
 
 
 @data_mcp.tool(name="get_extreme_funding_rates")
@@ -247,7 +623,7 @@ async def get_extreme_funding_rates(
     params = {"granularity": granularity, "limit": limit}
     params = {k: v for k, v in params.items() if v is not None}
     response_data = await _call_ranger_data_api("/v1/funding_rates/extreme", params=params)
-    return ExtremeFundingRates(**response_data)
+    return validate_model(ExtremeFundingRates, response_data)
 
 
 @data_mcp.tool(name="get_oi_weighted_funding_rates")
@@ -256,11 +632,8 @@ async def get_oi_weighted_funding_rates(ctx: Context | None = None) -> list[OiWe
     if ctx:
         await ctx.info("Fetching OI-weighted funding rates")
     response_data = await _call_ranger_data_api("/v1/funding_rates/oi_weighted")
-    # Ensure oi_weighted_funding_rate is a string for each item
-    for item in response_data:
-        if "oi_weighted_funding_rate" in item:
-            item["oi_weighted_funding_rate"] = str(item["oi_weighted_funding_rate"])
-    return [OiWeightedFundingRate(**item) for item in response_data]
+    # oi_weighted_funding_rate is coerced to a string by the model
+    return validate_list(OiWeightedFundingRate, response_data)
 
 
 @data_mcp.tool(name="get_funding_rate_trend")
@@ -277,7 +650,60 @@ async def get_funding_rate_trend(
     params = {"symbol": symbol, "platform": platform}
     params = {k: v for k, v in params.items() if v is not None}
     response_data = await _call_ranger_data_api("/v1/funding_rates/trend", params=params)
-    return [FundingRateTrend(**item) for item in response_data]
+    return validate_list(FundingRateTrend, response_data)
+
+# --- Local Analytics Tools ---
+
+
+@data_mcp.tool(name="scan_capitulation_signals")
+async def scan_capitulation_signals(
+    thresholds: list[float] = Field(
+        default=[2.0], min_length=1, max_length=20, description="Z-score thresholds to evaluate"),
+    windows: list[Annotated[int, Field(ge=1)]] = Field(
+        default=[24], min_length=1, max_length=20, description="Baseline lengths, in heatmap buckets before the latest one"),
+    granularity: Literal["15m", "30m", "1h", "4h", "1d"] = Field(
+        default="1h", description="Heatmap bucket size"),
+    ctx: Context | None = None
+) -> list[CapitulationScan]:
+    """
+    Computes liquidation capitulation signals locally from the liquidation heatmap, for every
+    symbol/platform pair and every threshold x window combination in one call. Use this to
+    compare thresholds and baselines without one request per setting.
+    """
+    if ctx:
+        await ctx.info(f"Scanning capitulation signals ({thresholds=}, {windows=}, {granularity=})")
+    heatmap = await _call_ranger_data_api("/v1/liquidations/heatmap", params={"granularity": granularity})
+    # numpy is only imported by the scan tools, not at startup
+    from ranger_mcp.analytics import scan_capitulation
+    return scan_capitulation(heatmap, windows, thresholds)
+
+
+@data_mcp.tool(name="scan_funding_rate_trends")
+async def scan_funding_rate_trends(
+    thresholds: list[float] = Field(
+        default=[1.0], min_length=1, max_length=20, description="Z-score beyond which a trend is upward/downward"),
+    windows: list[Annotated[int, Field(ge=1)]] = Field(
+        default=[24], min_length=1, max_length=20, description="Baseline lengths, in points before the latest one"),
+    symbol: str | None = Field(
+        default=None, description="Optional market symbol filter (e.g., SOL-PERP). Defaults to all symbols."),
+    platform: Platform | None = Field(
+        default=None, description="Optional platform filter"),
+    granularity: Literal["1h", "4h", "1d"] | None = Field(
+        default=None, description="Time aggregation level of the accumulated rates"),
+    ctx: Context | None = None
+) -> list[FundingTrendScan]:
+    """
+    Computes funding rate trends locally from accumulated funding rate history, for every
+    symbol/platform pair and every threshold x window combination in one call.
+    """
+    if ctx:
+        await ctx.info(f"Scanning funding rate trends ({thresholds=}, {windows=}, {symbol=}, {platform=})")
+    params = {"symbol": symbol, "granularity": granularity, "platform": platform}
+    params = {k: v for k, v in params.items() if v is not None}
+    rates = await _query_rate_series("/v1/funding_rates/accumulated", params)
+    from ranger_mcp.analytics import scan_funding_trends
+    return scan_funding_trends(rates, windows, thresholds)
+
 
 @data_mcp.resource("data://get_positions")
 def resource_get_positions() -> dict:
@@ -287,6 +713,14 @@ def resource_get_positions() -> dict:
         "parameters": ["public_key", "platforms", "symbols", "from_date"]
     }
 
+@data_mcp.resource("data://get_positions_batch")
+def resource_get_positions_batch() -> dict:
+    return {
+        "resource": "get_positions_batch",
+        "description": "Retrieve positions for many accounts in one call, with per-account errors.",
+        "parameters": ["public_keys", "platforms", "symbols", "from_date", "max_concurrency"]
+    }
+
 @data_mcp.resource("data://get_trade_history")
 def resource_get_trade_history() -> dict:
     return {
@@ -295,6 +729,22 @@ def resource_get_trade_history() -> dict:
         "parameters": ["public_key", "platforms", "symbols", "start_time", "end_time"]
     }
 
+@data_mcp.resource("data://query_trade_history")
+def resource_query_trade_history() -> dict:
+    return {
+        "resource": "query_trade_history",
+        "description": "Query an account's trade history from an incrementally synced local index, with realized PnL and fees by venue and symbol.",
+        "parameters": ["public_key", "platforms", "symbols", "tx_signature", "start_time", "end_time", "limit", "refresh"]
+    }
+
+@data_mcp.resource("data://get_trade_history_page")
+def resource_get_trade_history_page() -> dict:
+    return {
+        "resource": "get_trade_history_page",
+        "description": "Retrieve trade history for long time ranges page by page using a cursor, in created_at order.",
+        "parameters": ["public_key", "platforms", "symbols", "start_time", "end_time", "cursor", "window_hours", "windows_per_page", "max_concurrency"]
+    }
+
 @data_mcp.resource("data://get_latest_liquidations")
 def resource_get_latest_liquidations() -> dict:
     return {
@@ -303,6 +753,14 @@ def resource_get_latest_liquidations() -> dict:
         "parameters": []
     }
 
+@data_mcp.resource("data://get_liquidation_feed")
+def resource_get_liquidation_feed() -> dict:
+    return {
+        "resource": "get_liquidation_feed",
+        "description": "Returns liquidation events from the hub's shared feed after a cursor, oldest first.",
+        "parameters": ["cursor", "limit"]
+    }
+
 @data_mcp.resource("data://get_liquidation_totals")
 def resource_get_liquidation_totals() -> dict:
     return {
@@ -324,7 +782,7 @@ def resource_get_liquidation_heatmap() -> dict:
     return {
         "resource": "get_liquidation_heatmap",
         "description": "Provides aggregated liquidation values (USD) bucketed by time granularity over the last 7 days.",
-        "parameters": ["granularity"]
+        "parameters": ["granularity", "format"]
     }
 
 @data_mcp.resource("data://get_largest_liquidations")
@@ -332,7 +790,7 @@ def resource_get_largest_liquidations() -> dict:
     return {
         "resource": "get_largest_liquidations",
         "description": "Retrieves the largest individual liquidation events within a specified time window.",
-        "parameters": ["granularity", "limit"]
+        "parameters": ["granularity", "limit", "format"]
     }
 
 @data_mcp.resource("data://get_funding_rate_arbs")
@@ -348,7 +806,7 @@ def resource_get_accumulated_funding_rates() -> dict:
     return {
         "resource": "get_accumulated_funding_rates",
         "description": "Retrieves historical accumulated funding rates.",
-        "parameters": ["symbol", "granularity", "platform"]
+        "parameters": ["symbol", "granularity", "platform", "format"]
     }
 
 @data_mcp.resource("data://get_accumulated_borrow_rates")
@@ -356,7 +814,7 @@ def resource_get_accumulated_borrow_rates() -> dict:
     return {
         "resource": "get_accumulated_borrow_rates",
         "description": "Retrieves historical accumulated borrow rates.",
-        "parameters": ["symbol", "granularity", "platform"]
+        "parameters": ["symbol", "granularity", "platform", "format"]
     }
 
 @data_mcp.resource("data://get_extreme_funding_rates")
@@ -375,6 +833,22 @@ def resource_get_oi_weighted_funding_rates() -> dict:
         "parameters": []
     }
 
+@data_mcp.resource("data://scan_capitulation_signals")
+def resource_scan_capitulation_signals() -> dict:
+    return {
+        "resource": "scan_capitulation_signals",
+        "description": "Computes liquidation capitulation signals locally for many thresholds and baseline windows at once.",
+        "parameters": ["thresholds", "windows", "granularity"]
+    }
+
+@data_mcp.resource("data://scan_funding_rate_trends")
+def resource_scan_funding_rate_trends() -> dict:
+    return {
+        "resource": "scan_funding_rate_trends",
+        "description": "Computes funding rate trends locally for many thresholds and baseline windows at once.",
+        "parameters": ["thresholds", "windows", "symbol", "platform", "granularity"]
+    }
+
 @data_mcp.resource("data://get_funding_rate_trend")
 def resource_get_funding_rate_trend() -> dict:
     return {
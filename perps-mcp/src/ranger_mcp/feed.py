@@ -0,0 +1,205 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Hashable
+
+from ranger_mcp.metrics import Counter, Gauge, registry
+from ranger_mcp.ratelimit import Priority, priority_lane
+
+logger = logging.getLogger(__name__)
+
+FEED_EVENTS = registry.register(Counter(
+    "ranger_liquidation_feed_events_total", "New liquidation events seen by the feed poller."))
+FEED_GAPS = registry.register(Counter(
+    "ranger_liquidation_feed_gaps_total",
+    "Polls that shared no event with the previous poll, so events may have been missed."))
+FEED_SUBSCRIBERS = registry.register(Gauge(
+    "ranger_liquidation_feed_subscribers", "Sessions subscribed to the liquidation feed."))
+
+Fetch = Callable[[], Awaitable[list[dict[str, Any]]]]
+Notify = Callable[[], Awaitable[None]]
+
+
+class LiquidationFeed:
+    """
+    One shared poller for the latest-liquidations endpoint.
+
+    Every poll is diffed against the event ids already seen. New events get
+    an increasing sequence number and go into a ring buffer, and subscribed
+    sessions are notified, so any number of agents cost one upstream poll.
+    Readers page through the buffer with a cursor (the last sequence number
+    they saw) and miss nothing between their own reads.
+
+    The endpoint only returns the last few events, so a poll that shares no
+    event with the previous one may have missed some: the interval is then
+    halved (down to ``min_interval``) and relaxes back while polls overlap.
+    The poller runs while there are subscribers or the feed was read in the
+    last ``idle_seconds``.
+    """
+
+    def __init__(
+        self,
+        fetch: Fetch,
+        interval: float = 2.0,
+        min_interval: float = 0.5,
+        buffer_size: int = 1000,
+        idle_seconds: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.fetch = fetch
+        self.interval = interval
+        self.min_interval = min(min_interval, interval)
+        self.idle_seconds = idle_seconds
+        self.clock = clock
+        self.events: deque[tuple[int, dict[str, Any]]] = deque(maxlen=buffer_size)
+        self.sequence = 0
+        self.current_interval = interval
+        self.polls = 0
+        self.gaps = 0
+        self.errors = 0
+        # Insertion-ordered set of recent ids, bounded well above one response
+        self._seen: dict[str, None] = {}
+        self._seen_limit = max(2 * buffer_size, 100)
+        self._previous: set[str] = set()
+        self._subscribers: dict[Hashable, Notify] = {}
+        self._read_at = float("-inf")
+        self._task: asyncio.Task | None = None
+        self._ready: asyncio.Future | None = None
+
+    # --- Subscribers ---
+
+    def subscribe(self, subscriber: Hashable, notify: Notify) -> None:
+        """Calls ``notify`` after every poll that found new events."""
+        self._subscribers[subscriber] = notify
+        FEED_SUBSCRIBERS.values[()] = len(self._subscribers)
+        self.start()
+
+    def unsubscribe(self, subscriber: Hashable) -> None:
+        self._subscribers.pop(subscriber, None)
+        FEED_SUBSCRIBERS.values[()] = len(self._subscribers)
+
+    async def _notify(self) -> None:
+        subscribers = list(self._subscribers.items())
+        results = await asyncio.gather(*(notify() for _, notify in subscribers), return_exceptions=True)
+        for (subscriber, _), result in zip(subscribers, results):
+            if isinstance(result, Exception):
+                # The session has gone away without unsubscribing
+                logger.debug("Dropping liquidation feed subscriber: %s", result)
+                self.unsubscribe(subscriber)
+
+    # --- Polling ---
+
+    def _wanted(self) -> bool:
+        return bool(self._subscribers) or self.clock() - self._read_at < self.idle_seconds
+
+    def start(self) -> None:
+        """Starts the poller if it is not running."""
+        if self._task is None or self._task.done():
+            self._ready = asyncio.get_running_loop().create_future()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                with priority_lane(Priority.BACKGROUND):
+                    await self.poll()
+            except Exception as e:
+                # Upstream errors must not stop the feed; the next poll retries
+                self.errors += 1
+                logger.warning("Liquidation feed poll failed: %s", e)
+            if self._ready is not None and not self._ready.done():
+                self._ready.set_result(None)
+            if not self._wanted():
+                return
+            await asyncio.sleep(self.current_interval)
+            if not self._wanted():
+                return
+
+    async def poll(self) -> int:
+        """Fetches once and records new events. Returns how many were new."""
+        rows = await self.fetch()
+        self.polls += 1
+        ids = {row["id"] for row in rows}
+        if self._previous and ids and not ids & self._previous:
+            self.gaps += 1
+            FEED_GAPS.inc()
+            self.current_interval = max(self.min_interval, self.current_interval / 2)
+        else:
+            self.current_interval = min(self.interval, self.current_interval * 1.25)
+        self._previous = ids
+
+        fresh = sorted((row for row in rows if row["id"] not in self._seen), key=lambda row: row["created_at"])
+        for row in fresh:
+            self.sequence += 1
+            self.events.append((self.sequence, row))
+            self._seen[row["id"]] = None
+        while len(self._seen) > self._seen_limit:
+            del self._seen[next(iter(self._seen))]
+        if fresh:
+            FEED_EVENTS.inc(amount=len(fresh))
+            if self._subscribers:
+                await self._notify()
+        return len(fresh)
+
+    async def read(self, cursor: int | None = None, limit: int = 100) -> dict[str, Any]:
+        """
+        Events after ``cursor`` (oldest first), or the latest ``limit`` events
+        without one. Starts the poller and waits for its first poll if needed.
+        """
+        self._read_at = self.clock()
+        self.start()
+        if self._ready is not None and not self._ready.done():
+            await asyncio.shield(self._ready)
+        if cursor is None:
+            cursor = max(0, self.sequence - limit)
+        oldest = self.events[0][0] if self.events else self.sequence + 1
+        # Events between the cursor and the oldest buffered one were evicted
+        missed = 0 < cursor < oldest - 1
+        if cursor > self.sequence:
+            # Issued before a restart reset the sequence: nothing after it would
+            # ever arrive, so start over from the oldest buffered event
+            cursor, missed = 0, True
+        page = [(seq, row) for seq, row in self.events if seq > cursor][:limit]
+        return {
+            "cursor": page[-1][0] if page else cursor,
+            "events": [row for _, row in page],
+            "missed": missed,
+            "latest": self.sequence,
+        }
+
+    async def stop(self) -> None:
+        task, self._task = self._task, None
+        if task is not None and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def reset(self) -> None:
+        """Stops the poller and forgets events, ids and subscribers."""
+        await self.stop()
+        self.events.clear()
+        self.sequence = 0
+        self.current_interval = self.interval
+        self._seen.clear()
+        self._previous = set()
+        self._subscribers.clear()
+        self._read_at = float("-inf")
+        self._ready = None
+        FEED_SUBSCRIBERS.values[()] = 0
+
+    def status(self) -> dict[str, Any]:
+        """Feed state for ranger_status."""
+        return {
+            "polling": self._task is not None and not self._task.done(),
+            "subscribers": len(self._subscribers),
+            "interval_seconds": round(self.current_interval, 3),
+            "buffered": len(self.events),
+            "latest": self.sequence,
+            "polls": self.polls,
+            "gaps": self.gaps,
+            "errors": self.errors,
+        }
+
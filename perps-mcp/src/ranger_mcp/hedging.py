@@ -0,0 +1,195 @@
+import asyncio
+import random
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+from ranger_mcp.metrics import Counter, registry
+from ranger_mcp.settings import settings
+
+# Statuses worth retrying on an idempotent GET: the next attempt may well succeed
+RETRYABLE_STATUSES = frozenset({500, 502, 503, 504})
+
+HEDGES = registry.register(Counter(
+    "ranger_hedges_total", "Hedged Data requests by which request answered first.", ("endpoint", "winner")))
+RETRIES = registry.register(Counter(
+    "ranger_retries_total", "Retried Data requests by reason.", ("endpoint", "reason")))
+
+
+class LatencyTracker:
+    """Recent successful latencies per endpoint, for picking the hedge delay."""
+
+    def __init__(self, window: int = 256, recompute_every: int = 16):
+        self.window = window
+        self.recompute_every = recompute_every
+        self._samples: dict[str, deque[float]] = {}
+        self._pending: dict[str, int] = {}
+        self._percentiles: dict[tuple[str, float], float] = {}
+
+    def observe(self, endpoint: str, seconds: float) -> None:
+        samples = self._samples.get(endpoint)
+        if samples is None:
+            samples = self._samples[endpoint] = deque(maxlen=self.window)
+        samples.append(seconds)
+        self._pending[endpoint] = self._pending.get(endpoint, 0) + 1
+
+    def percentile(self, endpoint: str, q: float, min_samples: int) -> float | None:
+        """The q-quantile of recent latencies, or None with fewer than ``min_samples``."""
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < min_samples:
+            return None
+        key = (endpoint, q)
+        # Sorting the window on every request would cost more than it saves
+        if key not in self._percentiles or self._pending.get(endpoint, 0) >= self.recompute_every:
+            ordered = sorted(samples)
+            self._percentiles[key] = ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+            self._pending[endpoint] = 0
+        return self._percentiles[key]
+
+
+class HedgeBudget:
+    """
+    Every primary request earns ``ratio`` tokens and every hedge spends one,
+    so hedges never exceed ``ratio`` times the primary requests (ratio <= 1
+    means hedging at most doubles upstream load).
+    """
+
+    def __init__(self, ratio: float, burst: float = 10.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+
+    def earn(self) -> None:
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def spend(self) -> bool:
+        if self.tokens < 1.0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+
+Send = Callable[[], Awaitable[httpx.Response]]
+
+
+class Hedger:
+    """Retries with jittered backoff and hedging for idempotent upstream GETs."""
+
+    def __init__(
+        self,
+        retries: int,
+        backoff_base: float,
+        backoff_max: float,
+        hedge_enabled: bool,
+        hedge_percentile: float,
+        hedge_min_samples: int,
+        hedge_budget: float,
+    ):
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.hedge_enabled = hedge_enabled
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.latencies = LatencyTracker()
+        self.budget = HedgeBudget(hedge_budget)
+        self.hedged = 0
+        self.hedges_won = 0
+        self.retried = 0
+
+    def backoff(self, attempt: int) -> float:
+        # "Full jitter": spreads out retries from clients that failed together
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def get(self, endpoint: str, send: Send) -> httpx.Response:
+        """
+        Sends an idempotent request, retrying network errors and 5xx
+        responses. The last response is returned (or the last network error
+        raised) once retries are exhausted.
+        """
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._hedged(endpoint, send)
+            except httpx.TransportError:
+                if attempt == self.retries:
+                    raise
+                reason = "network"
+            else:
+                if response.status_code not in RETRYABLE_STATUSES or attempt == self.retries:
+                    return response
+                reason = str(response.status_code)
+            self.retried += 1
+            RETRIES.inc((endpoint, reason))
+            await asyncio.sleep(self.backoff(attempt))
+        raise AssertionError("unreachable")
+
+    async def _timed(self, endpoint: str, send: Send) -> httpx.Response:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        response = await send()
+        if response.status_code < 400:
+            self.latencies.observe(endpoint, loop.time() - started)
+        return response
+
+    async def _hedged(self, endpoint: str, send: Send) -> httpx.Response:
+        self.budget.earn()
+        delay = None
+        if self.hedge_enabled:
+            delay = self.latencies.percentile(endpoint, self.hedge_percentile, self.hedge_min_samples)
+        if delay is None:
+            return await self._timed(endpoint, send)
+
+        primary = asyncio.ensure_future(self._timed(endpoint, send))
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=delay)
+            if done or not self.budget.spend():
+                return await primary
+
+            self.hedged += 1
+            hedge = asyncio.ensure_future(self._timed(endpoint, send))
+            pending = {primary, hedge}
+            try:
+                while pending:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    # A failed request only counts if the other one fails too
+                    ok = [t for t in done if t.exception() is None and t.result().status_code < 500]
+                    if ok or not pending:
+                        task = ok[0] if ok else done.pop()
+                        if task is hedge:
+                            self.hedges_won += 1
+                        HEDGES.inc((endpoint, "hedge" if task is hedge else "primary"))
+                        return task.result()
+                raise AssertionError("unreachable")
+            finally:
+                for task in pending:
+                    task.cancel()
+        finally:
+            if not primary.done():
+                primary.cancel()
+
+    def reset(self) -> None:
+        """Forgets learned latencies and the hedge budget."""
+        self.latencies = LatencyTracker()
+        self.budget = HedgeBudget(self.budget.ratio)
+
+    def status(self) -> dict[str, Any]:
+        """Retry and hedging counters for ranger_status."""
+        return {
+            "retries": self.retried,
+            "hedged": self.hedged,
+            "hedges_won": self.hedges_won,
+            "hedge_budget_tokens": round(self.budget.tokens, 2),
+        }
+
+
+# Used for Data API GETs only; SOR calls are POSTs and are never duplicated
+data_hedger = Hedger(
+    retries=settings.data_retries,
+    backoff_base=settings.data_retry_backoff_base,
+    backoff_max=settings.data_retry_backoff_max,
+    hedge_enabled=settings.hedge_enabled,
+    hedge_percentile=settings.hedge_percentile,
+    hedge_min_samples=settings.hedge_min_samples,
+    hedge_budget=settings.hedge_budget,
+)
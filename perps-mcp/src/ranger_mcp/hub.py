@@ -1,13 +1,134 @@
+import importlib
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
+
 import fastmcp
 from fastmcp import FastMCP
-from ranger_mcp.sor import sor_mcp
-from ranger_mcp.data import data_mcp
+from pydantic import AnyUrl
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
 from ranger_mcp.settings import settings
+from ranger_mcp.clients import upstream_clients
+from ranger_mcp import metrics
+
+# Resource URI clients subscribe to for new-liquidation notifications
+FEED_URI = "ranger://liquidations/feed"
+
+
+class RangerHub(FastMCP):
+    """
+    FastMCP server that records metrics for every tool call, serves them at
+    /metrics, and accepts subscriptions to the liquidation feed resource.
+
+    Sub-servers added with ``mount_lazy`` are imported on first use, so that
+    importing the hub (e.g. for each stdio spawn) does not pay for building
+    every tool schema and model up front.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lazy_mounts: dict[str, str] = {}
+
+    def mount_lazy(self, prefix: str, target: str) -> None:
+        """Mounts the server at ``target`` ("module:attribute") on ``prefix`` when first needed."""
+        self._lazy_mounts[prefix] = target
+
+    def load_mounts(self) -> None:
+        """Imports and mounts any sub-servers that are still pending."""
+        pending, self._lazy_mounts = self._lazy_mounts, {}
+        for prefix, target in pending.items():
+            module, _, attribute = target.partition(":")
+            self.mount(prefix, getattr(importlib.import_module(module), attribute))
+
+    async def get_tools(self) -> dict:
+        self.load_mounts()
+        return await super().get_tools()
+
+    async def get_resources(self) -> dict:
+        self.load_mounts()
+        return await super().get_resources()
+
+    async def get_resource_templates(self) -> dict:
+        self.load_mounts()
+        return await super().get_resource_templates()
+
+    async def get_prompts(self) -> dict:
+        self.load_mounts()
+        return await super().get_prompts()
+
+    # The _mcp_* handlers are private to FastMCP; pyproject pins fastmcp to the tested 2.2.x
+    async def _mcp_read_resource(self, uri: AnyUrl | str) -> list:
+        self.load_mounts()
+        return await super()._mcp_read_resource(uri)
+
+    async def _mcp_get_prompt(self, name: str, arguments: dict[str, Any] | None = None) -> Any:
+        self.load_mounts()
+        return await super()._mcp_get_prompt(name, arguments)
+
+    def _setup_handlers(self) -> None:
+        super()._setup_handlers()
+        self._mcp_server.subscribe_resource()(self._mcp_subscribe_resource)
+        self._mcp_server.unsubscribe_resource()(self._mcp_unsubscribe_resource)
+        # The low-level server always advertises subscribe=False
+        get_capabilities = self._mcp_server.get_capabilities
+
+        def capabilities_with_subscribe(*args, **kwargs):
+            capabilities = get_capabilities(*args, **kwargs)
+            if capabilities.resources is not None:
+                capabilities.resources.subscribe = True
+            return capabilities
+        self._mcp_server.get_capabilities = capabilities_with_subscribe
+
+    async def _mcp_subscribe_resource(self, uri: AnyUrl) -> None:
+        if str(uri) != FEED_URI:
+            raise ValueError(f"Subscriptions are only supported for {FEED_URI}")
+        context = self._mcp_server.request_context
+        session = context.session
+        # Remembered so the subscription ends with the session (see _hub_lifespan)
+        context.lifespan_context["session"] = session
+        from ranger_mcp.data import liquidation_feed
+        liquidation_feed.subscribe(session, lambda: session.send_resource_updated(AnyUrl(FEED_URI)))
+
+    async def _mcp_unsubscribe_resource(self, uri: AnyUrl) -> None:
+        if str(uri) == FEED_URI:
+            from ranger_mcp.data import liquidation_feed
+            liquidation_feed.unsubscribe(self._mcp_server.request_context.session)
+
+    async def _mcp_call_tool(self, key: str, arguments: dict[str, Any]) -> list:
+        # Every tool call, including those routed to mounted servers, enters here
+        self.load_mounts()
+        with metrics.track_tool(key):
+            return await super()._mcp_call_tool(key, arguments)
+
+    def sse_app(self) -> Starlette:
+        # A long-running server loads everything before accepting connections
+        self.load_mounts()
+        app = super().sse_app()
+        app.add_route("/metrics", _prometheus_metrics, methods=["GET"])
+        return app
+
+
+async def _prometheus_metrics(request: Request) -> PlainTextResponse:
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+
+@asynccontextmanager
+async def _hub_lifespan(server: FastMCP) -> AsyncIterator[dict[str, Any]]:
+    """Entered once per client session."""
+    async with upstream_clients.lifespan(server) as context:
+        try:
+            yield context
+        finally:
+            if "session" in context:
+                from ranger_mcp.data import liquidation_feed
+                liquidation_feed.unsubscribe(context["session"])
+
 
 # Main Ranger MCP Hub Server instance
 # You can add dependencies needed by *any* mounted server here,
 # or manage them within each sub-server's FastMCP definition.
-ranger_mcp = FastMCP(
+ranger_mcp = RangerHub(
     "RangerFinance",
     instructions=(
         "This server allows interaction with Ranger Finance APIs. "
@@ -17,12 +138,22 @@ ranger_mcp = FastMCP(
     ),
     # Example of adding dependencies needed by sub-servers if not defined there
     # dependencies=["httpx>=0.25.0", "pydantic-settings>=2.0.0"]
+    # The hub owns the pooled upstream HTTP clients shared by both sub-servers
+    lifespan=_hub_lifespan,
 )
 
 # Mount the SOR and Data sub-servers
 # We use simple prefixes 'sor' and 'data'
-ranger_mcp.mount("sor", sor_mcp)
-ranger_mcp.mount("data", data_mcp)
+ranger_mcp.mount_lazy("sor", "ranger_mcp.sor:sor_mcp")
+ranger_mcp.mount_lazy("data", "ranger_mcp.data:data_mcp")
+
+
+@ranger_mcp.resource(FEED_URI, mime_type="application/json")
+async def liquidation_feed_resource() -> dict:
+    """The most recent liquidation events. Subscribe to be notified when new ones arrive."""
+    from ranger_mcp.data import liquidation_feed
+    return await liquidation_feed.read()
+
 
 # Optional: Add a top-level status tool for the hub
 
@@ -30,10 +161,27 @@ ranger_mcp.mount("data", data_mcp)
 @ranger_mcp.tool()
 async def ranger_status() -> dict:
     """Checks the status of the Ranger MCP Hub and base URLs."""
+    from ranger_mcp.cache import response_cache
+    from ranger_mcp.singleflight import upstream_flights
+    from ranger_mcp.ratelimit import rate_limiter
+    from ranger_mcp.hedging import data_hedger
+    from ranger_mcp.data import liquidation_feed
+    from ranger_mcp.quote_cache import quote_cache
+    from ranger_mcp.cassette import cassette
     # Simple check, could be enhanced to ping API endpoints
     return {
         "status": "OK",
         "sor_base_url": str(settings.sor_base_url),
         "data_base_url": str(settings.data_base_url),
-        "fastmcp_version": fastmcp.__version__
+        "fastmcp_version": fastmcp.__version__,
+        "upstream_pools": upstream_clients.status(),
+        "cache": response_cache.stats(),
+        "prefetch": response_cache.prefetcher.status() if response_cache.prefetcher else None,
+        "quote_cache": quote_cache.stats(),
+        "coalescing": upstream_flights.stats(),
+        "rate_limiter": rate_limiter.status(),
+        "data_retries": data_hedger.status(),
+        "liquidation_feed": liquidation_feed.status(),
+        "cassette": cassette.status(),
+        "metrics": metrics.summary(),
     }
@@ -0,0 +1,243 @@
+import asyncio
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Iterator
+
+# Latency buckets in seconds, from sub-millisecond hub overhead to slow upstream calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+Labels = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: tuple[str, ...], values: Labels, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = label_names
+
+    def header(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, help, label_names)
+        self.values: dict[Labels, float] = {}
+
+    def inc(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        return self.header() + [
+            f"{self.name}{_label_text(self.label_names, labels)} {value:g}"
+            for labels, value in sorted(self.values.items())]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Labels = (), amount: float = 1.0) -> None:
+        self.inc(labels, -amount)
+
+
+class _Series:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int):
+        self.counts = [0] * size  # Per bucket, not cumulative; last is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, label_names: tuple[str, ...] = (),
+                 buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, help, label_names)
+        self.buckets = buckets
+        self.series: dict[Labels, _Series] = {}
+
+    def observe(self, labels: Labels, value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = _Series(len(self.buckets) + 1)
+        series.counts[bisect_left(self.buckets, value)] += 1
+        series.sum += value
+        series.count += 1
+
+    def quantile(self, labels: Labels, q: float) -> float | None:
+        """Estimates a quantile by interpolating inside the bucket that holds it."""
+        series = self.series.get(labels)
+        if not series or not series.count:
+            return None
+        rank = q * series.count
+        seen = 0
+        for i, count in enumerate(series.counts):
+            if count and seen + count >= rank:
+                lower = self.buckets[i - 1] if i else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / count
+            seen += count
+        return self.buckets[-1]
+
+    def render(self) -> list[str]:
+        lines = self.header()
+        for labels, series in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, "+Inf"), series.counts):
+                cumulative += count
+                le = f'le="{bound if isinstance(bound, str) else f"{bound:g}"}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.label_names, labels, le)} {cumulative}")
+            label_text = _label_text(self.label_names, labels)
+            lines.append(f"{self.name}_sum{label_text} {series.sum:g}")
+            lines.append(f"{self.name}_count{label_text} {series.count}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self.metrics: list[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self.metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: list[str] = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+TOOL_DURATION = registry.register(Histogram(
+    "ranger_tool_duration_seconds", "Tool call latency, including upstream calls.", ("tool",)))
+TOOL_CALLS = registry.register(Counter(
+    "ranger_tool_calls_total", "Tool calls by outcome (ok or error).", ("tool", "outcome")))
+TOOL_IN_FLIGHT = registry.register(Gauge(
+    "ranger_tool_in_flight", "Tool calls currently executing.", ("tool",)))
+UPSTREAM_DURATION = registry.register(Histogram(
+    "ranger_upstream_duration_seconds", "Upstream HTTP request latency.", ("upstream", "endpoint")))
+UPSTREAM_REQUESTS = registry.register(Counter(
+    "ranger_upstream_requests_total",
+    "Upstream HTTP requests by response status ('network' when no response arrived, 'cancelled' when abandoned).",
+    ("upstream", "endpoint", "status")))
+UPSTREAM_IN_FLIGHT = registry.register(Gauge(
+    "ranger_upstream_in_flight", "Upstream HTTP requests currently open.", ("upstream",)))
+UPSTREAM_BYTES = registry.register(Counter(
+    "ranger_upstream_bytes_total", "Upstream request and response body bytes.", ("upstream", "direction")))
+VALIDATION_DURATION = registry.register(Histogram(
+    "ranger_validation_duration_seconds", "Time spent validating upstream payloads into models.", ("model",)))
+
+
+@contextmanager
+def track_tool(tool: str) -> Iterator[None]:
+    labels = (tool,)
+    TOOL_IN_FLIGHT.inc(labels)
+    started = time.perf_counter()
+    outcome = "error"
+    try:
+        yield
+        outcome = "ok"
+    finally:
+        TOOL_DURATION.observe(labels, time.perf_counter() - started)
+        TOOL_CALLS.inc((tool, outcome))
+        TOOL_IN_FLIGHT.dec(labels)
+
+
+class UpstreamCall:
+    """Filled in by the caller while an upstream request is tracked."""
+    __slots__ = ("status", "sent", "received")
+
+    def __init__(self):
+        self.status = "network"
+        self.sent = 0
+        self.received = 0
+
+
+@contextmanager
+def track_upstream(upstream: str, endpoint: str) -> Iterator[UpstreamCall]:
+    call = UpstreamCall()
+    UPSTREAM_IN_FLIGHT.inc((upstream,))
+    started = time.perf_counter()
+    try:
+        yield call
+    except asyncio.CancelledError:
+        call.status = "cancelled"  # e.g. the losing request of a hedged pair
+        raise
+    finally:
+        UPSTREAM_DURATION.observe((upstream, endpoint), time.perf_counter() - started)
+        UPSTREAM_REQUESTS.inc((upstream, endpoint, str(call.status)))
+        UPSTREAM_IN_FLIGHT.dec((upstream,))
+        if call.sent:
+            UPSTREAM_BYTES.inc((upstream, "sent"), call.sent)
+        if call.received:
+            UPSTREAM_BYTES.inc((upstream, "received"), call.received)
+
+
+@contextmanager
+def track_validation(model: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        VALIDATION_DURATION.observe((model,), time.perf_counter() - started)
+
+
+def _latency_summary(histogram: Histogram, labels: Labels) -> dict[str, float | None]:
+    series = histogram.series[labels]
+    ms = lambda seconds: round(seconds * 1000, 3) if seconds is not None else None  # noqa: E731
+    return {
+        "count": series.count,
+        "mean_ms": ms(series.sum / series.count) if series.count else None,
+        "p50_ms": ms(histogram.quantile(labels, 0.5)),
+        "p95_ms": ms(histogram.quantile(labels, 0.95)),
+        "p99_ms": ms(histogram.quantile(labels, 0.99)),
+    }
+
+
+def summary() -> dict:
+    """Compact view of the metrics for the ranger_status tool."""
+    tools = {}
+    for (tool,) in TOOL_DURATION.series:
+        tools[tool] = {
+            **_latency_summary(TOOL_DURATION, (tool,)),
+            "errors": int(TOOL_CALLS.values.get((tool, "error"), 0)),
+            "in_flight": int(TOOL_IN_FLIGHT.values.get((tool,), 0)),
+        }
+    upstream: dict[str, dict] = {}
+    for upstream_name, endpoint in UPSTREAM_DURATION.series:
+        statuses = {
+            status: int(count) for (name, path, status), count in UPSTREAM_REQUESTS.values.items()
+            if name == upstream_name and path == endpoint}
+        upstream.setdefault(upstream_name, {})[endpoint] = {
+            **_latency_summary(UPSTREAM_DURATION, (upstream_name, endpoint)),
+            "statuses": statuses,
+        }
+    return {
+        "tools": tools,
+        "upstream": upstream,
+        "upstream_in_flight": {name: int(v) for (name,), v in UPSTREAM_IN_FLIGHT.values.items()},
+        "upstream_bytes": {f"{name}_{direction}": int(v) for (name, direction), v in UPSTREAM_BYTES.values.items()},
+        "validation": {model: _latency_summary(VALIDATION_DURATION, (model,)) for (model,) in VALIDATION_DURATION.series},
+    }
@@ -0,0 +1,367 @@
+"""
+Local stand-in for the Ranger SOR and Data APIs.
+
+Serves every endpoint used by ranger_mcp.sor and ranger_mcp.data with
+synthetic, deterministic payloads, plus configurable latency, payload size
+and error injection. One app serves both APIs, so point both base URLs at it:
+
+    python -m ranger_mcp.mock_api --port 8765 --latency-ms 20 --rows 200
+    RANGER_SOR_BASE_URL=http://127.0.0.1:8765 RANGER_DATA_BASE_URL=http://127.0.0.1:8765 ranger-mcp
+
+The configuration can be changed at runtime with ``POST /_mock/config``
+(a JSON object of MockConfig fields); ``GET /_mock/stats`` returns request
+counts per path.
+"""
+import argparse
+import asyncio
+import base64
+import random
+import time
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass, field, fields
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable
+
+from starlette.applications import Starlette
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+TIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+SYMBOLS = ["SOL-PERP", "BTC-PERP", "ETH-PERP", "JUP-PERP", "WIF-PERP", "BONK-PERP"]
+PLATFORMS = ["DRIFT", "FLASH", "JUPITER"]
+VENUES = ["Jupiter", "Flash", "Drift"]
+BASE_PRICES = {"SOL": 150.0, "BTC": 65000.0, "ETH": 3000.0}
+
+
+@dataclass
+class MockConfig:
+    latency_ms: float = 0.0  # Added to every response
+    jitter_ms: float = 0.0  # Uniform extra latency in [0, jitter_ms)
+    rows: int = 50  # Rows per list payload
+    error_rate: float = 0.0  # Probability of answering with error_status
+    error_status: int = 500
+    retry_after: float = 1.0  # Retry-After header on injected 429s
+    rate_limit: float = 0.0  # Requests/second served before answering 429 (0 = unlimited)
+    api_key: str | None = None  # Required x-api-key value, if set
+    seed: int = 0
+    endpoint_latency_ms: dict[str, float] = field(default_factory=dict)  # Per-path overrides
+
+
+def _ts(value: datetime) -> str:
+    return value.strftime(TIME_FORMAT)
+
+
+def _parse_time(value: str | None, default: datetime) -> datetime:
+    if not value:
+        return default
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _rng(config: MockConfig, request: Request) -> random.Random:
+    # Same request, same payload: keeps benchmark runs comparable
+    return random.Random(config.seed ^ zlib.crc32(str(request.url.path + "?" + request.url.query).encode()))
+
+
+def _hours_ago(rows: int) -> list[datetime]:
+    now = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    return [now - timedelta(hours=rows - 1 - i) for i in range(rows)]
+
+
+# --- Data API payloads ---
+
+
+def _positions(rng: random.Random, config: MockConfig, query) -> Any:
+    symbols = query.getlist("symbols") or SYMBOLS
+    platforms = query.getlist("platforms") or PLATFORMS
+    positions = []
+    for i in range(config.rows):
+        opened = _ts(datetime.now(timezone.utc) - timedelta(hours=i))
+        positions.append({
+            "id": f"pos-{i}", "symbol": symbols[i % len(symbols)], "side": rng.choice(["Long", "Short"]),
+            "quantity": round(rng.uniform(0.1, 10), 4), "entry_price": round(rng.uniform(10, 200), 4),
+            "liquidation_price": round(rng.uniform(5, 100), 4), "position_leverage": rng.choice([1.0, 2.0, 5.0]),
+            "real_collateral": round(rng.uniform(10, 1000), 2), "borrow_fee": 0.0,
+            "funding_fee": round(rng.uniform(-1, 1), 6), "open_fee": 0.1, "close_fee": 0.0,
+            "created_at": opened, "opened_at": opened, "platform": platforms[i % len(platforms)],
+        })
+    return {"positions": positions}
+
+
+def _trade_history(rng: random.Random, config: MockConfig, query) -> Any:
+    end = _parse_time(query.get("end_time"), datetime.now(timezone.utc))
+    start = _parse_time(query.get("start_time"), end - timedelta(days=30))
+    symbols = query.getlist("symbols") or SYMBOLS
+    platforms = query.getlist("platforms") or PLATFORMS
+    step = (end - start) / max(config.rows, 1)
+    trades = []
+    for i in range(config.rows):
+        created = _ts(start + step * i)
+        trades.append({
+            # Ids derive from the timestamp so overlapping windows agree
+            "id": f"trade-{created}-{i % len(symbols)}", "symbol": symbols[i % len(symbols)],
+            "side": rng.choice(["Long", "Short"]), "quantity": round(rng.uniform(0.1, 10), 4),
+            "entry_price": round(rng.uniform(10, 200), 4), "fill_price": round(rng.uniform(10, 200), 4),
+            "position_leverage": 2.0, "realized_pnl": round(rng.gauss(0, 5), 4),
+            "fees_paid": round(rng.uniform(0, 1), 4), "order_type": "market",
+            "order_action": rng.choice(["open", "close"]), "is_closed": rng.random() < 0.5,
+            "created_at": created, "opened_at": created, "platform": platforms[i % len(platforms)],
+            "tx_signature": f"sig-{created}-{i}",
+        })
+    return {"trades": list(reversed(trades))}
+
+
+def _latest_liquidations(rng: random.Random, config: MockConfig, query) -> Any:
+    now = datetime.now(timezone.utc)
+    return [{
+        "id": f"liq-{int(now.timestamp())}-{i}", "market_id": rng.choice(SYMBOLS),
+        "user_account": f"user{rng.randrange(10_000)}", "liquidator": f"liquidator{rng.randrange(100)}",
+        "platform": rng.choice(PLATFORMS), "quantity": round(rng.uniform(0.1, 100), 4),
+        "price": round(rng.uniform(1, 200), 4), "created_at": _ts(now - timedelta(seconds=i)),
+        "liquidator_reward": round(rng.uniform(0, 10), 4), "insurance_fund_fee": 0.0,
+    } for i in range(config.rows)]
+
+
+def _liquidation_totals(rng: random.Random, config: MockConfig, query) -> Any:
+    base = rng.uniform(1e4, 1e5)
+    return {"last_1h": base, "last_4h": base * 3, "last_12h": base * 8, "last_24h": base * 15}
+
+
+def _capitulation(rng: random.Random, config: MockConfig, query) -> Any:
+    return [{
+        "symbol": SYMBOLS[i % len(SYMBOLS)], "platform": PLATFORMS[i % len(PLATFORMS)],
+        "z_score": round(rng.gauss(2.5, 0.5), 4), "total_liquidated": round(rng.uniform(1e4, 1e6), 2),
+        "mean_liquidation": round(rng.uniform(1e3, 1e4), 2), "std_dev": round(rng.uniform(1e2, 1e3), 2),
+    } for i in range(min(config.rows, len(SYMBOLS) * len(PLATFORMS)))]
+
+
+def _heatmap(rng: random.Random, config: MockConfig, query) -> Any:
+    pairs = [(s, p) for s in SYMBOLS for p in PLATFORMS]
+    return [{
+        "symbol": symbol, "platform": platform, "start": _ts(start),
+        "total_liquidated_usd": round(rng.expovariate(1 / 5000), 2),
+    } for start in _hours_ago(max(config.rows // len(pairs), 1)) for symbol, platform in pairs]
+
+
+def _largest(rng: random.Random, config: MockConfig, query) -> Any:
+    rows = min(config.rows, int(query.get("limit") or config.rows))
+    now = datetime.now(timezone.utc)
+    return [{
+        "symbol": rng.choice(SYMBOLS), "platform": rng.choice(PLATFORMS),
+        "timestamp": _ts(now - timedelta(minutes=i)), "quantity": round(rng.uniform(1, 1000), 4),
+        "price": round(rng.uniform(1, 200), 4), "value_usd": round(rng.uniform(1e4, 1e6), 2),
+        "liquidator_reward": round(rng.uniform(1, 100), 4),
+    } for i in range(rows)]
+
+
+def _arbs(rng: random.Random, config: MockConfig, query) -> Any:
+    arbs = []
+    for i in range(min(config.rows, len(SYMBOLS) * 3)):
+        rate_a, rate_b = rng.gauss(0, 1e-4), rng.gauss(0, 1e-4)
+        arbs.append({
+            "symbol": SYMBOLS[i % len(SYMBOLS)], "platform_a": PLATFORMS[i % 3], "rate_a": rate_a,
+            "platform_b": PLATFORMS[(i + 1) % 3], "rate_b": rate_b, "rate_diff": abs(rate_a - rate_b),
+        })
+    return arbs
+
+
+def _accumulated(rng: random.Random, config: MockConfig, query) -> Any:
+    symbols = [query["symbol"]] if query.get("symbol") else SYMBOLS
+    platforms = [query["platform"]] if query.get("platform") else PLATFORMS
+    pairs = [(s, p) for s in symbols for p in platforms]
+    granularity = query.get("granularity") or "1h"
+    return [{
+        "platform": platform, "symbol": symbol, "created_at": _ts(created),
+        "accumulated_rate": rng.gauss(1e-4, 5e-5), "base_granularity": granularity,
+    } for created in _hours_ago(max(config.rows // len(pairs), 1)) for symbol, platform in pairs]
+
+
+def _extreme(rng: random.Random, config: MockConfig, query) -> Any:
+    rows = _accumulated(rng, config, query)
+    rows.sort(key=lambda row: row["accumulated_rate"])
+    limit = int(query.get("limit") or 5)
+    return {"highest": rows[::-1][:limit], "lowest": rows[:limit]}
+
+
+def _oi_weighted(rng: random.Random, config: MockConfig, query) -> Any:
+    now = _ts(datetime.now(timezone.utc))
+    return [{
+        "symbol": symbol, "funding_rate_updated_at": now, "open_interest_updated_at": now,
+        "oi_weighted_funding_rate": rng.gauss(1e-4, 5e-5),
+    } for symbol in SYMBOLS]
+
+
+def _trend(rng: random.Random, config: MockConfig, query) -> Any:
+    platforms = [query["platform"]] if query.get("platform") else PLATFORMS
+    return [{
+        "symbol": query.get("symbol") or "SOL-PERP", "platform": platform, "mean": 1e-4,
+        "std_dev": 2e-5, "z_score": round(rng.gauss(0, 1.5), 4),
+        "trend": rng.choice(["flat", "upward", "downward"]), "latest": rng.gauss(1e-4, 2e-5),
+    } for platform in platforms]
+
+
+# --- SOR API payloads ---
+
+
+def _quote(rng: random.Random, body: dict[str, Any]) -> dict[str, Any]:
+    size = float(body.get("size") or 1.0)
+    collateral = float(body.get("collateral") or size * 10)
+    venues = body.get("target_venues") or VENUES[:2]
+    price = BASE_PRICES.get(body.get("symbol", "SOL"), 100.0) * rng.uniform(0.999, 1.001)
+    allocations = []
+    for venue in venues:
+        share = size / len(venues)
+        unit = price * (1 + 0.0005 * share)
+        allocations.append({
+            "venue_name": venue, "collateral": collateral / len(venues), "size": share,
+            "quote": {"base": price, "total": unit, "fee_breakdown": {"base_fee": 0.0005 * price}},
+            "price": unit, "order_available_liquidity": size * 10, "venue_available_liquidity": size * 100,
+        })
+    average = sum(a["quote"]["total"] * a["size"] for a in allocations) / size
+    return {"venues": allocations, "total_collateral": collateral, "total_size": size, "average_price": average}
+
+
+def _transaction(rng: random.Random, body: dict[str, Any]) -> dict[str, Any]:
+    meta = _quote(rng, body)
+    message = base64.b64encode(rng.randbytes(600)).decode()
+    return {"message": message, "meta": meta, "average_price": meta["average_price"], "size": meta["total_size"]}
+
+
+def _withdraw(rng: random.Random, body: dict[str, Any]) -> dict[str, Any]:
+    return {"message": base64.b64encode(rng.randbytes(400)).decode()}
+
+
+DATA_ENDPOINTS: dict[str, Callable[[random.Random, MockConfig, Any], Any]] = {
+    "/v1/positions": _positions,
+    "/v1/trade_history": _trade_history,
+    "/v1/liquidations/latest": _latest_liquidations,
+    "/v1/liquidations/totals": _liquidation_totals,
+    "/v1/liquidations/capitulation": _capitulation,
+    "/v1/liquidations/heatmap": _heatmap,
+    "/v1/liquidations/largest": _largest,
+    "/v1/funding_rates/arbs": _arbs,
+    "/v1/funding_rates/accumulated": _accumulated,
+    "/v1/borrow_rates/accumulated": _accumulated,
+    "/v1/funding_rates/extreme": _extreme,
+    "/v1/funding_rates/oi_weighted": _oi_weighted,
+    "/v1/funding_rates/trend": _trend,
+}
+
+SOR_ENDPOINTS: dict[str, Callable[[random.Random, dict[str, Any]], Any]] = {
+    "/v1/order_metadata": _quote,
+    "/v1/increase_position": _transaction,
+    "/v1/decrease_position": _transaction,
+    "/v1/close_position": _transaction,
+    "/v1/withdraw_balance": _withdraw,
+}
+
+
+class _CollapseSlashes:
+    """Base URLs end in '/', so upstream paths arrive as '//v1/...'."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith("//"):
+            scope = {**scope, "path": "/" + scope["path"].lstrip("/")}
+        await self.app(scope, receive, send)
+
+
+def create_mock_api(config: MockConfig | None = None) -> Starlette:
+    """Builds the mock API app. ``app.state.config`` and ``app.state.requests`` can be inspected and changed."""
+    config = config or MockConfig()
+    requests: Counter[str] = Counter()
+    errors = random.Random(config.seed)
+    window = {"start": 0.0, "count": 0}  # Fixed one-second window for rate_limit
+
+    async def simulate(request: Request) -> JSONResponse | None:
+        """Applies latency and auth/error injection; returns an error response if one is due."""
+        path = request.url.path
+        requests[path] += 1
+        latency = config.endpoint_latency_ms.get(path, config.latency_ms)
+        if config.jitter_ms:
+            latency += errors.uniform(0, config.jitter_ms)
+        if latency > 0:
+            await asyncio.sleep(latency / 1000)
+        if config.rate_limit:
+            now = time.monotonic()
+            if now - window["start"] >= 1.0:
+                window["start"], window["count"] = now, 0
+            window["count"] += 1
+            if window["count"] > config.rate_limit:
+                retry_after = round(window["start"] + 1.0 - now, 3)
+                return JSONResponse({"message": "Rate limit exceeded"}, status_code=429,
+                                    headers={"Retry-After": str(retry_after)})
+        if config.api_key and request.headers.get("x-api-key") != config.api_key:
+            return JSONResponse({"message": "Missing or invalid API key"}, status_code=401)
+        if config.error_rate and errors.random() < config.error_rate:
+            headers = {"Retry-After": str(config.retry_after)} if config.error_status == 429 else None
+            return JSONResponse({"message": "Injected error"}, status_code=config.error_status, headers=headers)
+        return None
+
+    def data_route(path: str, build: Callable) -> Route:
+        async def endpoint(request: Request) -> JSONResponse:
+            return await simulate(request) or JSONResponse(build(_rng(config, request), config, request.query_params))
+        return Route(path, endpoint, methods=["GET"])
+
+    def sor_route(path: str, build: Callable) -> Route:
+        async def endpoint(request: Request) -> JSONResponse:
+            error = await simulate(request)
+            if error:
+                return error
+            body = await request.json()
+            if not isinstance(body, dict) or "fee_payer" not in body:
+                return JSONResponse({"message": "fee_payer is required"}, status_code=400)
+            rng = random.Random(config.seed ^ zlib.crc32(repr(sorted(body.items())).encode()))
+            return JSONResponse(build(rng, body))
+        return Route(path, endpoint, methods=["POST"])
+
+    async def get_config(request: Request) -> JSONResponse:
+        if request.method == "POST":
+            known = {f.name for f in fields(MockConfig)}
+            for name, value in (await request.json()).items():
+                if name in known:
+                    setattr(config, name, value)
+        return JSONResponse(asdict(config))
+
+    async def get_stats(request: Request) -> JSONResponse:
+        return JSONResponse({"requests": dict(requests), "total": sum(requests.values())})
+
+    routes = [data_route(path, build) for path, build in DATA_ENDPOINTS.items()]
+    routes += [sor_route(path, build) for path, build in SOR_ENDPOINTS.items()]
+    routes += [
+        Route("/_mock/config", get_config, methods=["GET", "POST"]),
+        Route("/_mock/stats", get_stats, methods=["GET"]),
+    ]
+    app = Starlette(routes=routes, middleware=[Middleware(_CollapseSlashes)])
+    app.state.config = config
+    app.state.requests = requests
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run the local mock Ranger SOR/Data API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--rows", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Requests/second before answering 429")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    config = MockConfig(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, rows=args.rows,
+        error_rate=args.error_rate, error_status=args.error_status, rate_limit=args.rate_limit, seed=args.seed)
+    uvicorn.run(create_mock_api(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
+from array import array
 from typing import Annotated, Any, Literal
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, ConfigDict, Field, field_serializer, validator
 
 # --- SOR Models ---
 
@@ -15,6 +16,7 @@ AdjustmentTypeCollateral = Literal["DepositCollateralFlash", "DepositCollateralJ
                                    "DepositCollateralDrift", "WithdrawCollateralFlash", "WithdrawCollateralJupiter", "WithdrawCollateralDrift"]
 # Currently only Drift supported by API
 AdjustmentTypeWithdraw = Literal["WithdrawBalanceDrift"]
+Venue = Literal["Jupiter", "Flash", "Drift"]
 
 
 class QuoteParams(BaseModel):
@@ -125,6 +127,7 @@ class QuoteResponse(BaseModel):
     total_collateral: float
     total_size: float
     average_price: float
+    age_ms: int = 0  # Set when served from the quote cache
 
 
 class SorApiResponse(BaseModel):
@@ -133,6 +136,71 @@ class SorApiResponse(BaseModel):
     average_price: float | None = None  # Present in increase/decrease/close
     size: float | None = None  # Present in increase/decrease/close
 
+
+class QuoteAndBuildResponse(BaseModel):
+    message: str  # Base64 encoded transaction message, built at the quote below
+    quote: QuoteResponse
+    average_price: float | None = None
+    size: float | None = None
+    expected_price: float | None = None
+    # How much worse than expected_price the fill is (negative when better)
+    price_deviation_bps: float | None = None
+
+
+class BuildLegResult(BaseModel):
+    adjustment_type: str
+    symbol: SizeDenomination
+    side: TradingSide
+    fee_payer: str
+    message: str | None = None  # Base64 encoded transaction message; None when the leg failed
+    average_price: float | None = None
+    size: float | None = None
+    error: str | None = None
+
+
+class BuildBatchResponse(BaseModel):
+    results: list[BuildLegResult]  # Same order as the requested legs
+    succeeded: int
+    failed: int
+
+
+class QuoteCurveAllocation(BaseModel):
+    venue_name: str
+    size: float
+    collateral: float
+    order_available_liquidity: float
+
+
+class QuoteCurvePoint(BaseModel):
+    size: float
+    target_venues: list[Venue] | None = None  # None means the SOR picks venues
+    average_price: float | None = None  # None when the quote failed
+    total_size: float | None = None
+    total_collateral: float | None = None
+    allocations: list[QuoteCurveAllocation] = Field(default_factory=list)
+    error: str | None = None
+
+
+class QuoteCurveResponse(BaseModel):
+    points: list[QuoteCurvePoint]
+
+
+class VenueSplitAllocation(BaseModel):
+    venue_name: str
+    size: float
+    estimated_price: float  # Estimated all-in price per unit at this venue's allocation
+
+
+class VenueSplitEstimate(BaseModel):
+    symbol: SizeDenomination
+    side: TradingSide
+    size: float
+    filled_size: float  # Less than size when recent quotes show too little liquidity
+    estimated_average_price: float | None = None
+    allocations: list[VenueSplitAllocation]
+    samples: int  # Number of recent quote samples the estimate is based on
+    model_age_seconds: float  # Age of the newest sample
+
 # --- Data Models ---
 
 
@@ -161,6 +229,16 @@ class GetPositionsResponse(BaseModel):
     positions: list[Position]
 
 
+class AccountPositionsResult(BaseModel):
+    public_key: str
+    positions: list[Position] | None = None  # None when the account failed
+    error: str | None = None
+
+
+class GetPositionsBatchResponse(BaseModel):
+    results: list[AccountPositionsResult]  # Same order as the requested public keys
+
+
 class Trade(BaseModel):
     id: str
     symbol: str
@@ -184,6 +262,30 @@ class GetTradeHistoryResponse(BaseModel):
     trades: list[Trade]
 
 
+class TradeAggregate(BaseModel):
+    key: str | None = None  # Platform or symbol; None for the total
+    trades: int
+    realized_pnl: float
+    fees_paid: float
+    volume: float  # Sum of quantity * fill_price, in USD
+
+
+class TradeHistoryQueryResponse(BaseModel):
+    trades: list[Trade]  # Newest first, up to the requested limit
+    total: TradeAggregate  # Aggregates cover every matching trade, not only those returned
+    by_platform: list[TradeAggregate]
+    by_symbol: list[TradeAggregate]
+    new_trades: int  # Fetched from upstream by this call's sync
+    synced_at: str | None = None
+
+
+class TradeHistoryPage(BaseModel):
+    trades: list[Trade]  # Sorted by created_at
+    window_start: str
+    window_end: str
+    next_cursor: str | None = None  # None on the last page
+
+
 class Liquidation(BaseModel):
     id: str
     market_id: str
@@ -197,6 +299,13 @@ class Liquidation(BaseModel):
     insurance_fund_fee: float | None = None
 
 
+class LiquidationFeedPage(BaseModel):
+    cursor: int  # Pass back to get the events after these
+    events: list[Liquidation]  # Oldest first
+    missed: bool = False  # Events after the given cursor were evicted, or the cursor predates a restart
+    latest: int  # Sequence number of the newest buffered event
+
+
 class LiquidationTotals(BaseModel):
     last_1h: float
     last_4h: float
@@ -266,6 +375,10 @@ class OiWeightedFundingRate(BaseModel):
     open_interest_updated_at: str
     oi_weighted_funding_rate: str  # Decimal string
 
+    @validator('oi_weighted_funding_rate', pre=True)
+    def oi_weighted_funding_rate_to_str(cls, v):
+        return str(v) if v is not None else v
+
 
 class FundingRateTrend(BaseModel):
     symbol: str
@@ -275,3 +388,43 @@ class FundingRateTrend(BaseModel):
     z_score: float
     trend: Literal["flat", "upward", "downward"]
     latest: float
+
+
+class CapitulationScan(BaseModel):
+    window: int  # Number of prior buckets in the baseline
+    threshold: float
+    signals: list[CapitulationSignal]  # Sorted by z_score, highest first
+
+
+class FundingTrendScan(BaseModel):
+    window: int  # Number of prior points in the baseline
+    threshold: float
+    trends: list[FundingRateTrend]
+
+
+class BacktestResult(BaseModel):
+    """Performance of one Z-score rule parameter set over a recorded history."""
+    window: int  # Number of prior points in the Z-score baseline
+    threshold: float  # Enter when z >= threshold (z <= threshold if negative)
+    hold: int  # Bars a position is held after the last signal
+    pnl: float  # Sum of trade returns net of fees, in units of per-series notional
+    trades: int
+    hit_rate: float  # Share of trades with a positive net return
+    turnover: float  # Notional traded per bar per series (1 unit in, 1 unit out per trade)
+    exposure: float  # Share of bars with an open position
+
+
+class ColumnarTable(BaseModel):
+    """Column-oriented alternative to a list of row models, returned with format="columnar"."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    format: Literal["columnar"] = "columnar"
+    length: int  # Number of rows
+    # Column name -> values, one per row: typed arrays for numbers and codes, lists for strings
+    columns: dict[str, array | list[str]]
+    # Dictionary-encoded columns hold int codes; the values are listed here per column
+    dictionaries: dict[str, list[str]]
+
+    @field_serializer("columns")
+    def _columns_as_lists(self, columns: dict[str, array | list[str]]) -> dict[str, list[Any]]:
+        return {name: values.tolist() if isinstance(values, array) else values for name, values in columns.items()}
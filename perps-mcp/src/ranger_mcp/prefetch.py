@@ -0,0 +1,166 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Hashable
+
+from ranger_mcp.metrics import Counter, registry
+
+if TYPE_CHECKING:
+    from ranger_mcp.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+PREFETCHES = registry.register(Counter(
+    "ranger_prefetch_total", "Background refreshes of hot cache entries started before they expired."))
+PREFETCH_DEFERRED = registry.register(Counter(
+    "ranger_prefetch_deferred_total", "Due prefetches skipped because the upstream budget was spent."))
+
+Fetcher = Callable[[], Awaitable[tuple[Any, int]]]
+
+
+@dataclass
+class _Heat:
+    ttl: float
+    fetch: Fetcher
+    reads: deque[float] = field(default_factory=lambda: deque(maxlen=256))
+
+
+class Prefetcher:
+    """
+    Keeps popular cache entries fresh so readers rarely wait on upstream.
+
+    The cache reports every read of a cacheable request. A request read at
+    least ``min_reads`` times in the last ``window`` seconds is hot, and is
+    refreshed in the background (lowest priority lane) once it is within
+    ``lead_seconds`` (at most half its TTL) of expiring. Refreshes draw from
+    a token bucket of ``budget`` upstream requests per second, hottest first;
+    anything over budget is left to the ordinary stale-while-revalidate path.
+    Requests not read for ``idle_seconds`` are forgotten, and the scheduler
+    stops when nothing is tracked.
+    """
+
+    def __init__(
+        self,
+        budget: float = 2.0,
+        lead_seconds: float = 2.0,
+        min_reads: int = 3,
+        window: float = 60.0,
+        idle_seconds: float = 120.0,
+        max_tracked: int = 1024,
+        tick: float = 0.25,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.budget = budget
+        self.lead_seconds = lead_seconds
+        self.min_reads = min_reads
+        self.window = window
+        self.idle_seconds = idle_seconds
+        self.max_tracked = max_tracked
+        self.tick = tick
+        self.clock = clock
+        self.cache: "ResponseCache | None" = None  # Set by the cache it is attached to
+        self.prefetches = 0
+        self.deferred = 0
+        self._heat: dict[Hashable, _Heat] = {}
+        self._tokens = max(1.0, budget)
+        self._refilled = clock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.budget > 0
+
+    def record(self, key: Hashable, ttl: float, fetch: Fetcher) -> None:
+        """Counts a read of ``key``; ``fetch`` is kept to refresh it later."""
+        if not self.enabled:
+            return
+        heat = self._heat.get(key)
+        if heat is None:
+            if len(self._heat) >= self.max_tracked:
+                return
+            heat = self._heat[key] = _Heat(ttl, fetch)
+        heat.ttl, heat.fetch = ttl, fetch
+        heat.reads.append(self.clock())
+        if len(heat.reads) >= self.min_reads:
+            self._start()
+
+    def _start(self) -> None:
+        loop = asyncio.get_running_loop()
+        # Tasks from a previous (closed) event loop never complete, so check the loop too
+        if self._task is None or self._task.done() or self._task.get_loop() is not loop:
+            self._task = loop.create_task(self._run())
+
+    def _hotness(self, heat: _Heat, now: float) -> int:
+        return sum(1 for read in heat.reads if now - read <= self.window)
+
+    def _spend(self, now: float) -> bool:
+        burst = max(1.0, self.budget)
+        self._tokens = min(burst, self._tokens + (now - self._refilled) * self.budget)
+        self._refilled = now
+        if self._tokens < 1.0:
+            return False
+        self._tokens -= 1.0
+        return True
+
+    def run_once(self) -> int:
+        """Forgets idle requests and refreshes hot ones that are about to expire. Returns refreshes started."""
+        now = self.clock()
+        due = []
+        for key, heat in list(self._heat.items()):
+            if now - heat.reads[-1] > self.idle_seconds:
+                del self._heat[key]
+                continue
+            hotness = self._hotness(heat, now)
+            if hotness < self.min_reads or self.cache is None:
+                continue
+            fresh_until = self.cache.expiry(key)
+            if fresh_until is not None and fresh_until - now <= min(self.lead_seconds, heat.ttl / 2):
+                due.append((hotness, key, heat))
+
+        started = 0
+        for _, key, heat in sorted(due, key=lambda d: d[0], reverse=True):
+            if not self._spend(now):
+                self.deferred += 1
+                PREFETCH_DEFERRED.inc()
+                continue
+            self.cache.refresh(key, heat.ttl, heat.fetch)
+            started += 1
+        self.prefetches += started
+        if started:
+            PREFETCHES.inc(amount=started)
+        return started
+
+    async def _run(self) -> None:
+        while self._heat:
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.warning("Prefetch pass failed: %s", e)
+            await asyncio.sleep(self.tick)
+
+    async def reset(self) -> None:
+        """Stops the scheduler and forgets all read history."""
+        task, self._task = self._task, None
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        self._heat.clear()
+        self._tokens = max(1.0, self.budget)
+        self._refilled = self.clock()
+
+    def status(self) -> dict[str, Any]:
+        """Scheduler state for ranger_status."""
+        now = self.clock()
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "tracked": len(self._heat),
+            "hot": sum(1 for heat in self._heat.values() if self._hotness(heat, now) >= self.min_reads),
+            "budget_per_second": self.budget,
+            "prefetches": self.prefetches,
+            "deferred": self.deferred,
+        }
@@ -0,0 +1,141 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+from ranger_mcp.cache import SharedResponseStore, shared_store
+from ranger_mcp.models import QuoteParams, QuoteResponse
+from ranger_mcp.settings import settings
+
+
+class QuoteCache:
+    """
+    Very short-lived cache of SOR quotes for agents that re-quote the same
+    trade seconds apart.
+
+    Entries are keyed by fee payer, symbol, side, adjustment type, venues,
+    denominations and a size/collateral bucket: with ``bucket`` > 0, sizes
+    within that fraction of each other share an entry (geometric buckets),
+    so a hit may be a quote for a slightly different size. Callers opt in
+    per request with a maximum age, which is capped at ``max_age_ms``.
+    Only quotes are cached; transactions are always built upstream.
+
+    With a ``shared`` store, published quotes are also written there with
+    their wall-clock fetch time, and ``lookup`` falls back to them, so a
+    quote fetched by one hub worker can answer re-quotes in the others.
+    """
+
+    def __init__(
+        self,
+        max_age_ms: float = 3000.0,
+        bucket: float = 0.0,
+        max_entries: int = 1024,
+        clock: Callable[[], float] = time.monotonic,
+        shared: SharedResponseStore | None = None,
+    ) -> None:
+        self.max_age_ms = max_age_ms
+        self.bucket = bucket
+        self.max_entries = max_entries
+        self.clock = clock
+        self.shared = shared
+        self._entries: OrderedDict[Hashable, tuple[float, QuoteResponse]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.shared_hits = 0
+
+    def _bucket(self, value: float) -> float:
+        if not self.bucket:
+            return value
+        return math.floor(math.log(value) / math.log1p(self.bucket))
+
+    def key(self, params: QuoteParams) -> Hashable:
+        return (
+            params.fee_payer, params.symbol, params.side, params.adjustment_type,
+            tuple(sorted(params.target_venues)) if params.target_venues else None,
+            params.size_denomination, params.collateral_denomination,
+            self._bucket(params.size), self._bucket(params.collateral),
+        )
+
+    def _local(self, key: Hashable, max_age_ms: float) -> QuoteResponse | None:
+        entry = self._entries.get(key)
+        if entry is not None:
+            age_ms = (self.clock() - entry[0]) * 1000
+            if age_ms <= max_age_ms:
+                return entry[1].model_copy(update={"age_ms": round(age_ms)})
+        return None
+
+    def _count(self, quote: QuoteResponse | None) -> QuoteResponse | None:
+        if quote is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return quote
+
+    def get(self, params: QuoteParams, max_age_ms: float) -> QuoteResponse | None:
+        """A cached quote no older than ``max_age_ms`` (and the configured cap), with its age set."""
+        max_age_ms = min(max_age_ms, self.max_age_ms)
+        if max_age_ms <= 0:
+            return None
+        return self._count(self._local(self.key(params), max_age_ms))
+
+    async def lookup(self, params: QuoteParams, max_age_ms: float) -> QuoteResponse | None:
+        """Like ``get``, but also finds quotes that other workers published to the shared store."""
+        max_age_ms = min(max_age_ms, self.max_age_ms)
+        if max_age_ms <= 0:
+            return None
+        key = self.key(params)
+        quote = self._local(key, max_age_ms)
+        if quote is None and self.shared is not None:
+            entry = await self.shared.run(self.shared.get, ("quote", *key))
+            if entry is not None:
+                fetched_at, data = entry[0]
+                age = self.shared.clock() - fetched_at
+                if age * 1000 <= max_age_ms:
+                    self.shared_hits += 1
+                    quote = QuoteResponse.model_validate(data)
+                    self._remember(key, self.clock() - age, quote)
+                    quote = quote.model_copy(update={"age_ms": round(age * 1000)})
+        return self._count(quote)
+
+    def put(self, params: QuoteParams, quote: QuoteResponse) -> None:
+        if self.max_age_ms <= 0:
+            return
+        self._remember(self.key(params), self.clock(), quote)
+
+    async def publish(self, params: QuoteParams, quote: QuoteResponse) -> None:
+        """Caches a freshly fetched quote here and, with a shared store, for the other workers."""
+        self.put(params, quote)
+        if self.shared is not None and self.max_age_ms > 0:
+            await self.shared.run(
+                self.shared.put, ("quote", *self.key(params)), [self.shared.clock(), quote.model_dump(mode="json")],
+                self.max_age_ms / 1000, 0.0)
+
+    def _remember(self, key: Hashable, fetched_at: float, quote: QuoteResponse) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (fetched_at, quote)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict[str, float | int]:
+        """Hit/miss counters for ranger_status."""
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "max_age_ms": self.max_age_ms,
+            "bucket": self.bucket,
+            "shared": str(self.shared.path) if self.shared is not None else None,
+            "shared_hits": self.shared_hits,
+        }
+
+
+# Shared by get_trade_quote and every quote fetched through _get_quote. Its
+# store also coalesces identical quote requests across workers
+quote_cache = QuoteCache(
+    max_age_ms=settings.quote_cache_max_age_ms,
+    bucket=settings.quote_cache_bucket,
+    shared=shared_store(settings.sor_base_url),
+)
@@ -0,0 +1,280 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from email.utils import parsedate_to_datetime
+from enum import IntEnum
+from typing import Any, Awaitable, Callable, Iterator
+
+import httpx
+
+from ranger_mcp.metrics import Counter, Gauge, Histogram, registry
+from ranger_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Request lanes, most urgent first."""
+    TRANSACTION = 0  # SOR transaction building (increase/decrease/close/withdraw)
+    QUOTE = 1  # SOR quotes
+    DATA = 2  # Data API calls made for a tool call
+    BACKGROUND = 3  # Cache refreshes, pollers and other work nobody is waiting on
+
+
+# Lane for Data API calls made in the current task (SOR calls pick their lane by endpoint)
+request_priority: ContextVar[Priority] = ContextVar("request_priority", default=Priority.DATA)
+
+
+@contextmanager
+def priority_lane(priority: Priority) -> Iterator[None]:
+    """Runs the enclosed upstream calls in the given lane."""
+    token = request_priority.set(priority)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+QUEUE_WAIT = registry.register(Histogram(
+    "ranger_ratelimit_wait_seconds", "Time upstream requests waited for the rate limiter.", ("lane",)))
+THROTTLED = registry.register(Counter(
+    "ranger_ratelimit_throttled_total", "Upstream 429 responses seen by the rate limiter.", ("upstream",)))
+RATE = registry.register(Gauge(
+    "ranger_ratelimit_rate", "Learned upstream request rate limit in requests/second (0 while unlimited)."))
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        return max(parsedate_to_datetime(value).timestamp() - (now or time.time()), 0.0)
+    except (TypeError, ValueError):
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket shared by all upstream requests, with priority lanes.
+
+    The limiter starts unlimited. The first 429 sets the rate to half the
+    request rate observed when it arrived; every further 429 halves it again
+    and every success raises it by ``increase`` requests/second (AIMD), so it
+    settles just under the upstream limit. A Retry-After pauses all lanes
+    until it has passed. While requests are queued, tokens go to the most
+    urgent lane first, so background polling cannot starve trade calls.
+    """
+
+    def __init__(
+        self,
+        min_rate: float = 1.0,
+        max_rate: float = 0.0,
+        burst_seconds: float = 1.0,
+        increase: float = 0.2,
+        enabled: bool = True,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.min_rate = min_rate
+        self.max_rate = max_rate  # 0 = no ceiling
+        self.burst_seconds = burst_seconds
+        self.increase = increase
+        self.enabled = enabled
+        self.clock = clock
+        self.rate: float | None = None  # None until the first 429
+        self.tokens = 0.0
+        self.paused_until = 0.0
+        self.throttled = 0
+        self._decreased_at = float("-inf")
+        self._refilled_at = clock()
+        self._lanes: dict[Priority, deque[asyncio.Future]] = {p: deque() for p in Priority}
+        self._timer: asyncio.TimerHandle | None = None
+        # Requests sent in the current and previous second, to seed the first limit
+        self._window_start = self._refilled_at
+        self._window_count = 0
+        self._previous_count = 0
+
+    # --- Token bucket ---
+
+    def _burst(self) -> float:
+        return max(1.0, (self.rate or 0.0) * self.burst_seconds)
+
+    def _refill(self, now: float) -> None:
+        if self.rate is not None:
+            self.tokens = min(self._burst(), self.tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _queued(self) -> bool:
+        return any(self._lanes.values())
+
+    def _count_request(self, now: float) -> None:
+        if now - self._window_start >= 1.0:
+            self._previous_count = self._window_count if now - self._window_start < 2.0 else 0
+            self._window_start, self._window_count = now, 0
+        self._window_count += 1
+
+    async def acquire(self, priority: Priority) -> None:
+        """Waits until a request in ``priority``'s lane may be sent."""
+        if not self.enabled:
+            return
+        now = self.clock()
+        self._count_request(now)
+        if self.rate is None and now >= self.paused_until:
+            return  # Unlimited fast path
+        self._refill(now)
+        if now >= self.paused_until and not self._queued() and self.tokens >= 1:
+            self.tokens -= 1
+            QUEUE_WAIT.observe((priority.name.lower(),), 0.0)
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        self._lanes[priority].append(future)
+        self._schedule()
+        try:
+            await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.tokens += 1  # Granted as we were cancelled: hand the token back
+            elif future in (lane := self._lanes[priority]):  # reset() may have cleared the lanes
+                lane.remove(future)
+            self._schedule()
+            raise
+        QUEUE_WAIT.observe((priority.name.lower(),), self.clock() - now)
+
+    def _schedule(self) -> None:
+        if self._timer is not None or not self._queued():
+            return
+        now = self.clock()
+        if now < self.paused_until:
+            delay = self.paused_until - now
+        elif self.rate is None:
+            delay = 0.0
+        else:
+            self._refill(now)
+            delay = max(0.0, (1 - self.tokens) / self.rate)
+        self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    def _dispatch(self) -> None:
+        self._timer = None
+        now = self.clock()
+        if now >= self.paused_until:
+            self._refill(now)
+            for priority in Priority:
+                lane = self._lanes[priority]
+                while lane and (self.rate is None or self.tokens >= 1):
+                    future = lane.popleft()
+                    if future.done():
+                        continue
+                    if self.rate is not None:
+                        self.tokens -= 1
+                    future.set_result(None)
+        self._schedule()
+
+    def concurrency_hint(self, cap: int) -> int:
+        """
+        Concurrency for a fan-out of ``cap`` or fewer requests: ``cap`` while
+        unlimited, else about one burst's worth, so callers do not queue
+        more requests than the learned limit lets through at once.
+        """
+        if not self.enabled or self.rate is None:
+            return cap
+        return max(1, min(cap, int(self._burst())))
+
+    # --- Learning ---
+
+    def on_throttled(self, upstream: str, retry_after: float | None) -> None:
+        """Called for a 429: lowers the rate and pauses for Retry-After."""
+        now = self.clock()
+        self.throttled += 1
+        THROTTLED.inc((upstream,))
+        if self.rate is None:
+            observed = max(self._previous_count, self._window_count / max(now - self._window_start, 1.0))
+            self.rate = observed
+            self._refilled_at = now
+        # A burst of concurrent requests can all come back 429: halve once per second
+        if now - self._decreased_at >= 1.0:
+            self.rate = max(self.min_rate, self.rate * 0.5)
+            self._decreased_at = now
+            logger.warning("Upstream %s rate limited; limiting to %.1f req/s", upstream, self.rate)
+        self.tokens = 0.0
+        if retry_after:
+            self.paused_until = max(self.paused_until, now + retry_after)
+        RATE.values[()] = self.rate
+
+    def on_success(self) -> None:
+        if self.rate is None:
+            return
+        self.rate += self.increase
+        if self.max_rate:
+            self.rate = min(self.rate, self.max_rate)
+        RATE.values[()] = self.rate
+
+    def reset(self) -> None:
+        """Forgets the learned rate and any pause, and drops queued requests."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        for lane in self._lanes.values():
+            for future in lane:
+                future.cancel()
+            lane.clear()
+        self.rate = None
+        self.tokens = 0.0
+        self.paused_until = 0.0
+        self._decreased_at = float("-inf")
+        RATE.values[()] = 0.0
+
+    def status(self) -> dict[str, Any]:
+        """Limiter state for ranger_status."""
+        now = self.clock()
+        return {
+            "enabled": self.enabled,
+            "rate_limit": round(self.rate, 2) if self.rate is not None else None,
+            "paused_for_seconds": round(max(0.0, self.paused_until - now), 3),
+            "queued": {p.name.lower(): len(lane) for p, lane in self._lanes.items()},
+            "throttled": self.throttled,
+        }
+
+    async def send(
+        self,
+        upstream: str,
+        priority: Priority,
+        request: Callable[[], Awaitable[httpx.Response]],
+        max_retries: int | None = None,
+        max_wait: float | None = None,
+    ) -> httpx.Response:
+        """
+        Sends ``request`` once the lane allows it. 429s are learned from and
+        retried after Retry-After (at most ``max_retries`` times, and only
+        while the wait is under ``max_wait`` seconds). The last response is
+        returned either way, so callers keep their own error handling.
+        """
+        retries = settings.rate_limit_max_retries if max_retries is None else max_retries
+        max_wait = settings.rate_limit_max_wait if max_wait is None else max_wait
+        for attempt in range(retries + 1):
+            await self.acquire(priority)
+            response = await request()
+            if response.status_code != 429:
+                self.on_success()
+                return response
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            self.on_throttled(upstream, retry_after)
+            if not self.enabled or attempt == retries or (retry_after or 0.0) > max_wait:
+                return response
+        return response
+
+
+# Shared by the SOR and Data sub-servers (one API key, one upstream budget)
+rate_limiter = AdaptiveRateLimiter(
+    min_rate=settings.rate_limit_min_rate,
+    max_rate=settings.rate_limit_max_rate,
+    burst_seconds=settings.rate_limit_burst_seconds,
+    increase=settings.rate_limit_increase,
+    enabled=settings.rate_limit_enabled,
+)
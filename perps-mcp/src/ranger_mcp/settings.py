@@ -1,3 +1,6 @@
+from pathlib import Path
+from typing import Any, Literal
+
 from pydantic import HttpUrl, Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -12,6 +15,170 @@ class RangerSettings(BaseSettings):
     data_base_url: HttpUrl = Field(...,
                                    description="Base URL for the Data API")
 
+    # Upstream HTTP connection pools (one pool per upstream API)
+    http_timeout: float = Field(
+        default=30.0, gt=0, description="Timeout in seconds for upstream requests")
+    http_max_connections: int = Field(
+        default=100, ge=1, description="Maximum open connections per upstream pool")
+    http_max_keepalive_connections: int = Field(
+        default=20, ge=0, description="Maximum idle keep-alive connections per upstream pool")
+    http_keepalive_expiry: float = Field(
+        default=30.0, ge=0, description="Seconds an idle keep-alive connection is kept open")
+    http2: bool = Field(
+        default=False, description="Negotiate HTTP/2 with upstream (requires the 'h2' package)")
+
+    # Record/replay of upstream traffic for offline benchmarks and debugging (see ranger_mcp.cassette)
+    cassette_mode: Literal["off", "record", "replay"] = Field(
+        default="off", description="Record upstream exchanges to cassette_path, or answer from it without network")
+    cassette_path: Path | None = Field(
+        default=None, description="Cassette file (default: upstream.cassette in store_dir)")
+    cassette_speed: float = Field(
+        default=1.0, ge=0,
+        description="Divisor of recorded upstream latencies on replay, e.g. 10 or 100 (0 answers immediately)")
+
+    # In-process response cache for read-only Data endpoints.
+    # Endpoints missing from cache_ttls (e.g. positions, trade history) are never cached.
+    cache_enabled: bool = Field(
+        default=True, description="Cache read-only Data API responses in memory")
+    cache_max_bytes: int = Field(
+        default=64 * 1024 * 1024, ge=0, description="Memory budget for cached response bodies, in bytes")
+    cache_stale_seconds: float = Field(
+        default=30.0, ge=0, description="How long an expired entry may be served while it is refreshed in the background")
+    cache_ttls: dict[str, float] = Field(
+        default={
+            "/v1/liquidations/latest": 2.0,
+            "/v1/liquidations/totals": 10.0,
+            "/v1/liquidations/capitulation": 30.0,
+            "/v1/liquidations/heatmap": 30.0,
+            "/v1/liquidations/largest": 30.0,
+            "/v1/funding_rates/arbs": 10.0,
+            "/v1/funding_rates/accumulated": 60.0,
+            "/v1/borrow_rates/accumulated": 60.0,
+            "/v1/funding_rates/extreme": 30.0,
+            "/v1/funding_rates/oi_weighted": 10.0,
+            "/v1/funding_rates/trend": 30.0,
+        },
+        description="Per-endpoint time-to-live in seconds (JSON object when set via env)")
+    cache_shared: bool = Field(
+        default=False,
+        description="Share cached responses and SOR quotes between hub worker processes through SQLite in store_dir "
+                    "(enabled automatically with more than one worker)")
+
+    # Background prefetch of popular cache entries shortly before they expire
+    prefetch_budget: float = Field(
+        default=2.0, ge=0, description="Upstream requests per second the prefetcher may spend (0 disables)")
+    prefetch_lead_seconds: float = Field(
+        default=2.0, gt=0, description="Refresh hot entries this long before they expire (at most half their TTL)")
+    prefetch_min_reads: int = Field(
+        default=3, ge=1, description="Reads within a minute that make a request hot")
+    prefetch_idle_seconds: float = Field(
+        default=120.0, gt=0, description="Stop refreshing a request nobody has read for this long")
+
+    # Number of SSE hub processes serving one port (python -m ranger_mcp --workers N)
+    workers: int = Field(default=1, ge=1, description="Hub worker processes for the SSE transport")
+
+    # Client-side rate limiter shared by SOR and Data requests. It is unlimited
+    # until upstream answers 429, then learns the limit (AIMD) and queues
+    # requests by priority: transactions > quotes > data > background.
+    rate_limit_enabled: bool = Field(
+        default=True, description="Learn the upstream rate limit from 429s and queue requests by priority")
+    rate_limit_min_rate: float = Field(
+        default=1.0, gt=0, description="Lowest learned rate, in requests/second")
+    rate_limit_max_rate: float = Field(
+        default=0.0, ge=0, description="Highest learned rate, in requests/second (0 = no ceiling)")
+    rate_limit_burst_seconds: float = Field(
+        default=1.0, gt=0, description="Token bucket size, in seconds of the learned rate")
+    rate_limit_increase: float = Field(
+        default=0.2, gt=0, description="Requests/second added to the learned rate per successful request")
+    rate_limit_max_retries: int = Field(
+        default=2, ge=0, description="Retries of a request answered with 429")
+    rate_limit_max_wait: float = Field(
+        default=10.0, ge=0, description="Longest Retry-After, in seconds, that is waited out instead of failing")
+
+    # Retries and hedging for Data API GETs (idempotent, so safe to repeat)
+    data_retries: int = Field(
+        default=2, ge=0, description="Retries of a Data request after a network error or 5xx")
+    data_retry_backoff_base: float = Field(
+        default=0.1, ge=0, description="Backoff before the first retry, in seconds (doubles per retry, fully jittered)")
+    data_retry_backoff_max: float = Field(
+        default=2.0, ge=0, description="Longest backoff between retries, in seconds")
+    hedge_enabled: bool = Field(
+        default=True, description="Send a duplicate Data request when the first one is slower than usual")
+    hedge_percentile: float = Field(
+        default=0.95, gt=0, lt=1, description="Recent-latency percentile after which a request is hedged")
+    hedge_min_samples: int = Field(
+        default=20, ge=1, description="Successful requests to an endpoint before it is hedged")
+    hedge_budget: float = Field(
+        default=0.1, ge=0, le=1, description="Hedges allowed per request; at most 1, so load never more than doubles")
+
+    # Shared poller behind the liquidation feed (data_get_liquidation_feed and
+    # the ranger://liquidations/feed resource subscription)
+    liquidation_feed_interval: float = Field(
+        default=2.0, gt=0, description="Seconds between polls of the latest liquidations")
+    liquidation_feed_min_interval: float = Field(
+        default=0.5, gt=0, description="Shortest poll interval, used while polls may be missing events")
+    liquidation_feed_buffer: int = Field(
+        default=1000, ge=10, description="Recent liquidation events kept for feed readers")
+    liquidation_feed_idle_seconds: float = Field(
+        default=60.0, ge=0, description="Keep polling this long after the last read when nobody is subscribed")
+
+    # Decoding of Data API payloads
+    trusted_upstream: bool = Field(
+        default=False,
+        description="Trust Data API payloads and return them as plain dicts, without building or validating models")
+
+    # Fan-out tools (batch positions etc.)
+    batch_max_concurrency: int = Field(
+        default=16, ge=1, description="Default cap on concurrent upstream requests per batch tool call")
+
+    # Local venue-split model built from recent quotes
+    venue_model_max_age: float = Field(
+        default=300.0, gt=0, description="Seconds a quote stays usable for venue-split estimates")
+    venue_model_max_samples: int = Field(
+        default=64, ge=1, description="Quotes remembered per symbol, side and venue")
+
+    # Short-lived quote cache; callers opt in per quote with max_age_ms
+    quote_cache_max_age_ms: float = Field(
+        default=3000.0, ge=0, le=10000,
+        description="Longest a cached quote may be reused, whatever the caller asks for (0 disables)")
+    quote_cache_bucket: float = Field(
+        default=0.0, ge=0, le=0.1,
+        description="Relative size/collateral bucket width: quotes within this fraction share an entry (0 = exact)")
+
+    # Persistent on-disk store for accumulated funding/borrow rate history (opt-in)
+    store_enabled: bool = Field(
+        default=False, description="Keep accumulated rate and trade history on disk and fetch only new rows")
+    store_dir: Path = Field(
+        default=Path.home() / ".cache" / "ranger-mcp", description="Directory for the on-disk stores")
+    store_refresh_seconds: float = Field(
+        default=60.0, ge=0, description="Minimum seconds between upstream syncs of a stored series")
+    trade_store_refresh_seconds: float = Field(
+        default=60.0, ge=0, description="Minimum seconds between trade history syncs of an account")
+    trade_store_backfill_days: float = Field(
+        default=30.0, gt=0, description="Trade history fetched on the first sync of an account, in days")
+
+
+class LazySettings:
+    """
+    Stands in for RangerSettings and reads the environment and .env on first
+    attribute access instead of at import, so importing the hub stays cheap.
+    Attribute reads and writes go to the resolved settings.
+    """
+
+    def __init__(self):
+        object.__setattr__(self, "_resolved", None)
+
+    def resolve(self) -> RangerSettings:
+        if self._resolved is None:
+            object.__setattr__(self, "_resolved", RangerSettings())
+        return self._resolved
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self.resolve(), name, value)
+
 
-# Load settings once
-settings = RangerSettings()
+# Load settings once, on first use
+settings: RangerSettings = LazySettings()  # type: ignore[assignment]
@@ -0,0 +1,85 @@
+import asyncio
+from functools import partial
+from typing import Any, Awaitable, Callable, Hashable, TypeVar
+
+from ranger_mcp.cache import LEASE_POLL_MAX, LEASE_POLL_MIN, SharedResponseStore
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent identical upstream calls.
+
+    The first caller for a key starts the call as its own task; callers that
+    arrive while it is in flight await the same task and share its result (or
+    exception). Waiters are shielded, so cancelling one of them never cancels
+    the shared call for the others.
+
+    With a ``shared`` store, calls are also coalesced across hub workers: the
+    worker holding the key's lease in the store makes the call and publishes
+    its (JSON) result, and the others wait for that instead of calling too.
+    """
+
+    def __init__(self, lease_seconds: float = 10.0) -> None:
+        self._calls: dict[Hashable, asyncio.Task] = {}
+        self.lease_seconds = lease_seconds  # Longest wait for another worker's call
+        self.started = 0
+        self.coalesced = 0
+        self.joined = 0
+
+    async def do(
+        self, key: Hashable, fn: Callable[[], Awaitable[T]], shared: SharedResponseStore | None = None
+    ) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            self.started += 1
+            task = asyncio.ensure_future(fn() if shared is None else self._shared_call(shared, key, fn))
+            self._calls[key] = task
+            task.add_done_callback(partial(self._forget, key))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    async def _shared_call(self, shared: SharedResponseStore, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """Makes the call under the shared lease, or takes the result of the worker holding it."""
+        since = shared.clock()
+        if not await shared.run(shared.try_lease, key, self.lease_seconds):
+            deadline, delay = since + self.lease_seconds, LEASE_POLL_MIN
+            while shared.clock() < deadline:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, LEASE_POLL_MAX)
+                entry = await shared.run(shared.get, key)
+                # Only a result from a call that finished after this one started
+                if entry is not None and entry[0][0] >= since:
+                    self.joined += 1
+                    return entry[0][1]
+                if await shared.run(shared.try_lease, key, self.lease_seconds):
+                    break  # The holder failed; call it here
+            else:
+                return await fn()
+        try:
+            result = await fn()
+            await shared.run(shared.put, key, [shared.clock(), result], self.lease_seconds, 0.0)
+            return result
+        finally:
+            await shared.run(shared.release, key)
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the exception as retrieved in case every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "in_flight": len(self._calls),
+            "started": self.started,
+            "coalesced": self.coalesced,
+            "joined": self.joined,
+        }
+
+
+# Shared by the Data API helper and the SOR quote path
+upstream_flights = SingleFlight()
@@ -1,9 +1,18 @@
+import asyncio
 import httpx
-from typing import Any
+from typing import Annotated, Any
+from pydantic import Field, ValidationError
 
 from fastmcp import FastMCP, Context
 from fastmcp.exceptions import ToolError
 from ranger_mcp.settings import settings
+from ranger_mcp.clients import upstream_clients
+from ranger_mcp.cache import request_key
+from ranger_mcp.singleflight import upstream_flights
+from ranger_mcp.quote_cache import quote_cache
+from ranger_mcp.venue_split import venue_split_model
+from ranger_mcp.metrics import track_upstream, track_validation
+from ranger_mcp.ratelimit import Priority, rate_limiter
 from ranger_mcp.models import (
     QuoteParams,
     IncreasePositionParams,
@@ -11,7 +20,17 @@ from ranger_mcp.models import (
     ClosePositionParams,
     WithdrawBalanceParams,
     SorApiResponse,
-    QuoteResponse
+    QuoteResponse,
+    QuoteAndBuildResponse,
+    BuildBatchResponse,
+    BuildLegResult,
+    QuoteCurveAllocation,
+    QuoteCurvePoint,
+    QuoteCurveResponse,
+    SizeDenomination,
+    TradingSide,
+    Venue,
+    VenueSplitEstimate,
 )
 
 # SOR MCP Server instance
@@ -28,45 +47,55 @@ async def _call_ranger_api(endpoint: str, method: str, data: dict | None = None)
     }
     url = f"{settings.sor_base_url}{endpoint}"
 
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    client = upstream_clients.get("sor")
+    # Quotes may wait behind transaction building, never the other way round
+    priority = Priority.QUOTE if endpoint == "/v1/order_metadata" else Priority.TRANSACTION
+
+    async def post() -> httpx.Response:
+        with track_upstream("sor", endpoint) as call:
+            response = await client.post(url, headers=headers, json=data)
+            call.status, call.received = response.status_code, len(response.content)
+            call.sent = len(response.request.content)
+            return response
+
+    try:
+        if method.upper() == "POST":
+            response = await rate_limiter.send("sor", priority, post)
+        elif method.upper() == "GET":
+            # Currently no GET endpoints in SOR
+            raise NotImplementedError(
+                "GET method not implemented for SOR helper")
+        else:
+            raise ValueError(f"Unsupported HTTP method: {method}")
+
+        response.raise_for_status()  # Raises HTTPStatusError for 4xx/5xx
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        status_code = e.response.status_code
+        error_detail = e.response.text
         try:
-            if method.upper() == "POST":
-                response = await client.post(url, headers=headers, json=data)
-            elif method.upper() == "GET":
-                # Currently no GET endpoints in SOR
-                raise NotImplementedError(
-                    "GET method not implemented for SOR helper")
-            else:
-                raise ValueError(f"Unsupported HTTP method: {method}")
-
-            response.raise_for_status()  # Raises HTTPStatusError for 4xx/5xx
-            return response.json()
-        except httpx.HTTPStatusError as e:
-            status_code = e.response.status_code
-            error_detail = e.response.text
-            try:
-                error_json = e.response.json()
-                error_detail = error_json.get("message", error_detail)
-            except Exception:
-                pass  # Keep the raw text if JSON parsing fails
-
-            error_msg = f"Ranger API Error ({status_code}): {error_detail}"
-            if status_code == 401:
-                error_msg = "Ranger API Error (401): Missing or invalid API key. Check your .env file."
-            elif status_code == 403:
-                error_msg = "Ranger API Error (403): Invalid API Key provided."
-            elif status_code == 429:
-                error_msg = "Ranger API Error (429): Rate limit exceeded."
-            elif status_code == 400:
-                error_msg = f"Ranger API Error (400 Bad Request): {error_detail}"
-
-            raise ToolError(error_msg) from e
-        except httpx.RequestError as e:
-            raise ToolError(f"Network error calling Ranger API: {e}") from e
-        except Exception as e:
-            # Catch unexpected errors during the request/response processing
-            raise ToolError(
-                f"Unexpected error interacting with Ranger API: {e}") from e
+            error_json = e.response.json()
+            error_detail = error_json.get("message", error_detail)
+        except Exception:
+            pass  # Keep the raw text if JSON parsing fails
+
+        error_msg = f"Ranger API Error ({status_code}): {error_detail}"
+        if status_code == 401:
+            error_msg = "Ranger API Error (401): Missing or invalid API key. Check your .env file."
+        elif status_code == 403:
+            error_msg = "Ranger API Error (403): Invalid API Key provided."
+        elif status_code == 429:
+            error_msg = "Ranger API Error (429): Rate limit exceeded."
+        elif status_code == 400:
+            error_msg = f"Ranger API Error (400 Bad Request): {error_detail}"
+
+        raise ToolError(error_msg) from e
+    except httpx.RequestError as e:
+        raise ToolError(f"Network error calling Ranger API: {e}") from e
+    except Exception as e:
+        # Catch unexpected errors during the request/response processing
+        raise ToolError(
+            f"Unexpected error interacting with Ranger API: {e}") from e
 
 # --- SOR Tools ---
 
@@ -74,18 +103,149 @@ async def _call_ranger_api(endpoint: str, method: str, data: dict | None = None)
 @sor_mcp.tool(name="get_trade_quote")
 async def get_trade_quote(
     params: QuoteParams,
+    max_age_ms: int | None = Field(
+        default=None, ge=0,
+        description="Accept a cached quote for the same trade up to this old (capped by the server, typically "
+                    "a few seconds). age_ms in the response says how old it is. Omit for a fresh quote."),
     ctx: Context | None = None  # Optional context for logging etc.
 ) -> QuoteResponse:
     """
     Get a quote for a potential trade, including price, liquidity, and routing.
     Does NOT execute the trade. Use increase/decrease/close position tools to execute.
     """
+    if max_age_ms:
+        cached = await quote_cache.lookup(params, max_age_ms)
+        if cached is not None:
+            if ctx:
+                await ctx.info(f"Reusing {cached.age_ms} ms old quote for {params.size} {params.symbol} {params.side}")
+            return cached
     if ctx:
         await ctx.info(f"Getting quote for {params.size} {params.symbol} {params.side}")
-    # The quote endpoint returns the meta part of the SorApiResponse directly
-    response_data = await _call_ranger_api("/v1/order_metadata", "POST", params.model_dump(exclude_none=True))
+    return await _get_quote(params)
+
+
+async def _get_quote(params: QuoteParams) -> QuoteResponse:
+    # The quote endpoint returns the meta part of the SorApiResponse directly.
+    # Quotes are read-only, so identical concurrent quotes share one upstream call,
+    # across workers too when the quote cache has a shared store.
+    payload = params.model_dump(exclude_none=True)
+    response_data = await upstream_flights.do(
+        ("sor", *request_key("/v1/order_metadata", payload)),
+        lambda: _call_ranger_api("/v1/order_metadata", "POST", payload), shared=quote_cache.shared)
     # Validate and return the response using the QuoteResponse model
-    return QuoteResponse(**response_data)
+    with track_validation("QuoteResponse"):
+        quote = QuoteResponse(**response_data)
+    venue_split_model.observe(params, quote)
+    await quote_cache.publish(params, quote)
+    return quote
+
+
+@sor_mcp.tool(name="get_quote_curve")
+async def get_quote_curve(
+    params: QuoteParams,
+    sizes: list[Annotated[float, Field(gt=0)]] | None = Field(
+        default=None, max_length=50,
+        description="Sizes to quote, in base asset. Collateral is scaled to keep the template's leverage. Defaults to params.size."),
+    venue_sets: list[list[Venue]] | None = Field(
+        default=None, max_length=10,
+        description="Venue subsets to quote each size against (e.g. [['Jupiter'], ['Drift'], ['Jupiter', 'Drift']]). Defaults to params.target_venues."),
+    max_concurrency: int | None = Field(
+        default=None, ge=1, description="Maximum concurrent quote requests (defaults to the server setting)"),
+    ctx: Context | None = None
+) -> QuoteCurveResponse:
+    """
+    Get a price-impact curve: quotes the same trade at several sizes and/or venue subsets in parallel.
+    Returns size vs. average price with per-venue allocation and remaining order liquidity.
+    Does NOT execute any trade.
+    """
+    sizes = sizes or [params.size]
+    venue_sets = venue_sets or [params.target_venues]
+    if ctx:
+        await ctx.info(f"Getting quote curve for {params.symbol} {params.side}: "
+                       f"{len(sizes)} sizes x {len(venue_sets)} venue sets")
+    semaphore = asyncio.Semaphore(max_concurrency or settings.batch_max_concurrency)
+
+    async def quote_point(size: float, venues: list[Venue] | None) -> QuoteCurvePoint:
+        point_params = params.model_copy(update={
+            "size": size,
+            "collateral": params.collateral * size / params.size,
+            "target_venues": venues,
+        })
+        async with semaphore:
+            try:
+                quote = await _get_quote(point_params)
+            except (ToolError, ValidationError) as e:
+                return QuoteCurvePoint(size=size, target_venues=venues, error=str(e))
+        return QuoteCurvePoint(
+            size=size,
+            target_venues=venues,
+            average_price=quote.average_price,
+            total_size=quote.total_size,
+            total_collateral=quote.total_collateral,
+            allocations=[
+                QuoteCurveAllocation(
+                    venue_name=venue.venue_name,
+                    size=venue.size,
+                    collateral=venue.collateral,
+                    order_available_liquidity=venue.order_available_liquidity,
+                )
+                for venue in quote.venues
+            ],
+        )
+
+    points = await asyncio.gather(*(
+        quote_point(size, venues) for venues in venue_sets for size in sizes))
+    return QuoteCurveResponse(points=points)
+
+
+@sor_mcp.tool(name="estimate_venue_split")
+async def estimate_venue_split(
+    symbol: SizeDenomination,
+    side: TradingSide,
+    sizes: list[Annotated[float, Field(gt=0)]] = Field(
+        min_length=1, max_length=1000, description="Candidate order sizes to screen, in base asset"),
+    ctx: Context | None = None
+) -> list[VenueSplitEstimate]:
+    """
+    Estimate the best split of candidate Increase orders across venues, locally and without
+    calling the SOR. Uses per-venue price curves learned from recent quotes for this symbol and
+    side, so call get_trade_quote or get_quote_curve first. Confirm the chosen trade with
+    get_trade_quote before executing it.
+    """
+    estimates = venue_split_model.estimate(symbol, side, sizes)
+    if estimates is None:
+        raise ToolError(
+            f"No recent quotes for {symbol} {side}. Call sor_get_trade_quote or "
+            "sor_get_quote_curve first to build the venue cost model.")
+    if ctx:
+        await ctx.info(f"Estimated venue split for {len(sizes)} {symbol} {side} sizes")
+    return estimates
+
+
+async def _build_transaction(
+    params: IncreasePositionParams | DecreasePositionParams | ClosePositionParams
+) -> SorApiResponse:
+    """Builds the transaction for a position change. Never served from the quote cache."""
+    if isinstance(params, IncreasePositionParams):
+        endpoint = "/v1/increase_position"
+    elif isinstance(params, DecreasePositionParams):
+        endpoint = "/v1/decrease_position"
+    else:
+        endpoint = "/v1/close_position"
+    response_data = await _call_ranger_api(endpoint, "POST", params.model_dump(exclude_none=True))
+    with track_validation("SorApiResponse"):
+        return SorApiResponse(**response_data)
+
+
+def _price_deviation_bps(
+    params: IncreasePositionParams | DecreasePositionParams | ClosePositionParams,
+    price: float,
+    expected_price: float,
+) -> float:
+    """Adverse deviation of ``price`` from ``expected_price``: positive when paying more or receiving less."""
+    buying = (params.side == "Long") == isinstance(params, IncreasePositionParams)
+    deviation = (price - expected_price) / expected_price * 10_000
+    return deviation if buying else -deviation
 
 
 @sor_mcp.tool(name="increase_position")
@@ -99,8 +259,7 @@ async def increase_position(
     """
     if ctx:
         await ctx.info(f"Increasing position: {params.size} {params.symbol} {params.side}")
-    response_data = await _call_ranger_api("/v1/increase_position", "POST", params.model_dump(exclude_none=True))
-    api_response = SorApiResponse(**response_data)
+    api_response = await _build_transaction(params)
     if ctx:
         await ctx.info(f"Received transaction message. Average price: {api_response.average_price}")
     return api_response.message
@@ -117,8 +276,7 @@ async def decrease_position(
     """
     if ctx:
         await ctx.info(f"Decreasing position: {params.size} {params.symbol} {params.side} via {params.adjustment_type}")
-    response_data = await _call_ranger_api("/v1/decrease_position", "POST", params.model_dump(exclude_none=True))
-    api_response = SorApiResponse(**response_data)
+    api_response = await _build_transaction(params)
     if ctx:
         await ctx.info(f"Received transaction message. Average price: {api_response.average_price}")
     return api_response.message
@@ -136,13 +294,111 @@ async def close_position(
     if ctx:
         await ctx.info(f"Closing position: {params.symbol} {params.side} via {params.adjustment_type}")
     # Note: ClosePositionParams doesn't include size/collateral/denominations as per API doc
-    response_data = await _call_ranger_api("/v1/close_position", "POST", params.model_dump(exclude_none=True))
-    api_response = SorApiResponse(**response_data)
+    api_response = await _build_transaction(params)
     if ctx:
         await ctx.info(f"Received transaction message. Average price: {api_response.average_price}")
     return api_response.message
 
 
+@sor_mcp.tool(name="quote_and_build")
+async def quote_and_build(
+    params: IncreasePositionParams | DecreasePositionParams | ClosePositionParams,
+    max_price_deviation_bps: float | None = Field(
+        default=None, ge=0,
+        description="Reject the trade if its average price is worse than params.expected_price by more than "
+                    "this many basis points (requires expected_price)"),
+    ctx: Context | None = None
+) -> QuoteAndBuildResponse:
+    """
+    Quote and build an increase, decrease or close in one call (the kind is chosen by params.adjustment_type).
+    Returns the routing quote together with the base64 encoded transaction built at that quote, so there is
+    no separate get_trade_quote round trip and the transaction cannot drift from the quote shown.
+    The transaction needs to be signed and submitted by the user/client.
+    """
+    if max_price_deviation_bps is not None and params.expected_price is None:
+        raise ToolError("max_price_deviation_bps requires params.expected_price")
+    if ctx:
+        await ctx.info(f"Quoting and building {params.adjustment_type}: {params.symbol} {params.side}")
+    api_response = await _build_transaction(params)
+    price = api_response.average_price if api_response.average_price is not None else api_response.meta.average_price
+
+    deviation = None
+    if params.expected_price:
+        deviation = round(_price_deviation_bps(params, price, params.expected_price), 2)
+        if max_price_deviation_bps is not None and deviation > max_price_deviation_bps:
+            raise ToolError(
+                f"Average price {price} is {deviation} bps worse than the expected {params.expected_price} "
+                f"(limit {max_price_deviation_bps} bps); no transaction returned")
+    if ctx:
+        await ctx.info(f"Received transaction message. Average price: {price}")
+    return QuoteAndBuildResponse(
+        message=api_response.message,
+        quote=api_response.meta,
+        average_price=price,
+        size=api_response.size,
+        expected_price=params.expected_price,
+        price_deviation_bps=deviation,
+    )
+
+
+@sor_mcp.tool(name="build_batch")
+async def build_batch(
+    legs: list[IncreasePositionParams | DecreasePositionParams | ClosePositionParams] = Field(
+        min_length=1, max_length=100,
+        description="Position changes to build, each chosen by its adjustment_type (Increase, Decrease*, Close*). "
+                    "Legs may mix symbols and fee payers."),
+    max_concurrency: int | None = Field(
+        default=None, ge=1,
+        description="Maximum concurrent build requests (defaults to the server setting, lowered while rate limited)"),
+    deadline_seconds: float = Field(
+        default=30.0, gt=0, le=300, description="Wall-clock limit for the whole batch; unfinished legs fail"),
+    ctx: Context | None = None
+) -> BuildBatchResponse:
+    """
+    Build transactions for many position changes in one call, concurrently.
+    Results are in the order of the legs; a failed leg has an error and does not fail the batch.
+    Each returned base64 encoded transaction message needs to be signed and submitted by the user/client.
+    """
+    concurrency = rate_limiter.concurrency_hint(max_concurrency or settings.batch_max_concurrency)
+    if ctx:
+        await ctx.info(f"Building {len(legs)} transactions, {concurrency} at a time")
+    semaphore = asyncio.Semaphore(concurrency)
+    done = 0
+
+    async def build_leg(params: IncreasePositionParams | DecreasePositionParams | ClosePositionParams) -> SorApiResponse:
+        nonlocal done
+        async with semaphore:
+            api_response = await _build_transaction(params)
+        done += 1
+        if ctx:
+            await ctx.report_progress(done, len(legs))
+        return api_response
+
+    tasks = [asyncio.create_task(build_leg(params)) for params in legs]
+    _, pending = await asyncio.wait(tasks, timeout=deadline_seconds)
+    for task in pending:
+        task.cancel()
+    await asyncio.gather(*pending, return_exceptions=True)
+
+    results = []
+    for params, task in zip(legs, tasks):
+        leg = {"adjustment_type": params.adjustment_type, "symbol": params.symbol,
+               "side": params.side, "fee_payer": params.fee_payer}
+        if task.cancelled():
+            results.append(BuildLegResult(**leg, error=f"Not built within the {deadline_seconds}s batch deadline"))
+        elif isinstance(task.exception(), (ToolError, ValidationError)):
+            results.append(BuildLegResult(**leg, error=str(task.exception())))
+        elif task.exception() is not None:
+            raise task.exception()
+        else:
+            api_response = task.result()
+            results.append(BuildLegResult(
+                **leg, message=api_response.message, average_price=api_response.average_price,
+                size=api_response.size))
+    failed = sum(1 for result in results if result.error is not None)
+    return BuildBatchResponse(results=results, succeeded=len(results) - failed, failed=failed)
+
+
 @sor_mcp.tool(name="withdraw_balance_drift")
 async def withdraw_balance(
     params: WithdrawBalanceParams,
@@ -171,7 +427,23 @@ def resource_get_trade_quote() -> dict:
     return {
         "resource": "get_trade_quote",
         "description": "Get a quote for a potential trade, including price, liquidity, and routing. Does NOT execute the trade.",
-        "parameters": ["params"]
+        "parameters": ["params", "max_age_ms"]
+    }
+
+@sor_mcp.resource("sor://get_quote_curve")
+def resource_get_quote_curve() -> dict:
+    return {
+        "resource": "get_quote_curve",
+        "description": "Quote the same trade at several sizes and/or venue subsets in parallel to see price impact. Does NOT execute the trade.",
+        "parameters": ["params", "sizes", "venue_sets", "max_concurrency"]
+    }
+
+@sor_mcp.resource("sor://estimate_venue_split")
+def resource_estimate_venue_split() -> dict:
+    return {
+        "resource": "estimate_venue_split",
+        "description": "Estimate how candidate orders would split across venues using recent quotes, without calling the SOR.",
+        "parameters": ["symbol", "side", "sizes"]
     }
 
 @sor_mcp.resource("sor://increase_position")
@@ -198,6 +470,22 @@ def resource_close_position() -> dict:
         "parameters": ["params"]
     }
 
+@sor_mcp.resource("sor://quote_and_build")
+def resource_quote_and_build() -> dict:
+    return {
+        "resource": "quote_and_build",
+        "description": "Quote and build an increase, decrease or close in one call, with an optional price-deviation guard. Returns the quote and a base64 encoded transaction message that needs to be signed and submitted by the user/client.",
+        "parameters": ["params", "max_price_deviation_bps"]
+    }
+
+@sor_mcp.resource("sor://build_batch")
+def resource_build_batch() -> dict:
+    return {
+        "resource": "build_batch",
+        "description": "Build transactions for many increase/decrease/close legs concurrently, in order, with per-leg errors and a batch deadline.",
+        "parameters": ["legs", "max_concurrency", "deadline_seconds"]
+    }
+
 @sor_mcp.resource("sor://withdraw_balance_drift")
 def resource_withdraw_balance_drift() -> dict:
     return {
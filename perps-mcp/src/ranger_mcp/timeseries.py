@@ -0,0 +1,325 @@
+import asyncio
+import fcntl
+import json
+import logging
+import mmap
+import os
+import re
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+from ranger_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+STRING_COLUMNS = ("platform", "symbol", "created_at", "accumulated_rate", "base_granularity")
+
+T = TypeVar("T")
+
+
+def _epoch_us(created_at: str) -> int:
+    parsed = datetime.fromisoformat(created_at.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1_000_000)
+
+
+def _row_key(item: dict[str, Any]) -> tuple[str, str]:
+    return str(item.get("symbol")), str(item.get("platform"))
+
+
+@contextmanager
+def _mapped(path: Path, length: int, fmt: str = "B") -> Iterator[memoryview]:
+    """Memory-maps the first ``length`` bytes of a column file, unmapping it on exit."""
+    if length == 0:
+        yield memoryview(b"").cast(fmt)
+        return
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        # Every view must be released before the map can be closed
+        with memoryview(mapped) as whole, whole[:length] as view, view.cast(fmt) as typed:
+            yield typed
+
+
+class RateSeries:
+    """
+    One append-only, columnar series of accumulated rates on disk.
+
+    Layout of the series directory:
+      ts.i8                 int64 created_at in epoch microseconds, ascending
+      rate.f8               float64 accumulated_rate
+      <name>.str/<name>.off string column bytes and int64 end offsets
+      meta.json             committed row count, per-key watermarks, window and last sync time
+      lock                  flock()ed: exclusively while appending, shared while reading
+
+    Each (symbol, platform) has its own created_at watermark, so a row that
+    arrives late for one key is kept even when other keys are already past
+    it; it is merged into the sorted tail. meta.json is replaced atomically
+    after the column files are written, so a crash mid-append leaves trailing
+    bytes that are truncated on the next append.
+
+    Hub workers share the store directory, so every public method takes the
+    series' file lock and reloads meta.json (another process may have
+    appended since). ``lock`` only serializes syncs within this process.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.lock = asyncio.Lock()
+        self.meta = self._load_meta()
+
+    @contextmanager
+    def _locked(self, exclusive: bool) -> Iterator[None]:
+        self.path.mkdir(parents=True, exist_ok=True)
+        with open(self.path / "lock", "a+b") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                self.meta = self._load_meta()
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _load_meta(self) -> dict[str, Any]:
+        try:
+            return json.loads((self.path / "meta.json").read_text())
+        except (FileNotFoundError, ValueError):
+            return {"rows": 0, "watermarks": [], "window_start": None, "synced_at": None, "string_bytes": {}}
+
+    def _commit(self, meta: dict[str, Any]) -> None:
+        self.meta = meta
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    @property
+    def rows(self) -> int:
+        return self.meta["rows"]
+
+    @property
+    def window_start(self) -> int | None:
+        """created_at of the oldest row in the last upstream response."""
+        return self.meta.get("window_start")
+
+    def _scan_watermarks(self) -> list[list[Any]]:
+        watermarks: dict[tuple[str, str], int] = {}
+        for stamp, item in self._read_stamped(0):
+            key = _row_key(item)
+            watermarks[key] = max(stamp, watermarks.get(key, stamp))
+        return [[*key, stamp] for key, stamp in sorted(watermarks.items())]
+
+    def synced_at(self) -> float | None:
+        """When the series was last synced with upstream, by any process."""
+        with self._locked(exclusive=False):
+            return self.meta["synced_at"]
+
+    def append(self, items: list[dict[str, Any]], synced_at: float) -> int:
+        """Appends rows past their (symbol, platform) watermark. Returns the number of rows added."""
+        with self._locked(exclusive=True):
+            return self._append(items, synced_at)
+
+    def _append(self, items: list[dict[str, Any]], synced_at: float) -> int:
+        if self.meta.get("watermarks") is None:
+            # Older layout, or a crash while merging late rows: rebuild from the committed rows
+            self.meta["watermarks"] = self._scan_watermarks()
+        watermarks = {(symbol, platform): stamp for symbol, platform, stamp in self.meta["watermarks"]}
+        stamped, seen, oldest = [], set(), None
+        for item in items:
+            try:
+                stamp = _epoch_us(item["created_at"])
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Skipping rate row without a valid created_at: %s", item)
+                continue
+            oldest = stamp if oldest is None else min(oldest, stamp)
+            key = _row_key(item)
+            if stamp > watermarks.get(key, stamp - 1) and (key, stamp) not in seen:
+                seen.add((key, stamp))
+                stamped.append((stamp, item))
+        stamped.sort(key=lambda pair: pair[0])
+        added = len(stamped)
+        for stamp, item in stamped:
+            watermarks[_row_key(item)] = max(stamp, watermarks.get(_row_key(item), stamp))
+
+        self.path.mkdir(parents=True, exist_ok=True)
+        rows = self.rows
+        string_bytes = dict(self.meta["string_bytes"])
+        self._truncate_to(rows, string_bytes)
+        if stamped and rows:
+            with _mapped(self.path / "ts.i8", rows * 8, "q") as timestamps:
+                first = bisect_right(timestamps, stamped[0][0])
+            if first < rows:
+                # Late rows: rewrite the tail after the first of them in created_at order
+                tail = self._read_stamped(first)
+                stamped = sorted(tail + stamped, key=lambda pair: pair[0])
+                rows, string_bytes = first, self._string_bytes_at(first)
+                # A crash before the final commit leaves a consistent, shorter series
+                self._commit({**self.meta, "rows": rows, "watermarks": None, "string_bytes": string_bytes})
+                self._truncate_to(rows, string_bytes)
+        if stamped:
+            with open(self.path / "ts.i8", "ab") as f:
+                array("q", (stamp for stamp, _ in stamped)).tofile(f)
+            with open(self.path / "rate.f8", "ab") as f:
+                array("d", (float(item.get("accumulated_rate") or 0.0) for _, item in stamped)).tofile(f)
+            for name in STRING_COLUMNS:
+                offset = string_bytes.get(name, 0)
+                offsets = array("q")
+                with open(self.path / f"{name}.str", "ab") as f:
+                    for _, item in stamped:
+                        value = item.get(name)
+                        encoded = ("" if value is None else str(value)).encode()
+                        f.write(encoded)
+                        offset += len(encoded)
+                        offsets.append(offset)
+                with open(self.path / f"{name}.off", "ab") as f:
+                    offsets.tofile(f)
+                string_bytes[name] = offset
+
+        self._commit({
+            "rows": rows + len(stamped),
+            "watermarks": [[*key, stamp] for key, stamp in sorted(watermarks.items())],
+            "window_start": oldest if oldest is not None else self.window_start,
+            "synced_at": synced_at,
+            "string_bytes": string_bytes,
+        })
+        return added
+
+    def _truncate_to(self, rows: int, string_bytes: dict[str, int]) -> None:
+        def truncate(name: str, length: int) -> None:
+            path = self.path / name
+            if path.exists() and path.stat().st_size != length:
+                os.truncate(path, length)
+        truncate("ts.i8", rows * 8)
+        truncate("rate.f8", rows * 8)
+        for name in STRING_COLUMNS:
+            truncate(f"{name}.off", rows * 8)
+            truncate(f"{name}.str", string_bytes.get(name, 0))
+
+    def _string_bytes_at(self, rows: int) -> dict[str, int]:
+        string_bytes = {}
+        for name in STRING_COLUMNS:
+            with _mapped(self.path / f"{name}.off", self.rows * 8, "q") as ends:
+                string_bytes[name] = ends[rows - 1] if rows else 0
+        return string_bytes
+
+    def timestamps(self) -> array:
+        """The int64 epoch-microsecond column."""
+        with self._locked(exclusive=False), _mapped(self.path / "ts.i8", self.rows * 8, "q") as column:
+            return array("q", column)
+
+    def rates(self) -> array:
+        """The float64 accumulated_rate column."""
+        with self._locked(exclusive=False), _mapped(self.path / "rate.f8", self.rows * 8, "d") as column:
+            return array("d", column)
+
+    def _read_stamped(self, first: int) -> list[tuple[int, dict[str, Any]]]:
+        """Rows from index ``first`` on, with their epoch-microsecond created_at."""
+        rows = self.rows
+        if first >= rows:
+            return []
+        columns = {}
+        for name in STRING_COLUMNS:
+            with _mapped(self.path / f"{name}.str", self.meta["string_bytes"].get(name, 0)) as data, \
+                    _mapped(self.path / f"{name}.off", rows * 8, "q") as ends:
+                start = ends[first - 1] if first else 0
+                values = []
+                for i in range(first, rows):
+                    values.append(bytes(data[start:ends[i]]).decode())
+                    start = ends[i]
+            columns[name] = values
+        with _mapped(self.path / "ts.i8", rows * 8, "q") as timestamps:
+            stamps = timestamps[first:rows].tolist()
+        return [
+            (stamps[i], {name: columns[name][i] for name in STRING_COLUMNS})
+            for i in range(rows - first)
+        ]
+
+    def read(self, since: int | None = None) -> list[dict[str, Any]]:
+        """Reads rows (optionally only those after ``since`` epoch microseconds) as API-shaped dicts."""
+        with self._locked(exclusive=False):
+            return self._read(since)
+
+    def window(self) -> list[dict[str, Any]]:
+        """The rows of the last upstream response's window (from its oldest row on)."""
+        with self._locked(exclusive=False):
+            start = self.window_start
+            return self._read(since=start - 1 if start is not None else None)
+
+    def _read(self, since: int | None) -> list[dict[str, Any]]:
+        if self.rows == 0:
+            return []
+        first = 0
+        if since is not None:
+            with _mapped(self.path / "ts.i8", self.rows * 8, "q") as timestamps:
+                first = bisect_right(timestamps, since)
+        return [item for _, item in self._read_stamped(first)]
+
+
+class RateSeriesStore:
+    """
+    Persistent store for accumulated funding/borrow rate series, one
+    RateSeries per endpoint and filter combination.
+
+    The Data API has no "since" parameter, so a sync still downloads the
+    upstream response, but only rows past their created_at watermark are
+    written to the store. Queries return the same window upstream last
+    returned (from its oldest row on); between syncs (``refresh_seconds``)
+    they are answered from disk without any upstream call, and the history
+    survives restarts.
+    """
+
+    def __init__(self, root: Path, refresh_seconds: float, clock: Callable[[], float] = time.time) -> None:
+        self.root = root
+        self.refresh_seconds = refresh_seconds
+        self.clock = clock
+        self._series: dict[Path, RateSeries] = {}
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="rate-store")
+
+    async def run(self, method: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Runs a series method (file, mmap and lock I/O) on the store's thread, off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(method, *args, **kwargs))
+
+    def series(self, endpoint: str, params: dict[str, Any]) -> RateSeries:
+        name = "__".join(str(params.get(k) or "all") for k in ("symbol", "platform", "granularity"))
+        path = self.root / endpoint.strip("/").replace("/", "_") / re.sub(r"[^A-Za-z0-9_.-]", "_", name)
+        series = self._series.get(path)
+        if series is None:
+            series = self._series[path] = RateSeries(path)
+        return series
+
+    async def query(
+        self,
+        endpoint: str,
+        params: dict[str, Any],
+        fetch: Callable[[], Awaitable[list[dict[str, Any]]]],
+    ) -> list[dict[str, Any]]:
+        """Returns the rows of the last upstream window, syncing new rows when it is due."""
+        series = self.series(endpoint, params)
+        async with series.lock:
+            synced_at = await self.run(series.synced_at)
+            if synced_at is None or self.clock() - synced_at >= self.refresh_seconds:
+                try:
+                    items = await fetch()
+                except Exception:
+                    if series.rows == 0:
+                        raise
+                    logger.warning("Sync of %s failed; serving %d stored rows",
+                                   series.path.name, series.rows, exc_info=True)
+                else:
+                    added = await self.run(series.append, items, self.clock())
+                    logger.debug("Synced %s: %d new rows", series.path.name, added)
+            return await self.run(series.window)
+
+
+def _build_store() -> RateSeriesStore | None:
+    if not settings.store_enabled:
+        return None
+    return RateSeriesStore(settings.store_dir, settings.store_refresh_seconds)
+
+
+# None when RANGER_STORE_ENABLED is false
+rate_store = _build_store()
@@ -0,0 +1,230 @@
+import asyncio
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from pathlib import Path
+from typing import Any, Awaitable, Callable, TypeVar
+
+from ranger_mcp.settings import settings
+
+logger = logging.getLogger(__name__)
+
+TRADE_COLUMNS = (
+    "id", "symbol", "side", "quantity", "entry_price", "fill_price", "position_leverage", "realized_pnl",
+    "fees_paid", "order_type", "order_action", "is_closed", "created_at", "opened_at", "platform", "tx_signature",
+)
+
+# Refresh the planner statistics after inserts this large (e.g. a backfill)
+ANALYZE_ROWS = 1000
+
+Fetch = Callable[[datetime, datetime], Awaitable[list[dict[str, Any]]]]
+
+T = TypeVar("T")
+
+
+def _epoch_us(value: str) -> int:
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return int(parsed.timestamp() * 1_000_000)
+
+
+def _aggregate(key: str | None, groups: list[tuple]) -> dict[str, Any]:
+    return {
+        "key": key,
+        "trades": sum(group[2] for group in groups),
+        "realized_pnl": sum(group[3] for group in groups),
+        "fees_paid": sum(group[4] for group in groups),
+        "volume": sum(group[5] for group in groups),
+    }
+
+
+class TradeStore:
+    """
+    Local per-account copy of the trade history, indexed for queries.
+
+    Each account has a created_at watermark (its newest stored trade). A
+    sync fetches only from the watermark on, minus ``overlap_seconds`` for
+    trades that show up upstream a little late, and trade ids de-duplicate
+    the overlap; the first sync backfills ``backfill_days`` (an account
+    without trades gets the end of that range as its watermark). Syncs happen
+    at most every ``refresh_seconds`` per account, and queries in between are
+    answered from SQLite (indexed by time, symbol, platform and signature)
+    without any upstream call. ``path=None`` keeps the store in memory.
+
+    The methods are synchronous; async callers go through ``run``, which
+    executes them on the store's own thread.
+    """
+
+    def __init__(
+        self,
+        path: Path | None,
+        refresh_seconds: float = 60.0,
+        backfill_days: float = 30.0,
+        overlap_seconds: float = 60.0,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.path = path
+        self.refresh_seconds = refresh_seconds
+        self.backfill_days = backfill_days
+        self.overlap_seconds = overlap_seconds
+        self.clock = clock
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(path or ":memory:", check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS trades (
+                public_key TEXT NOT NULL, id TEXT NOT NULL, created_us INTEGER NOT NULL,
+                symbol TEXT, side TEXT, quantity REAL, entry_price REAL, fill_price REAL,
+                position_leverage REAL, realized_pnl REAL, fees_paid REAL, order_type TEXT,
+                order_action TEXT, is_closed INTEGER, created_at TEXT, opened_at TEXT,
+                platform TEXT, tx_signature TEXT,
+                PRIMARY KEY (public_key, id));
+            CREATE INDEX IF NOT EXISTS trades_time ON trades (public_key, created_us);
+            CREATE INDEX IF NOT EXISTS trades_symbol ON trades (public_key, symbol, created_us);
+            CREATE INDEX IF NOT EXISTS trades_platform ON trades (public_key, platform, created_us);
+            CREATE INDEX IF NOT EXISTS trades_signature ON trades (public_key, tx_signature);
+            CREATE TABLE IF NOT EXISTS accounts (
+                public_key TEXT PRIMARY KEY, watermark_us INTEGER, synced_at REAL);
+        """)
+        self._locks: dict[str, asyncio.Lock] = {}
+        self._executor = ThreadPoolExecutor(1, thread_name_prefix="trade-store")
+
+    async def run(self, method: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Runs one of the store's methods on its thread, off the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, partial(method, *args, **kwargs))
+
+    # --- Sync ---
+
+    def account(self, public_key: str) -> tuple[int | None, float | None]:
+        """The account's (watermark in epoch microseconds, last sync time)."""
+        row = self._db.execute(
+            "SELECT watermark_us, synced_at FROM accounts WHERE public_key = ?", (public_key,)).fetchone()
+        return (row["watermark_us"], row["synced_at"]) if row else (None, None)
+
+    def add(self, public_key: str, trades: list[dict[str, Any]], synced_at: float, synced_to: int | None = None) -> int:
+        """
+        Stores trades not seen before and advances the watermark. ``synced_to``
+        (epoch microseconds, the end of the fetched range) becomes the watermark
+        of an account that has none yet when no trades came back. Returns how
+        many trades were new.
+        """
+        rows = []
+        for trade in trades:
+            try:
+                created_us = _epoch_us(trade["created_at"])
+            except (KeyError, TypeError, ValueError):
+                logger.warning("Skipping trade without a valid created_at: %s", trade.get("id"))
+                continue
+            rows.append((public_key, created_us, *(trade.get(name) for name in TRADE_COLUMNS)))
+        watermark, _ = self.account(public_key)
+        newest = max((row[1] for row in rows), default=None)
+        if watermark is None:
+            watermark = newest if newest is not None else synced_to
+        elif newest is not None and newest > watermark:
+            watermark = newest
+        with self._db:
+            before = self._db.total_changes
+            self._db.executemany(
+                f"INSERT OR IGNORE INTO trades (public_key, created_us, {', '.join(TRADE_COLUMNS)}) "
+                f"VALUES (?, ?, {', '.join('?' * len(TRADE_COLUMNS))})", rows)
+            added = self._db.total_changes - before
+            self._db.execute(
+                "INSERT OR REPLACE INTO accounts VALUES (?, ?, ?)", (public_key, watermark, synced_at))
+        if added >= ANALYZE_ROWS:
+            # Without statistics SQLite prefers the time index even for signature lookups
+            self._db.execute("ANALYZE")
+        return added
+
+    async def sync(self, public_key: str, fetch: Fetch, force: bool = False) -> int:
+        """Fetches trades past the watermark if a sync is due. Returns how many were new."""
+        lock = self._locks.setdefault(public_key, asyncio.Lock())
+        async with lock:
+            watermark, synced_at = await self.run(self.account, public_key)
+            now = self.clock()
+            if not force and synced_at is not None and now - synced_at < self.refresh_seconds:
+                return 0
+            end = datetime.fromtimestamp(now, timezone.utc)
+            if watermark is None:
+                start = end - timedelta(days=self.backfill_days)
+            else:
+                start = datetime.fromtimestamp(watermark / 1_000_000 - self.overlap_seconds, timezone.utc)
+            trades = await fetch(start, end)
+            added = await self.run(self.add, public_key, trades, now, int(now * 1_000_000))
+            logger.debug("Synced trades of %s from %s: %d new", public_key, start, added)
+            return added
+
+    # --- Queries ---
+
+    def _where(
+        self,
+        public_key: str,
+        symbols: list[str] | None = None,
+        platforms: list[str] | None = None,
+        tx_signature: str | None = None,
+        start: str | None = None,
+        end: str | None = None,
+    ) -> tuple[str, list[Any]]:
+        clauses, args = ["public_key = ?"], [public_key]
+        if symbols:
+            clauses.append(f"symbol IN ({', '.join('?' * len(symbols))})")
+            args += symbols
+        if platforms:
+            clauses.append(f"platform IN ({', '.join('?' * len(platforms))})")
+            args += platforms
+        if tx_signature:
+            clauses.append("tx_signature = ?")
+            args.append(tx_signature)
+        if start:
+            clauses.append("created_us >= ?")
+            args.append(_epoch_us(start))
+        if end:
+            clauses.append("created_us < ?")
+            args.append(_epoch_us(end))
+        return " AND ".join(clauses), args
+
+    def query(self, public_key: str, limit: int = 100, **filters: Any) -> tuple[list[dict[str, Any]], dict[str, Any]]:
+        """
+        Matching trades (newest first, up to ``limit``) and aggregates over all
+        matches: totals plus breakdowns by platform and by symbol.
+        """
+        where, args = self._where(public_key, **filters)
+        trades = [
+            {**dict(row), "is_closed": bool(row["is_closed"])}
+            for row in self._db.execute(
+                f"SELECT {', '.join(TRADE_COLUMNS)} FROM trades WHERE {where} "
+                "ORDER BY created_us DESC, id DESC LIMIT ?", (*args, limit))
+        ]
+        # One grouped scan; the total and both breakdowns are rolled up from it
+        groups = self._db.execute(
+            "SELECT platform, symbol, COUNT(*), COALESCE(SUM(realized_pnl), 0), COALESCE(SUM(fees_paid), 0), "
+            f"COALESCE(SUM(quantity * fill_price), 0) FROM trades WHERE {where} GROUP BY platform, symbol",
+            args).fetchall()
+        aggregates = {"total": _aggregate(None, groups)}
+        for column, position in (("platform", 0), ("symbol", 1)):
+            keys = sorted({group[position] for group in groups}, key=str)
+            aggregates[f"by_{column}"] = [
+                _aggregate(key, [group for group in groups if group[position] == key]) for key in keys]
+        return trades, aggregates
+
+    def clear(self) -> None:
+        with self._db:
+            self._db.execute("DELETE FROM trades")
+            self._db.execute("DELETE FROM accounts")
+
+
+def _build_store() -> TradeStore:
+    return TradeStore(
+        settings.store_dir / "trades.sqlite" if settings.store_enabled else None,
+        refresh_seconds=settings.trade_store_refresh_seconds,
+        backfill_days=settings.trade_store_backfill_days,
+    )
+
+
+# In memory when RANGER_STORE_ENABLED is false
+trade_store = _build_store()
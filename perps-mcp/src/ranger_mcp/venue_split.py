@@ -0,0 +1,216 @@
+import time
+from bisect import bisect_left, bisect_right
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
+from ranger_mcp.models import (
+    QuoteParams, QuoteResponse, TradingSide, VenueSplitAllocation, VenueSplitEstimate
+)
+from ranger_mcp.settings import settings
+
+
+@dataclass(frozen=True)
+class _Sample:
+    observed_at: float
+    size: float
+    unit_price: float  # quote.total: all-in price per unit of base asset
+    liquidity: float  # order_available_liquidity, in base asset units
+
+
+class _VenueCurve:
+    """
+    Cost model for one venue. Unit price is piecewise-linear in size between
+    quoted sizes (flat below the smallest, extrapolated beyond the largest) and
+    size is capped by the latest order_available_liquidity.
+
+    The marginal cost of total cost ``s * price(s)`` is itself piecewise-linear,
+    stored as (size, marginal) knots. A running max keeps marginals
+    non-decreasing, which makes the cost curve convex.
+    """
+
+    def __init__(self, samples: list[_Sample], sign: float) -> None:
+        # Keep the newest sample for each size
+        by_size: dict[float, _Sample] = {}
+        for sample in sorted(samples, key=lambda s: s.observed_at):
+            by_size[sample.size] = sample
+        points = sorted(by_size.values(), key=lambda s: s.size)
+        self.sizes = [p.size for p in points]
+        self.prices = [p.unit_price for p in points]
+        self.capacity = max(samples, key=lambda s: s.observed_at).liquidity
+
+        # Segments as (start, end, slope of unit price)
+        xs = self.sizes
+        slopes = [(self.prices[i] - self.prices[i - 1]) / (xs[i] - xs[i - 1])
+                  for i in range(1, len(xs))]
+        segments = [(0.0, xs[0], 0.0)]
+        segments += [(xs[i - 1], xs[i], slopes[i - 1]) for i in range(1, len(xs))]
+        segments.append((xs[-1], max(self.capacity, xs[-1]), slopes[-1] if slopes else 0.0))
+
+        self.knot_sizes: list[float] = []
+        self.knot_marginals: list[float] = []
+        running = float("-inf")
+        for start, end, slope in segments:
+            end = min(end, self.capacity)
+            if end <= start and start > 0:
+                break
+            for s in (start, end):
+                running = max(running, sign * (self.unit_price(s) + s * slope))
+                self.knot_sizes.append(s)
+                self.knot_marginals.append(running)
+
+    def unit_price(self, size: float) -> float:
+        sizes, prices = self.sizes, self.prices
+        if len(sizes) == 1 or size <= sizes[0]:
+            return prices[0]
+        i = min(bisect_right(sizes, size), len(sizes) - 1)
+        x0, x1, y0, y1 = sizes[i - 1], sizes[i], prices[i - 1], prices[i]
+        return y0 + (y1 - y0) * (size - x0) / (x1 - x0)
+
+    def size_upper(self, marginal: float) -> float:
+        """Largest size whose marginal cost is at most ``marginal``."""
+        ms, ss = self.knot_marginals, self.knot_sizes
+        j = bisect_right(ms, marginal) - 1
+        if j < 0:
+            return 0.0
+        if j == len(ms) - 1:
+            return ss[-1]
+        return ss[j] + (ss[j + 1] - ss[j]) * (marginal - ms[j]) / (ms[j + 1] - ms[j])
+
+    def size_lower(self, marginal: float) -> float:
+        """Smallest size whose marginal cost is at least ``marginal``."""
+        ms, ss = self.knot_marginals, self.knot_sizes
+        j = bisect_left(ms, marginal)
+        if j == 0:
+            return ss[0]
+        if j == len(ms):
+            return ss[-1]
+        return ss[j - 1] + (ss[j] - ss[j - 1]) * (marginal - ms[j - 1]) / (ms[j] - ms[j - 1])
+
+
+def _split(curves: dict[str, _VenueCurve], candidates: list[float], size: float) -> dict[str, float]:
+    """
+    Exact convex allocation: finds the marginal cost level at which the venues
+    together fill ``size`` and returns each venue's size at that level.
+    """
+    def total_upper(level: float) -> float:
+        return sum(c.size_upper(level) for c in curves.values())
+
+    # First candidate level at which the venues can fill the order
+    lo, hi = 0, len(candidates)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if total_upper(candidates[mid]) >= size:
+            hi = mid
+        else:
+            lo = mid + 1
+    if lo == len(candidates):
+        # Not enough liquidity: fill every venue to its cap
+        return {name: c.knot_sizes[-1] for name, c in curves.items()}
+
+    level = candidates[lo]
+    lower = {name: c.size_lower(level) for name, c in curves.items()}
+    upper = {name: c.size_upper(level) for name, c in curves.items()}
+    filled_lower, filled_upper = sum(lower.values()), sum(upper.values())
+    if filled_lower <= size:
+        # The order fills at exactly this level; share the remainder across
+        # venues whose marginal cost is flat at it
+        spread = filled_upper - filled_lower
+        frac = (size - filled_lower) / spread if spread > 0 else 0.0
+        return {name: lower[name] + (upper[name] - lower[name]) * frac for name in curves}
+    # Otherwise the fill level lies strictly between two knots, where every
+    # venue's size is linear in the level
+    prev = candidates[lo - 1]
+    filled_prev = total_upper(prev)
+    level = prev + (level - prev) * (size - filled_prev) / (filled_lower - filled_prev)
+    return {name: c.size_upper(level) for name, c in curves.items()}
+
+
+class VenueSplitModel:
+    """
+    Per-venue cost model built from recent SOR quotes, used to estimate how an
+    order would be split across venues without calling the SOR.
+
+    Venue cost curves are convex and piecewise-linear in marginal cost, so the
+    optimal split equalises marginal cost across venues. It is found exactly by
+    a search over the curves' knots, in microseconds.
+    """
+
+    def __init__(
+        self,
+        max_samples: int = 64,
+        max_age: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_samples = max_samples
+        self.max_age = max_age
+        self.clock = clock
+        self._samples: dict[tuple[str, str, str], deque[_Sample]] = {}
+
+    def observe(self, params: QuoteParams, quote: QuoteResponse) -> None:
+        """Records per-venue prices from an Increase quote."""
+        if params.adjustment_type != "Increase":
+            return
+        now = self.clock()
+        for venue in quote.venues:
+            if venue.size <= 0:
+                continue
+            key = (params.symbol, params.side, venue.venue_name)
+            samples = self._samples.setdefault(key, deque(maxlen=self.max_samples))
+            samples.append(_Sample(now, venue.size, venue.quote.total,
+                                   venue.order_available_liquidity))
+
+    def estimate(self, symbol: str, side: TradingSide, sizes: list[float]) -> list[VenueSplitEstimate] | None:
+        """Estimates the best split of each size across venues, or None without recent quotes."""
+        now = self.clock()
+        cutoff = now - self.max_age
+        # Longs minimise what they pay, shorts maximise what they receive
+        sign = 1.0 if side == "Long" else -1.0
+        curves: dict[str, _VenueCurve] = {}
+        count, newest = 0, cutoff
+        for (s, sd, venue_name), samples in self._samples.items():
+            if s != symbol or sd != side:
+                continue
+            fresh = [x for x in samples if x.observed_at >= cutoff]
+            if fresh:
+                curves[venue_name] = _VenueCurve(fresh, sign)
+                count += len(fresh)
+                newest = max(newest, fresh[-1].observed_at)
+        if not curves:
+            return None
+        candidates = sorted({m for c in curves.values() for m in c.knot_marginals})
+
+        estimates = []
+        for size in sizes:
+            allocated = _split(curves, candidates, size)
+            allocations = [
+                VenueSplitAllocation(
+                    venue_name=name,
+                    size=a,
+                    estimated_price=curves[name].unit_price(a),
+                )
+                for name, a in sorted(allocated.items()) if a > 1e-12
+            ]
+            filled = sum(a.size for a in allocations)
+            notional = sum(a.size * a.estimated_price for a in allocations)
+            estimates.append(VenueSplitEstimate(
+                symbol=symbol,
+                side=side,
+                size=size,
+                filled_size=filled,
+                estimated_average_price=notional / filled if filled else None,
+                allocations=allocations,
+                samples=count,
+                model_age_seconds=now - newest,
+            ))
+        return estimates
+
+    def clear(self) -> None:
+        self._samples.clear()
+
+
+# Fed by every SOR quote that passes through the hub
+venue_split_model = VenueSplitModel(
+    max_samples=settings.venue_model_max_samples,
+    max_age=settings.venue_model_max_age,
+)
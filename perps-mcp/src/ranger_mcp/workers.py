@@ -0,0 +1,165 @@
+"""
+Multi-worker SSE deployment: N hub processes serving one port.
+
+Every worker binds the public port with SO_REUSEPORT, so the kernel spreads
+incoming connections across them. An MCP SSE session lives in the worker
+that accepted its GET /sse stream, but the client POSTs its messages on
+other connections, which may land on any worker. Each worker therefore
+advertises a message path naming itself (/messages/w<i>/) and also listens
+on a private loopback port; a POST that arrives at the wrong worker is
+forwarded there. The forwarded response closes its connection, so the
+client reconnects and the kernel picks a worker again: after a few
+messages, a session's keep-alive connection lands on its own worker and
+its POSTs no longer need the extra hop.
+
+Workers share the Data API response cache and SOR quote coalescing and
+caching, through SQLite (see SharedResponseStore); everything else,
+including uncached Data endpoints and transactions, is per worker. The supervisor restarts workers that exit
+unexpectedly, backing off when one keeps exiting.
+"""
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import time
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# A worker that keeps exiting is restarted after a delay that doubles from the
+# minimum up to the maximum; one that ran long enough starts over at the minimum
+RESTART_DELAY_MIN = 0.5
+RESTART_DELAY_MAX = 30.0
+RESTART_RESET_SECONDS = 60.0
+
+
+def message_path(index: int) -> str:
+    return f"/messages/w{index}/"
+
+
+def _listen(host: str, port: int, reuse_port: bool) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.setblocking(False)
+    return sock
+
+
+def _free_ports(count: int) -> list[int]:
+    sockets = [_listen("127.0.0.1", 0, reuse_port=False) for _ in range(count)]
+    ports = [s.getsockname()[1] for s in sockets]
+    for s in sockets:
+        s.close()
+    return ports
+
+
+def restart_delay(previous: float, uptime: float) -> float:
+    """Seconds to wait before restarting a worker that exited after ``uptime`` seconds."""
+    if not previous or uptime >= RESTART_RESET_SECONDS:
+        return RESTART_DELAY_MIN
+    return min(previous * 2, RESTART_DELAY_MAX)
+
+
+def _forwarding_routes(index: int, private_ports: list[int]) -> list[Any]:
+    import httpx
+    from starlette.requests import Request
+    from starlette.responses import Response
+    from starlette.routing import Route
+
+    # Without TCP_NODELAY each forwarded request waits ~40 ms on delayed ACKs
+    transport = httpx.AsyncHTTPTransport(socket_options=[(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)])
+    client = httpx.AsyncClient(transport=transport, timeout=30.0)
+
+    def forward_to(peer: int):
+        async def forward(request: Request) -> Response:
+            url = f"http://127.0.0.1:{private_ports[peer]}{message_path(peer)}?{request.url.query}"
+            upstream = await client.post(
+                url, content=await request.body(),
+                headers={"content-type": request.headers.get("content-type", "application/json")})
+            # Closing the connection makes the client reconnect, and the kernel picks a
+            # worker again, until the session's POSTs arrive at its own worker
+            return Response(upstream.content, status_code=upstream.status_code,
+                            media_type=upstream.headers.get("content-type"), headers={"connection": "close"})
+        return forward
+
+    return [
+        Route(message_path(peer), forward_to(peer), methods=["POST"])
+        for peer in range(len(private_ports)) if peer != index
+    ]
+
+
+def _serve(index: int, host: str, port: int, private_ports: list[int], log_level: str) -> None:
+    """Worker process entry point."""
+    os.environ["FASTMCP_SERVER_MESSAGE_PATH"] = message_path(index)
+    os.environ.setdefault("RANGER_CACHE_SHARED", "true")
+
+    import uvicorn
+    from ranger_mcp.hub import ranger_mcp
+
+    app = ranger_mcp.sse_app()
+    app.router.routes.extend(_forwarding_routes(index, private_ports))
+    sockets = [_listen(host, port, reuse_port=True), _listen("127.0.0.1", private_ports[index], reuse_port=False)]
+    # SSE handlers can outlive their client; don't let them hold up shutdown past
+    # the supervisor's grace period, which would orphan this process
+    server = uvicorn.Server(uvicorn.Config(app, log_level=log_level, timeout_graceful_shutdown=3))
+    server.run(sockets=sockets)
+
+
+def run_workers(workers: int, host: str, port: int, log_level: str = "info") -> None:
+    """Starts ``workers`` hub processes on ``host:port`` and keeps them running until interrupted."""
+    if not hasattr(socket, "SO_REUSEPORT"):
+        raise RuntimeError("Multiple workers need SO_REUSEPORT, which this platform does not support")
+    # Fail early (e.g. port in use) instead of in every worker
+    _listen(host, port, reuse_port=True).close()
+    private_ports = _free_ports(workers)
+    context = multiprocessing.get_context("spawn")
+
+    def start(index: int) -> multiprocessing.Process:
+        process = context.Process(
+            target=_serve, args=(index, host, port, private_ports, log_level), name=f"ranger-mcp-worker-{index}")
+        process.start()
+        return process
+
+    processes = {index: start(index) for index in range(workers)}
+    started = dict.fromkeys(processes, time.monotonic())
+    delays = dict.fromkeys(processes, 0.0)
+    restart_at: dict[int, float] = {}
+    stopping = False
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    logger.info("Serving on %s:%d with %d workers", host, port, workers)
+    try:
+        while not stopping:
+            time.sleep(0.5)
+            now = time.monotonic()
+            for index, process in processes.items():
+                if process.is_alive() or stopping:
+                    continue
+                if index not in restart_at:
+                    delays[index] = restart_delay(delays[index], now - started[index])
+                    restart_at[index] = now + delays[index]
+                    logger.warning("Worker %d exited with code %s; restarting in %.1f s",
+                                   index, process.exitcode, delays[index])
+                elif now >= restart_at[index]:
+                    del restart_at[index]
+                    processes[index], started[index] = start(index), now
+    finally:
+        for process in processes.values():
+            process.terminate()
+        # uvicorn waits for open SSE streams, so give all workers one shared grace period
+        deadline = time.monotonic() + 5
+        for process in processes.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                process.kill()
+                process.join()
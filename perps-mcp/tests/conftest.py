@@ -0,0 +1,67 @@
+import os
+import tempfile
+
+import httpx
+import pytest
+
+# Settings are resolved once, on first use, so provide local defaults before
+# any ranger_mcp module is imported. A real .env still takes precedence.
+os.environ.setdefault("RANGER_API_KEY", "sk_test_local")
+os.environ.setdefault("RANGER_SOR_BASE_URL", "http://sor.test")
+os.environ.setdefault("RANGER_DATA_BASE_URL", "http://data.test")
+os.environ.setdefault("RANGER_STORE_DIR", tempfile.mkdtemp(prefix="ranger-mcp-test-"))
+
+
+class UpstreamStub:
+    """In-process stand-in for the SOR and Data APIs, keyed by request path."""
+
+    def __init__(self):
+        self.routes = {}
+        self.calls = []
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        self.calls.append(request)
+        path = "/" + request.url.path.lstrip("/")
+        route = self.routes.get(path)
+        if route is None:
+            return httpx.Response(404, json={"message": f"No stub for {path}"})
+        if callable(route):
+            route = await route(request)
+        if isinstance(route, httpx.Response):
+            return route
+        return httpx.Response(200, json=route)
+
+    def count(self, path: str) -> int:
+        return sum(1 for r in self.calls if r.url.path.lstrip("/") == path.lstrip("/"))
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+async def upstream(monkeypatch):
+    from ranger_mcp.cache import response_cache
+    from ranger_mcp.clients import upstream_clients
+    from ranger_mcp.ratelimit import rate_limiter
+    from ranger_mcp.hedging import data_hedger
+    from ranger_mcp.quote_cache import quote_cache
+
+    stub = UpstreamStub()
+    response_cache.clear()
+    await response_cache.prefetcher.reset()
+    quote_cache.clear()
+    rate_limiter.reset()
+    data_hedger.reset()
+    monkeypatch.setattr(data_hedger, "backoff_base", 0.0)
+    await upstream_clients.aclose()
+    monkeypatch.setattr(upstream_clients, "transport",
+                        httpx.MockTransport(stub.handle))
+    yield stub
+    response_cache.clear()
+    await response_cache.prefetcher.reset()
+    quote_cache.clear()
+    rate_limiter.reset()
+    data_hedger.reset()
+    await upstream_clients.aclose()
@@ -0,0 +1,85 @@
+import json
+
+import numpy as np
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.analytics import rolling_stats, scan_capitulation, scan_funding_trends
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+
+def heatmap_rows(values_by_series):
+    return [
+        {"symbol": symbol, "platform": platform, "start": f"2025-01-{day + 1:02d}T00:00:00Z",
+         "total_liquidated_usd": value}
+        for (symbol, platform), values in values_by_series.items()
+        for day, value in enumerate(values)
+    ]
+
+
+def test_rolling_stats_match_naive_computation():
+    rng = np.random.default_rng(7)
+    matrix = rng.normal(size=(5, 40))
+    matrix[2, 10] = np.nan
+    mean, std, z = rolling_stats(matrix, window=8)
+    for s in range(5):
+        for t in range(1, 40):
+            baseline = matrix[s, max(t - 8, 0):t]
+            baseline = baseline[~np.isnan(baseline)]
+            assert mean[s, t] == pytest.approx(baseline.mean())
+            assert std[s, t] == pytest.approx(baseline.std(), abs=1e-9)
+            if not np.isnan(matrix[s, t]) and baseline.std() > 0:
+                assert z[s, t] == pytest.approx((matrix[s, t] - baseline.mean()) / baseline.std())
+
+
+def test_capitulation_scan_covers_every_threshold_and_window():
+    rows = heatmap_rows({
+        ("SOL-PERP", "DRIFT"): [10, 12, 8, 11, 9, 10, 60],
+        ("BTC-PERP", "FLASH"): [5, 5, 6, 5, 4, 5, 6],
+    })
+    scans = scan_capitulation(list(reversed(rows)), windows=[3, 6], thresholds=[1.0, 100.0])
+    assert [(s.window, s.threshold) for s in scans] == [(3, 1.0), (3, 100.0), (6, 1.0), (6, 100.0)]
+    signal = scans[2].signals[0]
+    baseline = np.array([10, 12, 8, 11, 9, 10])
+    assert (signal.symbol, signal.platform) == ("SOL-PERP", "DRIFT")
+    assert signal.total_liquidated == 60
+    assert signal.z_score == pytest.approx((60 - baseline.mean()) / baseline.std())
+    assert scans[3].signals == []
+
+
+def test_funding_trends_label_direction():
+    rates = [
+        {"symbol": symbol, "platform": "DRIFT", "created_at": f"2025-01-01T{h:02d}:00:00Z",
+         "accumulated_rate": str(value), "base_granularity": "1h"}
+        for symbol, series in {"SOL-PERP": [1, 1.1, 0.9, 1, 3], "ETH-PERP": [1, 1.1, 0.9, 1, -3],
+                               "BTC-PERP": [1, 1.1, 0.9, 1, 1]}.items()
+        for h, value in enumerate(series)
+    ]
+    trends = {t.symbol: t for t in scan_funding_trends(rates, windows=[4], thresholds=[2.0])[0].trends}
+    assert trends["SOL-PERP"].trend == "upward" and trends["SOL-PERP"].latest == 3
+    assert trends["ETH-PERP"].trend == "downward"
+    assert trends["BTC-PERP"].trend == "flat"
+
+
+async def test_scan_tool_uses_cached_heatmap(upstream):
+    upstream.routes["/v1/liquidations/heatmap"] = heatmap_rows(
+        {("SOL-PERP", "DRIFT"): [10, 12, 8, 11, 9, 10, 60]})
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("data_scan_capitulation_signals",
+                                        {"thresholds": [1.0, 2.0, 3.0], "windows": [3, 6]})
+        await client.call_tool("data_scan_capitulation_signals", {"thresholds": [5.0]})
+    scans = json.loads(result[0].text)
+    assert len(scans) == 6
+    assert scans[0]["signals"][0]["symbol"] == "SOL-PERP"
+    assert upstream.count("/v1/liquidations/heatmap") == 1
+
+
+@pytest.mark.parametrize("tool", ["data_scan_capitulation_signals", "data_scan_funding_rate_trends"])
+async def test_scan_tools_reject_windows_below_one(upstream, tool):
+    async with Client(ranger_mcp) as client:
+        for windows in ([0], [3, -2]):
+            with pytest.raises(Exception, match="greater than or equal to 1"):
+                await client.call_tool(tool, {"windows": windows})
+    assert not upstream.calls
@@ -0,0 +1,95 @@
+import json
+
+import numpy as np
+import pytest
+
+from ranger_mcp.analytics import rolling_stats
+from ranger_mcp.backtest import align_prices, backtest_recording, backtest_zscore, load_rows
+
+
+def naive(signal, prices, window, threshold, hold, direction=1, fee=0.0):
+    """Bar-by-bar simulation of the same rule, one series at a time."""
+    _, _, z = rolling_stats(signal, window)
+    trades = []
+    for s in range(signal.shape[0]):
+        left, entry, last = 0, None, None
+        for t in range(signal.shape[1]):
+            if np.isfinite(prices[s, t]) and (z[s, t] >= threshold if threshold >= 0 else z[s, t] <= threshold):
+                left = hold
+            if left:
+                entry = prices[s, t] if entry is None else entry
+                last = prices[s, min(t + 1, signal.shape[1] - 1)]
+                left -= 1
+            elif entry is not None:
+                trades.append(direction * (last / entry - 1) - 2 * fee)
+                entry = None
+        if entry is not None:
+            trades.append(direction * (last / entry - 1) - 2 * fee)
+    return trades
+
+
+def test_grid_matches_bar_by_bar_simulation():
+    rng = np.random.default_rng(3)
+    signal = rng.lognormal(size=(4, 120))
+    prices = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, size=(4, 120)), axis=1))
+    prices[1, :10] = np.nan  # No quotes yet
+    results = backtest_zscore(signal, prices, [5, 20], [1.0, 2.0, -1.0], [1, 3, 200], fee_bps=5, workers=1)
+
+    assert len(results) == 18
+    assert [r.pnl for r in results] == sorted((r.pnl for r in results), reverse=True)
+    for r in results:
+        trades = naive(signal, prices, r.window, r.threshold, r.hold, fee=5 / 10_000)
+        assert r.trades == len(trades)
+        assert r.pnl == pytest.approx(sum(trades))
+        assert r.hit_rate == pytest.approx(sum(p > 0 for p in trades) / len(trades) if trades else 0.0)
+        assert r.turnover == pytest.approx(2 * len(trades) / (4 * 120))
+
+    short = backtest_zscore(signal, prices, [5], [2.0], [3], side="short", workers=1)[0]
+    long = next(r for r in results if (r.window, r.threshold, r.hold) == (5, 2.0, 3))
+    assert short.pnl == pytest.approx(-long.pnl - 2 * 5 / 10_000 * long.trades)  # Gross of the long's fees
+
+
+def test_worker_processes_give_the_same_results():
+    rng = np.random.default_rng(5)
+    signal, prices = rng.lognormal(size=(3, 200)), 100 + rng.random((3, 200))
+    grid = ([4, 8, 16], [1.5, 2.5], [1, 6])
+    assert backtest_zscore(signal, prices, *grid, workers=2) == backtest_zscore(signal, prices, *grid, workers=1)
+    with pytest.raises(ValueError, match="at least 1"):
+        backtest_zscore(signal, prices, [0], [2.0], [1])
+
+
+def test_recorded_heatmap_trades_the_quote_at_the_bucket_end(tmp_path):
+    heatmap = [
+        {"symbol": "SOL-PERP", "platform": platform, "start": f"2025-01-01T{h:02d}:00:00Z",
+         "total_liquidated_usd": 1000 if h == 4 else 10 + h % 2}
+        for platform in ("DRIFT", "FLASH") for h in range(8)
+    ]
+    quotes = [{"symbol": "SOL-PERP", "created_at": f"2025-01-01T{h:02d}:30:00Z", "average_price": 100 + h}
+              for h in range(1, 8)]
+    (tmp_path / "heatmap.json").write_text(json.dumps(heatmap))
+    (tmp_path / "quotes.jsonl").write_text("\n".join(json.dumps(q) for q in quotes))
+
+    prices = align_prices(["SOL-PERP", "BTC-PERP"], [f"2025-01-01T{h:02d}:00:00+00:00" for h in (0, 2, 5)], quotes)
+    np.testing.assert_array_equal(prices[0], [np.nan, 101, 104])
+    assert np.isnan(prices[1]).all()
+
+    [result] = backtest_recording(
+        load_rows(tmp_path / "heatmap.json"), load_rows(tmp_path / "quotes.jsonl"), "heatmap",
+        windows=[3], thresholds=[3.0], holds=[2], workers=1)
+    # The 04:00 bucket is only known at 05:00: both platforms enter at the 04:30
+    # quote (104) and exit two buckets later at the 06:30 quote (106)
+    assert result.trades == 2 and result.hit_rate == 1.0
+    assert result.pnl == pytest.approx(2 * (106 / 104 - 1))
+
+
+def test_quote_symbols_map_signal_series_to_their_quotes():
+    heatmap = [{"symbol": "SOL-PERP", "platform": "DRIFT", "start": f"2025-01-01T{h:02d}:00:00Z",
+                "total_liquidated_usd": 1000 if h == 4 else 10 + h % 2} for h in range(8)]
+    quotes = [{"symbol": "SOL", "created_at": f"2025-01-01T{h:02d}:30:00Z", "average_price": 100 + h}
+              for h in range(1, 8)]
+    grid = dict(windows=[3], thresholds=[3.0], holds=[2], workers=1)
+
+    # Without the mapping SOL-PERP has no quotes and never trades
+    assert backtest_recording(heatmap, quotes, "heatmap", **grid)[0].trades == 0
+    [result] = backtest_recording(heatmap, quotes, "heatmap", quote_symbols={"SOL-PERP": "SOL"}, **grid)
+    assert result.trades == 1 and result.pnl == pytest.approx(106 / 104 - 1)
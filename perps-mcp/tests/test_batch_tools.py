@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+
+def position(public_key):
+    return {
+        "id": f"pos-{public_key}", "symbol": "SOL-PERP", "side": "Long", "quantity": 1.0,
+        "entry_price": 150.0, "position_leverage": 2.0, "borrow_fee": 0.0, "funding_fee": 0.0,
+        "open_fee": 0.1, "close_fee": 0.0, "created_at": "2025-01-01T00:00:00Z",
+        "opened_at": "2025-01-01T00:00:00Z", "platform": "DRIFT",
+    }
+
+
+async def test_positions_batch_reports_per_account_results(upstream):
+    in_flight = peak = 0
+
+    async def positions(request):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        public_key = request.url.params["public_key"]
+        if public_key == "bad":
+            return httpx.Response(400, json={"message": "invalid public key"})
+        if public_key == "malformed":
+            return {"positions": [{"id": "x"}]}
+        assert request.url.params.get_list("symbols") == ["SOL-PERP"]
+        return {"positions": [position(public_key)]}
+    upstream.routes["/v1/positions"] = positions
+
+    keys = [f"wallet{i}" for i in range(8)] + ["bad", "malformed"]
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("data_get_positions_batch", {
+            "public_keys": keys, "symbols": ["SOL-PERP"], "max_concurrency": 3})
+    results = json.loads(result[0].text)["results"]
+
+    assert [r["public_key"] for r in results] == keys
+    assert results[0]["positions"][0]["id"] == "pos-wallet0"
+    assert results[0]["error"] is None
+    assert "invalid public key" in results[8]["error"] and results[8]["positions"] is None
+    assert "validation error" in results[9]["error"]
+    assert peak <= 3
+
+
+def quote_response(size, collateral, venues):
+    venues = venues or ["Jupiter", "Drift"]
+    per_venue = size / len(venues)
+    return {
+        "venues": [{
+            "venue_name": venue, "collateral": collateral / len(venues), "size": per_venue,
+            "quote": {"base": 150.0, "total": 150.0 + size, "fee_breakdown": {}},
+            "order_available_liquidity": 1000.0 - per_venue,
+            "venue_available_liquidity": 5000.0,
+        } for venue in venues],
+        "total_collateral": collateral,
+        "total_size": size,
+        "average_price": 150.0 + size,
+    }
+
+
+QUOTE_TEMPLATE = {
+    "fee_payer": "payer", "symbol": "SOL", "side": "Long", "size": 1.0, "collateral": 50.0,
+    "size_denomination": "SOL", "adjustment_type": "Increase",
+}
+
+
+async def test_quote_curve_fans_out_sizes_and_venue_sets(upstream):
+    async def order_metadata(request):
+        body = json.loads(request.content)
+        if body["size"] == 8.0 and body.get("target_venues") == ["Drift"]:
+            return httpx.Response(400, json={"message": "insufficient liquidity"})
+        return quote_response(body["size"], body["collateral"], body.get("target_venues"))
+    upstream.routes["/v1/order_metadata"] = order_metadata
+
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("sor_get_quote_curve", {
+            "params": QUOTE_TEMPLATE,
+            "sizes": [1.0, 2.0, 8.0],
+            "venue_sets": [["Jupiter"], ["Drift"]],
+        })
+    points = json.loads(result[0].text)["points"]
+
+    assert [(p["target_venues"], p["size"]) for p in points] == [
+        (["Jupiter"], 1.0), (["Jupiter"], 2.0), (["Jupiter"], 8.0),
+        (["Drift"], 1.0), (["Drift"], 2.0), (["Drift"], 8.0)]
+    assert points[1]["average_price"] == 152.0
+    assert points[1]["total_collateral"] == 100.0  # leverage of the template is kept
+    assert points[1]["allocations"] == [{
+        "venue_name": "Jupiter", "size": 2.0, "collateral": 100.0, "order_available_liquidity": 998.0}]
+    assert "insufficient liquidity" in points[5]["error"]
+    assert upstream.count("/v1/order_metadata") == 6
+
+
+async def test_build_batch_keeps_leg_order_with_per_leg_errors_and_deadline(upstream):
+    meta = {"venues": [], "total_collateral": 50.0, "total_size": 1.0, "average_price": 100.0}
+
+    async def build(request):
+        body = json.loads(request.content)
+        if body["symbol"] == "BTC":
+            return httpx.Response(400, json={"message": "no position"})
+        if body["symbol"] == "ETH":
+            await asyncio.sleep(1)  # Misses the deadline
+        return {"message": f"tx-{body['fee_payer']}-{body['adjustment_type']}", "meta": meta}
+    for path in ("/v1/increase_position", "/v1/decrease_position", "/v1/close_position"):
+        upstream.routes[path] = build
+
+    legs = [
+        QUOTE_TEMPLATE,
+        {**QUOTE_TEMPLATE, "fee_payer": "other", "adjustment_type": "DecreaseDrift"},
+        {"fee_payer": "payer", "symbol": "BTC", "side": "Short", "adjustment_type": "CloseAll"},
+        {"fee_payer": "payer", "symbol": "ETH", "side": "Long", "adjustment_type": "CloseDrift"},
+        {"fee_payer": "other", "symbol": "SOL", "side": "Long", "adjustment_type": "CloseAll"},
+    ]
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("sor_build_batch", {"legs": legs, "deadline_seconds": 0.2})
+    response = json.loads(result[0].text)
+
+    assert [r["message"] for r in response["results"]] == [
+        "tx-payer-Increase", "tx-other-DecreaseDrift", None, None, "tx-other-CloseAll"]
+    assert "no position" in response["results"][2]["error"]
+    assert "deadline" in response["results"][3]["error"]
+    assert (response["succeeded"], response["failed"]) == (3, 2)
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+from fastmcp import Client
+from pydantic import ValidationError
+
+from ranger_mcp.bulk import validate_list, validate_model
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.models import AccumulatedRate, ExtremeFundingRates, GetTradeHistoryResponse, Trade
+from ranger_mcp.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+
+def trade(i):
+    return {
+        "id": f"t{i}", "symbol": "SOL-PERP", "side": "Long", "quantity": 1.0, "entry_price": 100.0,
+        "fill_price": 101.0, "position_leverage": 2.0, "realized_pnl": 1.0, "fees_paid": 0.1,
+        "order_type": "market", "order_action": "open", "is_closed": False,
+        "created_at": "2025-01-01T00:00:00Z", "opened_at": "2025-01-01T00:00:00Z",
+        "platform": "DRIFT", "tx_signature": f"sig{i}",
+    }
+
+
+RATES = [
+    {"platform": "DRIFT", "symbol": "SOL-PERP", "created_at": "2025-01-01T00:00:00Z",
+     "accumulated_rate": 0.0001, "base_granularity": "1h"},
+]
+
+
+def test_bytes_and_decoded_payloads_validate_the_same():
+    body = json.dumps({"trades": [trade(i) for i in range(3)]}).encode()
+
+    from_bytes = validate_model(GetTradeHistoryResponse, body)
+    from_python = validate_model(GetTradeHistoryResponse, json.loads(body))
+
+    assert from_bytes == from_python == GetTradeHistoryResponse(**json.loads(body))
+    with pytest.raises(ValidationError):
+        validate_model(GetTradeHistoryResponse, b'{"trades": [{"id": "t0"}]}')
+
+
+def test_trusted_rows_serialize_like_validated_models():
+    payload = {"highest": RATES, "lowest": RATES}
+
+    validated = validate_model(ExtremeFundingRates, payload, trusted=False)
+    trusted = validate_model(ExtremeFundingRates, payload, trusted=True)
+
+    assert trusted == validated.model_dump()
+    assert RATES[0]["accumulated_rate"] == 0.0001  # shared input is not mutated
+    assert validate_list(AccumulatedRate, json.dumps(RATES), trusted=True)[0]["accumulated_rate"] == "0.0001"
+    rows = [trade(0)]
+    assert validate_list(Trade, rows, trusted=True) is rows
+
+
+async def test_tools_validate_raw_bodies_and_honour_trusted_mode(upstream, monkeypatch):
+    upstream.routes["/v1/trade_history"] = {"trades": [trade(0)]}
+    upstream.routes["/v1/funding_rates/oi_weighted"] = [{
+        "symbol": "SOL-PERP", "funding_rate_updated_at": "2025-01-01T00:00:00Z",
+        "open_interest_updated_at": "2025-01-01T00:00:00Z", "oi_weighted_funding_rate": 0.5}]
+
+    async with Client(ranger_mcp) as client:
+        history = await client.call_tool("data_get_trade_history", {"public_key": "wallet"})
+        monkeypatch.setattr(settings, "trusted_upstream", True)
+        rates = await client.call_tool("data_get_oi_weighted_funding_rates", {})
+
+    assert json.loads(history[0].text)["trades"][0]["id"] == "t0"
+    assert json.loads(rates[0].text)[0]["oi_weighted_funding_rate"] == "0.5"
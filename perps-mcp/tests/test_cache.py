@@ -0,0 +1,146 @@
+import asyncio
+import json
+import sqlite3
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.cache import ResponseCache, SharedResponseStore, request_key
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def counting_fetcher(size=10):
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        return {"n": len(calls)}, size
+    return fetch, calls
+
+
+def test_request_key_ignores_param_order_and_none():
+    assert request_key("/x", {"b": ["SOL", "BTC"], "a": 1, "c": None}) == \
+        request_key("/x", {"a": 1, "b": ["BTC", "SOL"]})
+
+
+async def test_ttl_hit_then_stale_while_revalidate():
+    clock = FakeClock()
+    cache = ResponseCache({"/x": 5.0}, max_bytes=1000, stale_seconds=10.0, clock=clock)
+    fetch, calls = counting_fetcher()
+
+    assert await cache.get_or_fetch("/x", None, fetch) == {"n": 1}
+    assert await cache.get_or_fetch("/x", None, fetch) == {"n": 1}
+    clock.now += 6  # expired, but inside the stale window
+    assert await cache.get_or_fetch("/x", None, fetch) == {"n": 1}
+    await asyncio.sleep(0)  # let the background refresh run
+    assert await cache.get_or_fetch("/x", None, fetch) == {"n": 2}
+    clock.now += 100  # past the stale window: a blocking miss
+    assert await cache.get_or_fetch("/x", None, fetch) == {"n": 3}
+    stats = cache.stats()
+    assert (stats["hits"], stats["stale_hits"], stats["misses"], stats["refreshes"]) == (2, 1, 2, 1)
+
+
+async def test_lru_evicts_within_memory_budget():
+    cache = ResponseCache({"/x": 60.0}, max_bytes=25)
+    for symbol in ("SOL", "BTC", "ETH"):
+        fetch, _ = counting_fetcher(size=10)
+        await cache.get_or_fetch("/x", {"symbol": symbol}, fetch)
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] == 20 and stats["evictions"] == 1
+    fetch, calls = counting_fetcher()
+    await cache.get_or_fetch("/x", {"symbol": "SOL"}, fetch)
+    assert calls == [1]  # the least recently used entry was evicted
+
+
+async def test_uncached_endpoints_always_fetch():
+    cache = ResponseCache({"/x": 60.0}, max_bytes=1000)
+    fetch, calls = counting_fetcher()
+    await cache.get_or_fetch("/v1/positions", {"public_key": "abc"}, fetch)
+    await cache.get_or_fetch("/v1/positions", {"public_key": "abc"}, fetch)
+    assert len(calls) == 2 and cache.stats()["misses"] == 0
+
+
+async def test_data_tools_share_cached_response(upstream):
+    upstream.routes["/v1/funding_rates/oi_weighted"] = [{
+        "symbol": "SOL-PERP",
+        "funding_rate_updated_at": "2025-01-01T00:00:00Z",
+        "open_interest_updated_at": "2025-01-01T00:00:00Z",
+        "oi_weighted_funding_rate": 0.0001,
+    }]
+    async with Client(ranger_mcp) as client:
+        for _ in range(3):
+            result = await client.call_tool("data_get_oi_weighted_funding_rates", {})
+            assert json.loads(result[0].text)[0]["oi_weighted_funding_rate"] == "0.0001"
+        status = json.loads((await client.call_tool("ranger_status", {}))[0].text)
+    assert upstream.count("/v1/funding_rates/oi_weighted") == 1
+    assert status["cache"]["hits"] >= 2
+
+
+async def test_workers_share_responses_and_fetch_each_key_once(tmp_path):
+    store = SharedResponseStore(tmp_path / "cache.sqlite")
+    workers = [
+        ResponseCache({"/x": 60.0}, max_bytes=1000, shared=SharedResponseStore(store.path)) for _ in range(2)]
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"n": len(calls)}, 10
+
+    # Concurrent misses in two workers: one takes the lease, the other waits for its response
+    first, second = await asyncio.gather(*(w.get_or_fetch("/x", {"symbol": "SOL"}, fetch) for w in workers))
+    assert first == second == {"n": 1} and calls == [1]
+    assert workers[1].stats()["shared_hits"] == 1
+
+    third = ResponseCache({"/x": 60.0}, max_bytes=1000, shared=store)
+    assert await third.get_or_fetch("/x", {"symbol": "SOL"}, fetch) == {"n": 1}
+    assert calls == [1] and third.stats()["shared_hits"] == 1
+
+
+async def test_locked_shared_store_does_not_block_the_event_loop(tmp_path):
+    store = SharedResponseStore(tmp_path / "cache.sqlite")
+    cache = ResponseCache({"/x": 60.0}, max_bytes=1000, shared=store)
+    other = sqlite3.connect(store.path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # Another worker holds the write lock
+    fetch, calls = counting_fetcher()
+    lookup = asyncio.create_task(cache.get_or_fetch("/x", {"symbol": "SOL"}, fetch))
+    await asyncio.sleep(0.05)
+    assert not lookup.done()  # Waiting for the lease on the store's thread, not on the loop
+    other.execute("COMMIT")
+    assert await lookup == {"n": 1} and calls == [1]
+    other.close()
+
+
+async def test_refresh_adopts_the_entry_stored_by_the_lease_holder(tmp_path):
+    store = SharedResponseStore(tmp_path / "cache.sqlite")
+    cache = ResponseCache({"/x": 60.0}, max_bytes=1000, shared=SharedResponseStore(store.path))
+    key = request_key("/x", {"symbol": "SOL"})
+    # Another worker holds the refresh lease and has already stored a newer response
+    store.put(key, {"n": 2}, ttl=60.0, stale_seconds=0.0)
+    assert store.try_lease(key, 10.0)
+    fetch, calls = counting_fetcher()
+    cache.refresh(key, 60.0, fetch)
+    await asyncio.sleep(0.01)
+    assert await cache.get_or_fetch("/x", {"symbol": "SOL"}, fetch) == {"n": 2}
+    assert calls == [] and cache.stats()["hits"] == 1
+
+
+async def test_shared_lease_is_taken_over_when_the_holder_fails(tmp_path):
+    store = SharedResponseStore(tmp_path / "cache.sqlite")
+    cache = ResponseCache({"/x": 60.0}, max_bytes=1000, shared=store, lease_seconds=0.05)
+    key = request_key("/x", {"symbol": "SOL"})
+    assert store.try_lease(key, 0.01) and not store.try_lease(key, 0.01)
+    # The holder died mid-fetch: its lease expires and this worker fetches instead
+    fetch, calls = counting_fetcher()
+    assert await cache.get_or_fetch("/x", {"symbol": "SOL"}, fetch) == {"n": 1}
+    assert calls == [1]
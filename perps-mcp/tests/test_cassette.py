@@ -0,0 +1,102 @@
+import gzip
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.cassette import Cassette, Exchange, ReplayTransport, cassette, encode, read_cassette
+from ranger_mcp.clients import upstream_clients
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+QUOTE = {"venues": [], "total_collateral": 50.0, "total_size": 1.0, "average_price": 101.0}
+PARAMS = {"fee_payer": "payer", "symbol": "SOL", "side": "Long", "size": 1.0, "collateral": 50.0,
+          "size_denomination": "SOL", "adjustment_type": "Increase"}
+
+
+@pytest.fixture
+def use_cassette(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "cassette_path", tmp_path / "upstream.cassette")
+    monkeypatch.setattr(settings, "cassette_speed", 0.0)
+
+    async def use(mode):
+        monkeypatch.setattr(settings, "cassette_mode", mode)
+        await upstream_clients.aclose()  # Rebuilt with the mode's transport
+        cassette.close()
+    yield use
+    cassette.close()
+
+
+async def test_replays_recorded_traffic_without_upstream(upstream, use_cassette):
+    positions = iter([{"positions": []}, httpx.Response(400, json={"message": "busy"})])
+
+    async def next_positions(request):
+        return next(positions)
+    upstream.routes["/v1/positions"] = next_positions
+    upstream.routes["/v1/order_metadata"] = QUOTE
+
+    await use_cassette("record")
+    async with Client(ranger_mcp) as client:
+        await client.call_tool("data_get_positions", {"public_key": "abc"})
+        with pytest.raises(Exception, match="busy"):
+            await client.call_tool("data_get_positions", {"public_key": "abc"})
+        await client.call_tool("sor_get_trade_quote", {"params": PARAMS})
+    calls = len(upstream.calls)
+    assert calls == 3 and cassette.status()["recorded"] == 3
+
+    await use_cassette("replay")
+    async with Client(ranger_mcp) as client:
+        # Served in recorded order, then the last response repeats
+        result = await client.call_tool("data_get_positions", {"public_key": "abc"})
+        for _ in range(2):
+            with pytest.raises(Exception, match=r"\(400\): busy"):
+                await client.call_tool("data_get_positions", {"public_key": "abc"})
+        # JSON key order does not matter
+        quote = await client.call_tool("sor_get_trade_quote", {"params": dict(reversed(PARAMS.items()))})
+        with pytest.raises(Exception, match="No recorded response for GET /v1/positions"):
+            await client.call_tool("data_get_positions", {"public_key": "other"})
+        status = json.loads((await client.call_tool("ranger_status", {}))[0].text)["cassette"]
+
+    assert json.loads(result[0].text) == {"positions": []}
+    assert json.loads(quote[0].text)["average_price"] == 101.0
+    assert len(upstream.calls) == calls
+    assert (status["mode"], status["replayed"], status["misses"]) == ("replay", 4, 1)
+
+
+async def test_content_encoded_responses_round_trip(upstream, use_cassette):
+    body = gzip.compress(json.dumps({"positions": []}).encode())
+
+    async def gzipped(request):
+        return httpx.Response(200, content=body, headers={"content-encoding": "gzip", "content-type": "application/json"})
+    upstream.routes["/v1/positions"] = gzipped
+
+    await use_cassette("record")
+    async with Client(ranger_mcp) as client:
+        recorded = await client.call_tool("data_get_positions", {"public_key": "abc"})
+    await use_cassette("replay")
+    async with Client(ranger_mcp) as client:
+        replayed = await client.call_tool("data_get_positions", {"public_key": "abc"})
+
+    assert json.loads(recorded[0].text) == json.loads(replayed[0].text) == {"positions": []}
+    assert read_cassette(settings.cassette_path)[0].content == body
+
+
+async def test_replay_compresses_recorded_latency_and_skips_torn_frames(monkeypatch, tmp_path):
+    path = tmp_path / "upstream.cassette"
+    monkeypatch.setattr(settings, "cassette_path", path)
+    key = "data GET /v1/positions?public_key=abc "
+    exchange = Exchange("data", key, 0.0, 0.5, 200, [("content-type", "application/json")], b'{"positions":[]}')
+    path.write_bytes(encode(exchange) + encode(exchange)[:-3])
+    assert len(read_cassette(path)) == 1
+
+    sleeps = []
+
+    async def sleep(seconds):
+        sleeps.append(seconds)
+
+    transport = ReplayTransport(Cassette(), "data", speed=50, sleep=sleep)
+    response = await transport.handle_async_request(httpx.Request("GET", "http://data.test//v1/positions?public_key=abc"))
+    assert response.status_code == 200 and sleeps == [pytest.approx(0.01)]
@@ -0,0 +1,66 @@
+import json
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.columnar import HEATMAP_COLUMNS, to_columnar
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+HEATMAP = [
+    {"symbol": symbol, "platform": platform, "start": f"2025-01-01T{h:02d}:00:00Z",
+     "total_liquidated_usd": float(h * 100 + i)}
+    for h in range(24)
+    for i, (symbol, platform) in enumerate(
+        [("SOL-PERP", "DRIFT"), ("SOL-PERP", "FLASH"), ("BTC-PERP", "JUPITER")])
+]
+
+
+def decode(table):
+    """Rebuilds row dicts from a columnar table."""
+    columns = {
+        name: [table["dictionaries"][name][c] for c in values] if name in table["dictionaries"] else values
+        for name, values in table["columns"].items()
+    }
+    return [{name: columns[name][i] for name in columns} for i in range(table["length"])]
+
+
+async def test_columnar_heatmap_round_trips_and_is_smaller(upstream):
+    upstream.routes["/v1/liquidations/heatmap"] = HEATMAP
+    async with Client(ranger_mcp) as client:
+        rows = (await client.call_tool("data_get_liquidation_heatmap", {}))[0].text
+        columnar = (await client.call_tool("data_get_liquidation_heatmap", {"format": "columnar"}))[0].text
+    table = json.loads(columnar)
+    assert table["format"] == "columnar" and table["length"] == len(HEATMAP)
+    assert table["dictionaries"]["symbol"] == ["SOL-PERP", "BTC-PERP"]
+    assert decode(table) == json.loads(rows)
+    assert len(columnar) < len(rows) / 2
+
+
+async def test_columnar_rates_are_numeric(upstream, tmp_path, monkeypatch):
+    from ranger_mcp import data as data_module
+    monkeypatch.setattr(data_module, "rate_store", None)
+    upstream.routes["/v1/funding_rates/accumulated"] = [
+        {"platform": "DRIFT", "symbol": "SOL-PERP", "created_at": "2025-01-01T00:00:00Z",
+         "accumulated_rate": "0.00012", "base_granularity": "1h"}]
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("data_get_accumulated_funding_rates", {"format": "columnar"})
+    table = json.loads(result[0].text)
+    assert table["columns"]["accumulated_rate"] == [0.00012]
+    assert table["columns"]["platform"] == [0]
+
+
+async def test_columnar_rejects_malformed_rows(upstream):
+    upstream.routes["/v1/liquidations/largest"] = [{"symbol": "SOL-PERP"}]
+    async with Client(ranger_mcp) as client:
+        with pytest.raises(Exception, match="Unexpected row format"):
+            await client.call_tool("data_get_largest_liquidations", {"format": "columnar"})
+
+
+def test_columns_are_typed_arrays_until_serialized():
+    table = to_columnar(HEATMAP, HEATMAP_COLUMNS)
+    assert table.columns["total_liquidated_usd"].typecode == "d"
+    assert table.columns["symbol"].typecode == "i"
+    assert isinstance(table.model_dump()["columns"]["symbol"], list)
+    assert json.loads(table.model_dump_json())["columns"]["total_liquidated_usd"][:2] == [0.0, 1.0]
@@ -0,0 +1,101 @@
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.data import liquidation_feed
+from ranger_mcp.feed import LiquidationFeed
+from ranger_mcp.hub import FEED_URI, ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+
+def liquidation(i: int) -> dict:
+    return {
+        "id": f"liq-{i}", "market_id": "SOL-PERP", "liquidator": "bot", "platform": "DRIFT",
+        "quantity": 1.0, "price": 100.0 + i, "created_at": f"2025-04-01T00:00:{i:02d}Z",
+        "liquidator_reward": 0.1,
+    }
+
+
+def latest(*ids: int) -> list[dict]:
+    # Newest first, like the upstream endpoint
+    return [liquidation(i) for i in sorted(ids, reverse=True)]
+
+
+@pytest.fixture
+async def feed(upstream, monkeypatch):
+    await liquidation_feed.reset()
+    monkeypatch.setattr(liquidation_feed, "interval", 0.01)
+    monkeypatch.setattr(liquidation_feed, "current_interval", 0.01)
+    yield liquidation_feed
+    await liquidation_feed.reset()
+
+
+async def test_polls_are_deduplicated_into_a_cursor_paged_buffer():
+    responses = [latest(1, 2, 3), latest(2, 3, 4, 5), latest(4, 5)]
+
+    async def fetch():
+        return responses.pop(0)
+
+    feed = LiquidationFeed(fetch, buffer_size=10)
+    assert [await feed.poll() for _ in range(3)] == [3, 2, 0]
+
+    page = await feed.read(cursor=2, limit=2)
+    assert [e["id"] for e in page["events"]] == ["liq-3", "liq-4"]
+    assert page["cursor"] == 4 and page["latest"] == 5 and not page["missed"]
+    assert (await feed.read(cursor=5))["events"] == []
+    await feed.stop()
+
+
+async def test_cursor_from_before_a_restart_starts_over_from_the_buffer():
+    async def fetch():
+        return latest(1, 2, 3)
+
+    feed = LiquidationFeed(fetch)
+    await feed.poll()
+    page = await feed.read(cursor=40)
+    assert [e["id"] for e in page["events"]] == ["liq-1", "liq-2", "liq-3"]
+    assert page["cursor"] == 3 and page["missed"]
+    await feed.stop()
+
+
+async def test_poll_without_overlap_is_counted_as_a_gap_and_speeds_up_polling():
+    responses = [latest(1, 2), latest(5, 6)]
+
+    async def fetch():
+        return responses.pop(0)
+
+    feed = LiquidationFeed(fetch, interval=2.0, min_interval=0.5)
+    await feed.poll()
+    await feed.poll()
+
+    assert feed.gaps == 1
+    assert feed.current_interval == 1.0
+
+
+async def test_subscribers_share_one_poller_and_get_notified(feed, upstream):
+    upstream.routes["/v1/liquidations/latest"] = latest(1, 2)
+    notifications = []
+
+    async def on_message(message):
+        notifications.append(message)
+
+    async with Client(ranger_mcp, message_handler=on_message) as first, Client(ranger_mcp) as second:
+        await first.session.subscribe_resource(FEED_URI)
+        await second.session.subscribe_resource(FEED_URI)
+        await asyncio.sleep(0.05)
+        upstream.routes["/v1/liquidations/latest"] = latest(2, 3)
+        await asyncio.sleep(0.05)
+
+        page = json.loads((await second.call_tool("data_get_liquidation_feed", {"cursor": 2}))[0].text)
+        assert [e["id"] for e in page["events"]] == ["liq-3"]
+        assert feed.status()["subscribers"] == 2
+
+    assert notifications
+    assert str(notifications[-1].root.params.uri) == FEED_URI
+    assert feed.status()["subscribers"] == 0  # Subscriptions end with their session
+    await feed.stop()
+    # One upstream request per poll, not per session (the last may have been cut short)
+    assert feed.polls <= upstream.count("/v1/liquidations/latest") <= feed.polls + 1
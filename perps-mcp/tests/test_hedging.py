@@ -0,0 +1,80 @@
+import asyncio
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.hedging import Hedger
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+TOTALS = {"last_1h": 1.0, "last_4h": 2.0, "last_12h": 3.0, "last_24h": 4.0}
+
+
+def make_hedger(**overrides) -> Hedger:
+    options = dict(retries=2, backoff_base=0.0, backoff_max=0.0, hedge_enabled=True,
+                   hedge_percentile=0.9, hedge_min_samples=5, hedge_budget=1.0)
+    options.update(overrides)
+    hedger = Hedger(**options)
+    for _ in range(10):
+        hedger.latencies.observe("/v1/test", 0.01)
+    return hedger
+
+
+def slow_then_fast():
+    calls = []
+
+    async def send():
+        calls.append(None)
+        await asyncio.sleep(0.2 if len(calls) == 1 else 0.0)
+        return httpx.Response(200, json={"call": len(calls)})
+    return send, calls
+
+
+async def test_slow_request_is_hedged_and_the_loser_cancelled():
+    hedger = make_hedger()
+    send, calls = slow_then_fast()
+
+    response = await asyncio.wait_for(hedger.get("/v1/test", send), timeout=0.15)
+
+    assert response.json() == {"call": 2}
+    assert len(calls) == 2
+    assert hedger.status()["hedges_won"] == 1
+
+
+async def test_hedging_stays_within_budget():
+    hedger = make_hedger(hedge_budget=0.0)
+    send, calls = slow_then_fast()
+
+    response = await hedger.get("/v1/test", send)
+
+    assert response.json() == {"call": 1}
+    assert len(calls) == 1
+    assert hedger.status()["hedged"] == 0
+
+
+async def test_data_requests_retry_server_and_network_errors(upstream):
+    replies = [httpx.Response(503), httpx.ConnectError("reset"), TOTALS]
+
+    async def flaky(request):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return httpx.Response(200, json=reply) if isinstance(reply, dict) else reply
+
+    upstream.routes["/v1/liquidations/totals"] = flaky
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("data_get_liquidation_totals", {})
+
+    assert '"last_24h"' in result[0].text
+    assert upstream.count("/v1/liquidations/totals") == 3
+
+
+async def test_client_errors_are_not_retried(upstream):
+    upstream.routes["/v1/liquidations/totals"] = httpx.Response(400, json={"message": "bad"})
+    async with Client(ranger_mcp) as client:
+        with pytest.raises(Exception, match="400"):
+            await client.call_tool("data_get_liquidation_totals", {})
+
+    assert upstream.count("/v1/liquidations/totals") == 1
@@ -0,0 +1,67 @@
+import json
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from ranger_mcp import metrics
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.hedging import data_hedger
+from ranger_mcp.metrics import Histogram
+
+pytestmark = pytest.mark.anyio
+
+TOTALS = {"last_1h": 1.0, "last_4h": 2.0, "last_12h": 3.0, "last_24h": 4.0}
+
+
+def test_histogram_renders_cumulative_buckets_and_estimates_quantiles():
+    histogram = Histogram("test_seconds", "Test.", ("tool",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 5.0):
+        histogram.observe(("a",), value)
+
+    lines = histogram.render()
+
+    assert 'test_seconds_bucket{tool="a",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{tool="a",le="1"} 3' in lines
+    assert 'test_seconds_bucket{tool="a",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{tool="a"} 4' in lines
+    assert 0.1 < histogram.quantile(("a",), 0.5) <= 1.0
+
+
+async def test_tool_and_upstream_calls_are_recorded(upstream):
+    upstream.routes["/v1/positions"] = httpx.Response(503, json={"message": "down"})
+    upstream.routes["/v1/funding_rates/trend"] = []
+    tool_calls = metrics.TOOL_CALLS.values.copy()
+    requests = metrics.UPSTREAM_REQUESTS.values.copy()
+
+    async with Client(ranger_mcp) as client:
+        await client.call_tool("data_get_funding_rate_trend", {"symbol": "SOL-PERP"})
+        with pytest.raises(Exception, match="503"):
+            await client.call_tool("data_get_positions", {"public_key": "wallet"})
+        status = json.loads((await client.call_tool("ranger_status", {}))[0].text)
+
+    def delta(counter, labels, before):
+        return counter.values.get(labels, 0) - before.get(labels, 0)
+
+    assert delta(metrics.TOOL_CALLS, ("data_get_funding_rate_trend", "ok"), tool_calls) == 1
+    assert delta(metrics.TOOL_CALLS, ("data_get_positions", "error"), tool_calls) == 1
+    assert delta(metrics.UPSTREAM_REQUESTS, ("data", "/v1/positions", "503"), requests) == 1 + data_hedger.retries
+    assert metrics.TOOL_IN_FLIGHT.values[("data_get_positions",)] == 0
+    assert "FundingRateTrend" in status["metrics"]["validation"]
+    assert status["metrics"]["upstream"]["data"]["/v1/positions"]["statuses"]["503"] >= 1
+    assert status["metrics"]["tools"]["data_get_positions"]["errors"] >= 1
+
+
+async def test_metrics_route_serves_prometheus_text(upstream):
+    upstream.routes["/v1/liquidations/totals"] = TOTALS
+    async with Client(ranger_mcp) as client:
+        await client.call_tool("data_get_liquidation_totals", {})
+
+    transport = httpx.ASGITransport(app=ranger_mcp.sse_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://hub") as http:
+        response = await http.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "# TYPE ranger_tool_duration_seconds histogram" in response.text
+    assert 'ranger_upstream_requests_total{upstream="data",endpoint="/v1/liquidations/totals",status="200"}' in response.text
@@ -0,0 +1,88 @@
+import json
+import time
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.clients import upstream_clients
+from ranger_mcp.cache import response_cache
+from ranger_mcp.ratelimit import rate_limiter
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.mock_api import DATA_ENDPOINTS, SOR_ENDPOINTS, MockConfig, create_mock_api
+
+pytestmark = pytest.mark.anyio
+
+FEE_PAYER = "11111111111111111111111111111111"
+QUOTE = {
+    "fee_payer": FEE_PAYER, "symbol": "SOL", "side": "Long", "size": 1.0, "collateral": 10.0,
+    "size_denomination": "SOL", "adjustment_type": "Increase",
+}
+
+
+@pytest.fixture
+async def mock_api(monkeypatch):
+    app = create_mock_api(MockConfig(rows=20))
+    response_cache.clear()
+    rate_limiter.reset()
+    await upstream_clients.aclose()
+    monkeypatch.setattr(upstream_clients, "transport", httpx.ASGITransport(app=app))
+    yield app
+    response_cache.clear()
+    rate_limiter.reset()
+    await upstream_clients.aclose()
+
+
+async def test_mock_serves_every_upstream_endpoint_used_by_the_tools(mock_api):
+    calls = {
+        "sor_get_trade_quote": {"params": QUOTE},
+        "sor_increase_position": {"params": QUOTE},
+        "sor_decrease_position": {"params": {**QUOTE, "adjustment_type": "DecreaseDrift"}},
+        "sor_close_position": {"params": {
+            "fee_payer": FEE_PAYER, "symbol": "SOL", "side": "Long", "adjustment_type": "CloseAll"}},
+        "sor_withdraw_balance_drift": {"params": {"fee_payer": FEE_PAYER, "symbol": "USDC", "amount": 1}},
+        "data_get_positions": {"public_key": FEE_PAYER},
+        "data_get_trade_history": {"public_key": FEE_PAYER},
+        "data_get_latest_liquidations": {},
+        "data_get_liquidation_totals": {},
+        "data_get_liquidation_capitulation_signals": {},
+        "data_get_liquidation_heatmap": {},
+        "data_get_largest_liquidations": {},
+        "data_get_funding_rate_arbs": {},
+        "data_get_accumulated_funding_rates": {"symbol": "SOL-PERP"},
+        "data_get_accumulated_borrow_rates": {"symbol": "SOL-PERP"},
+        "data_get_extreme_funding_rates": {},
+        "data_get_oi_weighted_funding_rates": {},
+        "data_get_funding_rate_trend": {"symbol": "SOL-PERP"},
+    }
+    async with Client(ranger_mcp) as client:
+        for tool, arguments in calls.items():
+            result = await client.call_tool(tool, arguments)
+            assert result[0].text, tool
+
+    assert set(mock_api.state.requests) == set(DATA_ENDPOINTS) | set(SOR_ENDPOINTS)
+
+
+async def test_mock_injects_latency_and_errors(mock_api):
+    config = mock_api.state.config
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=mock_api), base_url="http://mock") as http:
+        config.latency_ms = 50
+        started = time.perf_counter()
+        assert (await http.get("/v1/liquidations/totals")).status_code == 200
+        assert time.perf_counter() - started >= 0.05
+
+        await http.post("/_mock/config", json={"latency_ms": 0, "error_rate": 1.0, "error_status": 429, "retry_after": 0.01})
+        response = await http.get("/v1/liquidations/totals")
+        assert response.status_code == 429
+        assert response.headers["Retry-After"] == "0.01"
+
+    async with Client(ranger_mcp) as client:
+        with pytest.raises(Exception, match="429"):
+            await client.call_tool("data_get_liquidation_totals", {})
+
+
+async def test_mock_payload_size_follows_rows(mock_api):
+    mock_api.state.config.rows = 7
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("data_get_latest_liquidations", {})
+    assert len(json.loads(result[0].text)) == 7
@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+
+from ranger_mcp.cache import ResponseCache
+from ranger_mcp.prefetch import Prefetcher
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def fetcher(calls: list, name: str):
+    async def fetch():
+        calls.append(name)
+        return {"name": name, "n": calls.count(name)}, 10
+    return fetch
+
+
+async def read(cache, symbol, calls, times=1):
+    for _ in range(times):
+        value = await cache.get_or_fetch("/x", {"symbol": symbol}, fetcher(calls, symbol))
+    return value
+
+
+async def test_hot_entries_are_refreshed_before_they_expire():
+    clock = FakeClock()
+    prefetcher = Prefetcher(budget=10, lead_seconds=2.0, min_reads=3, clock=clock)
+    cache = ResponseCache({"/x": 10.0}, max_bytes=1000, clock=clock, prefetcher=prefetcher)
+    calls = []
+    await read(cache, "SOL", calls, times=3)  # Hot
+    await read(cache, "BTC", calls)  # Read once: cold
+
+    assert prefetcher.run_once() == 0  # Not due yet
+    clock.now += 8.5
+    assert prefetcher.run_once() == 1
+    await asyncio.sleep(0)
+    assert calls == ["SOL", "BTC", "SOL"]
+
+    clock.now += 2  # SOL was refreshed; BTC has expired
+    assert (await read(cache, "SOL", calls))["n"] == 2
+    assert cache.stats()["stale_hits"] == 0
+    await prefetcher.reset()
+
+
+async def test_budget_goes_to_the_hottest_entries_and_idle_ones_are_dropped():
+    clock = FakeClock()
+    prefetcher = Prefetcher(budget=1, min_reads=2, idle_seconds=30, clock=clock)
+    cache = ResponseCache({"/x": 10.0}, max_bytes=1000, clock=clock, prefetcher=prefetcher)
+    calls = []
+    await read(cache, "SOL", calls, times=5)
+    await read(cache, "BTC", calls, times=2)
+
+    clock.now += 9
+    assert prefetcher.run_once() == 1
+    await asyncio.sleep(0)
+    assert calls.count("SOL") == 2 and calls.count("BTC") == 1
+    assert prefetcher.deferred >= 1
+
+    clock.now += 31
+    prefetcher.run_once()
+    assert prefetcher.status()["tracked"] == 0
+    await prefetcher.reset()
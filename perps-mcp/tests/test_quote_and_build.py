@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+META = {"venues": [], "total_collateral": 50.0, "total_size": 1.0, "average_price": 101.0}
+INCREASE = {
+    "fee_payer": "payer", "symbol": "SOL", "side": "Long", "size": 1.0, "collateral": 50.0,
+    "size_denomination": "SOL", "adjustment_type": "Increase",
+}
+
+
+async def test_returns_quote_and_transaction_from_one_upstream_call(upstream):
+    upstream.routes["/v1/increase_position"] = {"message": "dHg=", "meta": META, "average_price": 101.0, "size": 1.0}
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool(
+            "sor_quote_and_build", {"params": {**INCREASE, "expected_price": 100.0}, "max_price_deviation_bps": 150})
+
+    response = json.loads(result[0].text)
+    assert response["message"] == "dHg=" and response["quote"]["average_price"] == 101.0
+    assert response["price_deviation_bps"] == 100.0
+    assert upstream.count("/v1/increase_position") == 1 and upstream.count("/v1/order_metadata") == 0
+
+
+async def test_guard_rejects_adverse_prices_by_direction(upstream):
+    upstream.routes["/v1/close_position"] = {"message": "dHg=", "meta": META, "average_price": 99.0}
+    close = {"fee_payer": "payer", "symbol": "SOL", "adjustment_type": "CloseAll", "expected_price": 100.0}
+    async with Client(ranger_mcp) as client:
+        # Closing a long sells: 99 instead of 100 is 100 bps worse
+        with pytest.raises(Exception, match="100.0 bps worse"):
+            await client.call_tool("sor_quote_and_build",
+                                   {"params": {**close, "side": "Long"}, "max_price_deviation_bps": 50})
+        # Closing a short buys: 99 is better than expected
+        result = await client.call_tool("sor_quote_and_build",
+                                        {"params": {**close, "side": "Short"}, "max_price_deviation_bps": 50})
+        assert json.loads(result[0].text)["price_deviation_bps"] == -100.0
+
+        with pytest.raises(Exception, match="requires params.expected_price"):
+            await client.call_tool("sor_quote_and_build", {"params": INCREASE, "max_price_deviation_bps": 50})
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.cache import SharedResponseStore
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.models import QuoteParams, QuoteResponse
+from ranger_mcp.quote_cache import QuoteCache
+
+pytestmark = pytest.mark.anyio
+
+PARAMS = QuoteParams(
+    fee_payer="payer", symbol="SOL", side="Long", size=1.0, collateral=50.0,
+    size_denomination="SOL", adjustment_type="Increase")
+
+QUOTE = QuoteResponse(venues=[], total_collateral=50.0, total_size=1.0, average_price=101.0)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_cached_quotes_report_their_age_and_respect_the_cap():
+    clock = FakeClock()
+    cache = QuoteCache(max_age_ms=2000, clock=clock)
+    cache.put(PARAMS, QUOTE)
+    clock.now += 1.5
+
+    assert cache.get(PARAMS, max_age_ms=1000) is None
+    assert cache.get(PARAMS, max_age_ms=1600).age_ms == 1500
+    clock.now += 1.0
+    assert cache.get(PARAMS, max_age_ms=60_000) is None  # Capped at 2000 ms
+    assert cache.get(PARAMS.model_copy(update={"side": "Short"}), max_age_ms=60_000) is None
+
+
+def test_size_buckets():
+    exact, bucketed = QuoteCache(), QuoteCache(bucket=0.01)
+    for cache in (exact, bucketed):
+        cache.put(PARAMS, QUOTE)
+    nearby = PARAMS.model_copy(update={"size": 1.004, "collateral": 50.1})
+
+    assert exact.get(nearby, max_age_ms=1000) is None
+    assert bucketed.get(nearby, max_age_ms=1000).average_price == 101.0
+    assert bucketed.get(PARAMS.model_copy(update={"size": 1.05}), max_age_ms=1000) is None
+
+
+async def test_quotes_published_by_one_worker_answer_requotes_in_another(tmp_path):
+    store = SharedResponseStore(tmp_path / "cache.sqlite")
+    fetcher, other = QuoteCache(shared=store), QuoteCache(shared=SharedResponseStore(store.path))
+    await fetcher.publish(PARAMS, QUOTE)
+
+    quote = await other.lookup(PARAMS, max_age_ms=2000)
+    assert quote.average_price == 101.0 and 0 <= quote.age_ms < 2000
+    assert other.get(PARAMS, max_age_ms=2000) is not None  # Now cached locally too
+    assert await other.lookup(PARAMS.model_copy(update={"side": "Short"}), max_age_ms=2000) is None
+    assert other.stats()["shared_hits"] == 1
+
+
+async def test_requotes_opt_in_and_transactions_bypass_the_cache(upstream):
+    upstream.routes["/v1/order_metadata"] = QUOTE.model_dump()
+    upstream.routes["/v1/increase_position"] = {"message": "tx", "meta": QUOTE.model_dump()}
+    params = PARAMS.model_dump()
+    async with Client(ranger_mcp) as client:
+        await client.call_tool("sor_get_trade_quote", {"params": params})
+        await client.call_tool("sor_get_trade_quote", {"params": params})  # No max_age_ms: fresh
+        result = await client.call_tool("sor_get_trade_quote", {"params": params, "max_age_ms": 2000})
+        for _ in range(2):
+            await client.call_tool("sor_increase_position", {"params": params})
+
+    assert upstream.count("/v1/order_metadata") == 2
+    assert json.loads(result[0].text)["age_ms"] >= 0
+    assert upstream.count("/v1/increase_position") == 2
@@ -0,0 +1,96 @@
+import asyncio
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.ratelimit import AdaptiveRateLimiter, Priority, parse_retry_after, rate_limiter
+
+pytestmark = pytest.mark.anyio
+
+TOTALS = {"last_1h": 1.0, "last_4h": 2.0, "last_12h": 3.0, "last_24h": 4.0}
+
+
+def test_retry_after_accepts_seconds_and_http_dates():
+    assert parse_retry_after("2") == 2.0
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:10 GMT", now=1445412480.0) == 10.0
+    assert parse_retry_after("soon") is None
+
+
+async def test_queued_requests_are_released_by_priority():
+    limiter = AdaptiveRateLimiter(min_rate=50)
+    limiter.on_throttled("data", retry_after=0.02)
+    order = []
+
+    async def request(priority):
+        await limiter.acquire(priority)
+        order.append(priority)
+
+    await asyncio.gather(*(request(p) for p in (
+        Priority.BACKGROUND, Priority.DATA, Priority.QUOTE, Priority.TRANSACTION, Priority.DATA)))
+
+    assert order == [Priority.TRANSACTION, Priority.QUOTE, Priority.DATA, Priority.DATA, Priority.BACKGROUND]
+
+
+async def test_reset_cancels_queued_requests():
+    limiter = AdaptiveRateLimiter(min_rate=50)
+    limiter.on_throttled("data", retry_after=10)
+    waiting = asyncio.create_task(limiter.acquire(Priority.DATA))
+    await asyncio.sleep(0)
+    limiter.reset()
+    with pytest.raises(asyncio.CancelledError):
+        await waiting
+    await limiter.acquire(Priority.DATA)  # Unlimited again
+
+
+async def test_concurrent_throttles_halve_the_rate_once():
+    limiter = AdaptiveRateLimiter(min_rate=1)
+    for _ in range(20):
+        await limiter.acquire(Priority.DATA)
+    for _ in range(5):
+        limiter.on_throttled("data", retry_after=None)
+    assert limiter.rate == 10.0
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(10.2)
+
+
+async def test_concurrency_hint_follows_the_learned_rate():
+    assert AdaptiveRateLimiter().concurrency_hint(16) == 16
+    limiter = AdaptiveRateLimiter(min_rate=1)
+    for _ in range(20):
+        await limiter.acquire(Priority.DATA)
+    limiter.on_throttled("data", retry_after=None)
+    # Fan-outs are capped at about one second's worth of the learned rate
+    assert limiter.rate == 10.0 and limiter.concurrency_hint(16) == 10
+    assert limiter.concurrency_hint(4) == 4
+
+
+async def test_429_is_retried_after_retry_after(upstream):
+    responses = [httpx.Response(429, headers={"Retry-After": "0.05"}, json={"message": "slow down"})]
+
+    async def totals(request):
+        return responses.pop() if responses else TOTALS
+    upstream.routes["/v1/liquidations/totals"] = totals
+
+    loop = asyncio.get_running_loop()
+    started = loop.time()
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("data_get_liquidation_totals", {})
+
+    assert '"last_24h": 4.0' in result[0].text
+    assert upstream.count("/v1/liquidations/totals") == 2
+    assert loop.time() - started >= 0.05
+    assert rate_limiter.throttled >= 1 and rate_limiter.rate is not None
+
+
+async def test_persistent_429_still_fails_with_rate_limit_error(upstream):
+    upstream.routes["/v1/close_position"] = httpx.Response(429, headers={"Retry-After": "60"})
+    params = {"fee_payer": "wallet", "symbol": "SOL", "side": "Long", "adjustment_type": "CloseAll"}
+
+    async with Client(ranger_mcp) as client:
+        with pytest.raises(Exception, match=r"Rate limit exceeded"):
+            await client.call_tool("sor_close_position", {"params": params})
+
+    # Retry-After is longer than rate_limit_max_wait, so it is not waited out
+    assert upstream.count("/v1/close_position") == 1
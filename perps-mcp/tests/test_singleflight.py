@@ -0,0 +1,102 @@
+import asyncio
+import json
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.cache import SharedResponseStore
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_callers_share_one_call():
+    flights = SingleFlight()
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return {"ok": True}
+
+    waiters = [asyncio.create_task(flights.do("k", fetch)) for _ in range(10)]
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*waiters)
+    assert calls == [1]
+    assert all(r is results[0] for r in results)
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 9, "joined": 0}
+
+
+async def test_cancelling_one_waiter_keeps_shared_call_alive():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def fetch():
+        await release.wait()
+        return 42
+
+    leader = asyncio.create_task(flights.do("k", fetch))
+    follower = asyncio.create_task(flights.do("k", fetch))
+    await asyncio.sleep(0)
+    leader.cancel()
+    release.set()
+    assert await follower == 42
+    assert leader.cancelled()
+
+
+async def test_errors_are_shared_and_not_cached():
+    flights = SingleFlight()
+
+    async def fail():
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(
+        flights.do("k", fail), flights.do("k", fail), return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    async def ok():
+        return "recovered"
+    assert await flights.do("k", ok) == "recovered"
+
+
+async def test_workers_join_the_call_of_the_lease_holder(tmp_path):
+    store = SharedResponseStore(tmp_path / "cache.sqlite")
+    workers = [SingleFlight(), SingleFlight()]
+    release = asyncio.Event()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await release.wait()
+        return {"price": len(calls)}
+
+    # Each worker has its own store connection to the same file
+    holder = asyncio.create_task(workers[0].do("k", fetch, shared=store))
+    await asyncio.sleep(0.05)
+    waiter = asyncio.create_task(workers[1].do("k", fetch, shared=SharedResponseStore(store.path)))
+    await asyncio.sleep(0.05)
+    release.set()
+    assert await holder == await waiter == {"price": 1}
+    assert calls == [1] and workers[1].stats()["joined"] == 1
+
+    # A later call does not reuse the published result
+    assert await workers[1].do("k", fetch, shared=store) == {"price": 2}
+
+
+async def test_identical_heatmap_requests_are_coalesced(upstream):
+    async def slow_heatmap(request):
+        await asyncio.sleep(0.05)
+        return [{"symbol": "SOL-PERP", "platform": "DRIFT",
+                 "start": "2025-01-01T00:00:00Z", "total_liquidated_usd": 1.0}]
+    upstream.routes["/v1/liquidations/heatmap"] = slow_heatmap
+
+    async with Client(ranger_mcp) as client:
+        results = await asyncio.gather(*(
+            client.call_tool("data_get_liquidation_heatmap", {"granularity": "1h"})
+            for _ in range(10)))
+    assert upstream.count("/v1/liquidations/heatmap") == 1
+    assert all(json.loads(r[0].text)[0]["symbol"] == "SOL-PERP" for r in results)
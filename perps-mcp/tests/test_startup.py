@@ -0,0 +1,35 @@
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+from fastmcp import Client
+from fastmcp.client.transports import StdioTransport
+
+pytestmark = pytest.mark.anyio
+
+
+def test_importing_the_hub_defers_sub_servers_and_settings():
+    code = (
+        "import ranger_mcp.hub\n"
+        "from ranger_mcp.settings import settings\n"
+        "assert settings._resolved is None, 'settings were resolved at import'\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        env=os.environ.copy(), capture_output=True, text=True, check=True)
+
+    # The import time itself is tracked against a budget by benchmarks/startup.py
+    imported = set(re.findall(r"import time:\s+\d+ \|\s+\d+ \|\s+(\S+)", result.stderr))
+    assert "ranger_mcp.hub" in imported
+    for module in ("ranger_mcp.sor", "ranger_mcp.data", "ranger_mcp.models", "numpy"):
+        assert module not in imported, f"{module} is imported with the hub"
+
+
+async def test_first_tools_list_over_stdio_includes_lazily_mounted_tools():
+    command = "from ranger_mcp.hub import ranger_mcp; ranger_mcp.run('stdio')"
+    async with Client(StdioTransport(sys.executable, ["-c", command], env=os.environ.copy())) as client:
+        names = {tool.name for tool in await client.list_tools()}
+
+    assert {"ranger_status", "sor_get_trade_quote", "data_get_liquidation_feed"} <= names
@@ -0,0 +1,127 @@
+import json
+import multiprocessing
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp import data as data_module
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.timeseries import RateSeries, RateSeriesStore
+
+pytestmark = pytest.mark.anyio
+
+
+def rate(hour, value, symbol="SOL-PERP", platform="DRIFT"):
+    return {"platform": platform, "symbol": symbol, "created_at": f"2025-01-01T{hour:02d}:00:00Z",
+            "accumulated_rate": value, "base_granularity": "1h"}
+
+
+def test_series_appends_only_rows_past_watermark(tmp_path):
+    series = RateSeries(tmp_path / "s")
+    assert series.append([rate(1, 0.1), rate(0, 0.05)], synced_at=1.0) == 2
+    # Overlapping resync: only hour 2 is new, plus a late row at the watermark for ETH
+    assert series.append([rate(0, 0.05), rate(1, 0.1), rate(2, 0.2),
+                          rate(1, 0.3, symbol="ETH-PERP")], synced_at=2.0) == 2
+    assert series.append([rate(2, 0.2), rate(2, 0.4, symbol="ETH-PERP")], synced_at=3.0) == 1
+
+    reopened = RateSeries(tmp_path / "s")
+    rows = reopened.read()
+    assert [(r["created_at"][11:13], r["symbol"]) for r in rows] == [
+        ("00", "SOL-PERP"), ("01", "SOL-PERP"), ("01", "ETH-PERP"), ("02", "SOL-PERP"), ("02", "ETH-PERP")]
+    assert rows[1]["accumulated_rate"] == "0.1"
+    assert list(reopened.rates()) == [0.05, 0.1, 0.3, 0.2, 0.4]
+    assert reopened.read(since=reopened.timestamps()[1])[0]["created_at"] == "2025-01-01T02:00:00Z"
+
+
+def test_late_rows_below_the_watermark_are_merged_by_key(tmp_path):
+    series = RateSeries(tmp_path / "s")
+    series.append([rate(h, 0.1 * h) for h in range(4)], synced_at=1.0)
+    # FLASH's hour 1 arrives after DRIFT is already at hour 3
+    assert series.append([rate(3, 0.3), rate(1, 0.5, platform="FLASH")], synced_at=2.0) == 1
+    assert series.append([rate(1, 0.5, platform="FLASH"), rate(4, 0.4)], synced_at=3.0) == 1
+
+    reopened = RateSeries(tmp_path / "s")
+    assert [(r["created_at"][11:13], r["platform"]) for r in reopened.read()] == [
+        ("00", "DRIFT"), ("01", "DRIFT"), ("01", "FLASH"), ("02", "DRIFT"), ("03", "DRIFT"), ("04", "DRIFT")]
+    assert list(reopened.timestamps()) == sorted(reopened.timestamps())
+    assert list(reopened.rates()) == pytest.approx([0.0, 0.1, 0.5, 0.2, 0.3, 0.4])
+
+
+def append_hours(path, platform):
+    series = RateSeries(path)
+    for hour in range(24):
+        series.append([rate(hour, 0.01 * hour, platform=platform)], synced_at=float(hour))
+
+
+def test_processes_appending_to_one_series_do_not_interleave(tmp_path):
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=append_hours, args=(tmp_path / "s", platform))
+               for platform in ("DRIFT", "FLASH", "JUPITER")]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+        assert worker.exitcode == 0
+
+    rows = RateSeries(tmp_path / "s").read()
+    assert len(rows) == 72
+    assert sorted((r["platform"], r["created_at"]) for r in rows) == sorted(
+        (p, f"2025-01-01T{h:02d}:00:00Z") for p in ("DRIFT", "FLASH", "JUPITER") for h in range(24))
+    assert [r["created_at"] for r in rows] == sorted(r["created_at"] for r in rows)
+
+
+def test_uncommitted_bytes_are_discarded(tmp_path):
+    series = RateSeries(tmp_path / "s")
+    series.append([rate(0, 0.1)], synced_at=1.0)
+    # Simulate a crash after column data was written but before meta.json was replaced
+    with open(tmp_path / "s" / "symbol.str", "ab") as f:
+        f.write(b"garbage")
+    series = RateSeries(tmp_path / "s")
+    series.append([rate(1, 0.2)], synced_at=2.0)
+    assert [r["symbol"] for r in series.read()] == ["SOL-PERP", "SOL-PERP"]
+
+
+async def test_store_serves_from_disk_between_syncs(tmp_path):
+    now = [100.0]
+    store = RateSeriesStore(tmp_path, refresh_seconds=60, clock=lambda: now[0])
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        return [rate(h, 0.01 * h) for h in range(len(fetches) + 1)]
+
+    params = {"symbol": "SOL-PERP"}
+    assert len(await store.query("/v1/funding_rates/accumulated", params, fetch)) == 2
+    assert len(await store.query("/v1/funding_rates/accumulated", params, fetch)) == 2
+    assert len(fetches) == 1
+    now[0] += 61
+    assert len(await store.query("/v1/funding_rates/accumulated", params, fetch)) == 3
+    # A restart keeps the history and the sync time
+    restarted = RateSeriesStore(tmp_path, refresh_seconds=60, clock=lambda: now[0])
+    assert len(await restarted.query("/v1/funding_rates/accumulated", params, fetch)) == 3
+    assert len(fetches) == 2
+
+
+async def test_store_returns_only_the_upstream_window(tmp_path):
+    store = RateSeriesStore(tmp_path, refresh_seconds=0)
+    windows = iter([[rate(0, 0.0), rate(1, 0.1)], [rate(1, 0.1), rate(2, 0.2)], []])
+
+    async def fetch():
+        return next(windows)
+
+    params = {"symbol": "SOL-PERP"}
+    assert len(await store.query("/v1/funding_rates/accumulated", params, fetch)) == 2
+    rows = await store.query("/v1/funding_rates/accumulated", params, fetch)
+    assert [r["created_at"][11:13] for r in rows] == ["01", "02"]
+    # An empty response keeps the last window rather than the whole history
+    assert len(await store.query("/v1/funding_rates/accumulated", params, fetch)) == 2
+
+
+async def test_accumulated_rates_tool_uses_store(upstream, tmp_path, monkeypatch):
+    monkeypatch.setattr(data_module, "rate_store", RateSeriesStore(tmp_path, refresh_seconds=60))
+    upstream.routes["/v1/borrow_rates/accumulated"] = [rate(1, 0.2), rate(0, 0.1)]
+    async with Client(ranger_mcp) as client:
+        result = await client.call_tool("data_get_accumulated_borrow_rates", {"symbol": "SOL-PERP"})
+    rows = json.loads(result[0].text)
+    assert [r["accumulated_rate"] for r in rows] == ["0.1", "0.2"]
+    assert any((tmp_path / "v1_borrow_rates_accumulated").iterdir())
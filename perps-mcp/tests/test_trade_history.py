@@ -0,0 +1,143 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def ts(value):
+    return value.strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def trade(i, created_at, symbol="SOL-PERP", platform="DRIFT", pnl=1.0, fees=0.1):
+    return {
+        "id": f"t{i}", "symbol": symbol, "side": "Long", "quantity": 1.0, "entry_price": 100.0,
+        "fill_price": 101.0, "position_leverage": 2.0, "realized_pnl": pnl, "fees_paid": fees,
+        "order_type": "market", "order_action": "open", "is_closed": False,
+        "created_at": ts(created_at), "opened_at": ts(created_at), "platform": platform,
+        "tx_signature": f"sig{i}",
+    }
+
+
+def history_route(trades):
+    """Serves trades whose created_at falls inside [start_time, end_time], inclusive."""
+    async def route(request):
+        start = request.url.params["start_time"]
+        end = request.url.params["end_time"]
+        await asyncio.sleep(0.005)
+        selected = [t for t in trades if start <= t["created_at"] <= end]
+        return {"trades": list(reversed(selected))}
+    return route
+
+
+async def test_trade_history_pages_cover_range_in_order(upstream):
+    # One trade every 6 hours for 10 days; some land exactly on window boundaries
+    trades = [trade(i, START + timedelta(hours=6 * i)) for i in range(40)]
+    upstream.routes["/v1/trade_history"] = history_route(trades)
+
+    collected, pages, cursor = [], 0, None
+    async with Client(ranger_mcp) as client:
+        while True:
+            args = {"public_key": "wallet", "start_time": ts(START),
+                    "end_time": ts(START + timedelta(days=10)), "windows_per_page": 3}
+            if cursor:
+                args["cursor"] = cursor
+            page = json.loads((await client.call_tool("data_get_trade_history_page", args))[0].text)
+            collected.extend(page["trades"])
+            pages += 1
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+
+    assert pages == 4
+    assert [t["id"] for t in collected] == [f"t{i}" for i in range(40)]
+    assert upstream.count("/v1/trade_history") == 10
+
+
+async def test_trade_history_progress_counts_the_windows_of_a_partial_page(upstream):
+    from ranger_mcp.data import get_trade_history_page
+
+    class ProgressContext:
+        def __init__(self):
+            self.progress = []
+
+        async def info(self, message):
+            pass
+
+        async def report_progress(self, progress, total):
+            self.progress.append((progress, total))
+
+    upstream.routes["/v1/trade_history"] = history_route([])
+    ctx = ProgressContext()
+    # 2.5 days in daily windows: 3 windows, fewer than windows_per_page
+    await get_trade_history_page(
+        public_key="wallet", platforms=None, symbols=None, start_time=ts(START),
+        end_time=ts(START + timedelta(hours=60)), cursor=None, window_hours=24, windows_per_page=7,
+        max_concurrency=None, ctx=ctx)
+    assert ctx.progress == [(1, 3), (2, 3), (3, 3)]
+
+
+async def test_trade_history_page_rejects_bad_cursor(upstream):
+    async with Client(ranger_mcp) as client:
+        with pytest.raises(Exception, match="Invalid trade history cursor"):
+            await client.call_tool("data_get_trade_history_page",
+                                   {"public_key": "wallet", "cursor": "not-a-cursor"})
+
+
+async def test_query_trade_history_syncs_incrementally_and_aggregates(upstream):
+    from ranger_mcp.trade_store import trade_store
+    trade_store.clear()
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    trades = [
+        trade(1, now - timedelta(days=3), pnl=5.0, fees=0.5),
+        trade(2, now - timedelta(days=2), symbol="BTC-PERP", platform="JUPITER", pnl=-2.0, fees=0.25),
+        trade(3, now - timedelta(hours=1), pnl=1.0, fees=0.1),
+    ]
+    upstream.routes["/v1/trade_history"] = history_route(trades)
+
+    async with Client(ranger_mcp) as client:
+        first = json.loads((await client.call_tool("data_query_trade_history", {"public_key": "wallet"}))[0].text)
+        backfill_calls = upstream.count("/v1/trade_history")
+
+        trades.append(trade(4, now - timedelta(seconds=5), platform="JUPITER", pnl=0.5, fees=0.05))
+        args = {"public_key": "wallet", "platforms": ["JUPITER"], "refresh": True}
+        second = json.loads((await client.call_tool("data_query_trade_history", args))[0].text)
+        by_signature = json.loads((await client.call_tool(
+            "data_query_trade_history", {"public_key": "wallet", "tx_signature": "sig1"}))[0].text)
+
+    assert first["new_trades"] == 3 and [t["id"] for t in first["trades"]] == ["t3", "t2", "t1"]
+    assert first["total"]["realized_pnl"] == 4.0
+    assert {a["key"]: a["fees_paid"] for a in first["by_platform"]} == {"DRIFT": 0.6, "JUPITER": 0.25}
+    assert backfill_calls >= 30  # 30 days in daily windows
+    # Only the window since the watermark was fetched again
+    assert upstream.count("/v1/trade_history") - backfill_calls <= 2
+    assert second["new_trades"] == 1 and [t["id"] for t in second["trades"]] == ["t4", "t2"]
+    assert second["total"]["realized_pnl"] == -1.5
+    assert by_signature["new_trades"] == 0 and [t["id"] for t in by_signature["trades"]] == ["t1"]
+    trade_store.clear()
+
+
+async def test_empty_first_sync_sets_the_watermark():
+    from ranger_mcp.trade_store import TradeStore
+    now = [START.timestamp()]
+    store = TradeStore(None, refresh_seconds=60, backfill_days=30, clock=lambda: now[0])
+    ranges = []
+
+    async def fetch(start, end):
+        ranges.append((start, end))
+        return []
+
+    assert await store.sync("wallet", fetch) == 0
+    assert store.account("wallet") == (int(START.timestamp() * 1_000_000), START.timestamp())
+    now[0] += 3600
+    await store.sync("wallet", fetch)
+    # The second sync resumes from the first one's end instead of backfilling again
+    assert ranges[0][0] == START - timedelta(days=30)
+    assert ranges[1] == (START - timedelta(seconds=60), START + timedelta(hours=1))
@@ -0,0 +1,43 @@
+import json
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.clients import upstream_clients
+from ranger_mcp.hub import ranger_mcp
+
+pytestmark = pytest.mark.anyio
+
+TOTALS = {"last_1h": 1.0, "last_4h": 2.0, "last_12h": 3.0, "last_24h": 4.0}
+
+
+async def test_data_calls_reuse_one_pooled_client(upstream):
+    upstream.routes["/v1/positions"] = {"positions": []}
+    async with Client(ranger_mcp) as client:
+        await client.call_tool("data_get_positions", {"public_key": "abc"})
+        first = upstream_clients.get("data")
+        result = await client.call_tool("data_get_positions", {"public_key": "abc"})
+        assert upstream_clients.get("data") is first
+        assert upstream_clients.get("sor") is not first
+    assert json.loads(result[0].text) == {"positions": []}
+    assert upstream.count("/v1/positions") == 2
+
+
+async def test_pools_close_when_last_session_ends(upstream):
+    upstream.routes["/v1/liquidations/totals"] = TOTALS
+    async with Client(ranger_mcp) as client:
+        await client.call_tool("data_get_liquidation_totals", {})
+        pooled = upstream_clients.get("data")
+        status = json.loads((await client.call_tool("ranger_status", {}))[0].text)
+        assert status["upstream_pools"]["open_pools"] == ["data"]
+    assert pooled.is_closed
+    assert upstream_clients.status()["open_pools"] == []
+
+
+async def test_upstream_errors_become_tool_errors(upstream):
+    import httpx
+    upstream.routes["/v1/liquidations/totals"] = httpx.Response(
+        500, json={"message": "boom"})
+    async with Client(ranger_mcp) as client:
+        with pytest.raises(Exception, match=r"Ranger Data API Error \(500\): boom"):
+            await client.call_tool("data_get_liquidation_totals", {})
@@ -0,0 +1,90 @@
+import json
+import time
+
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.hub import ranger_mcp
+from ranger_mcp.models import QuoteParams, QuoteResponse
+from ranger_mcp.venue_split import VenueSplitModel, venue_split_model
+
+pytestmark = pytest.mark.anyio
+
+PARAMS = QuoteParams(
+    fee_payer="payer", symbol="SOL", side="Long", size=1.0, collateral=50.0,
+    size_denomination="SOL", adjustment_type="Increase")
+
+
+def quote(venue_name, size, unit_price, liquidity=1000.0):
+    return QuoteResponse(
+        venues=[{
+            "venue_name": venue_name, "collateral": 10.0, "size": size,
+            "quote": {"base": unit_price, "total": unit_price, "fee_breakdown": {}},
+            "order_available_liquidity": liquidity, "venue_available_liquidity": 10 * liquidity,
+        }],
+        total_collateral=10.0, total_size=size, average_price=unit_price)
+
+
+def linear_model(jupiter_liquidity=1000.0):
+    model = VenueSplitModel()
+    # Jupiter: 100 + 1.0 * s, Drift: 100.5 + 0.2 * s
+    for size in (1.0, 5.0, 20.0):
+        model.observe(PARAMS, quote("Jupiter", size, 100 + size, jupiter_liquidity))
+        model.observe(PARAMS, quote("Drift", size, 100.5 + 0.2 * size))
+    return model
+
+
+def test_split_equalises_marginal_costs():
+    estimate = linear_model().estimate("SOL", "Long", [10.0])[0]
+    allocations = {a.venue_name: a.size for a in estimate.allocations}
+    # d/ds s*(100+s) = 100+2a equals d/ds s*(100.5+0.2s) = 100.5+0.4(10-a) at a = 1.875
+    assert allocations["Jupiter"] == pytest.approx(1.875)
+    assert allocations["Drift"] == pytest.approx(8.125)
+    assert estimate.filled_size == pytest.approx(10.0)
+    assert estimate.samples == 6
+
+
+def test_split_respects_liquidity():
+    model = linear_model(jupiter_liquidity=0.5)
+    estimate, too_large = model.estimate("SOL", "Long", [2.0, 5000.0])
+    allocations = {a.venue_name: a.size for a in estimate.allocations}
+    assert allocations["Jupiter"] <= 0.5
+    assert estimate.filled_size == pytest.approx(2.0)
+    assert too_large.filled_size == pytest.approx(1000.5)  # both venues filled to their caps
+
+
+def test_no_estimate_without_recent_quotes():
+    model = linear_model()
+    assert model.estimate("SOL", "Short", [1.0]) is None
+    model.clock = lambda: time.monotonic() + 3600
+    assert model.estimate("SOL", "Long", [1.0]) is None
+
+
+def test_short_split_maximises_proceeds():
+    model = VenueSplitModel()
+    short = PARAMS.model_copy(update={"side": "Short"})
+    # Selling pushes the price down: Jupiter 100 - 1.0 * s, Drift 99.5 - 0.2 * s
+    for size in (1.0, 5.0, 20.0):
+        model.observe(short, quote("Jupiter", size, 100 - size))
+        model.observe(short, quote("Drift", size, 99.5 - 0.2 * size))
+    estimate = model.estimate("SOL", "Short", [10.0])[0]
+    allocations = {a.venue_name: a.size for a in estimate.allocations}
+    assert allocations["Jupiter"] == pytest.approx(1.875)
+    assert allocations["Drift"] == pytest.approx(8.125)
+
+
+async def test_quotes_feed_the_estimate_tool(upstream):
+    venue_split_model.clear()
+    upstream.routes["/v1/order_metadata"] = quote("Drift", 1.0, 101.0).model_dump()
+    async with Client(ranger_mcp) as client:
+        with pytest.raises(Exception, match="No recent quotes"):
+            await client.call_tool("sor_estimate_venue_split",
+                                   {"symbol": "SOL", "side": "Long", "sizes": [1.0]})
+        await client.call_tool("sor_get_trade_quote", {"params": PARAMS.model_dump()})
+        result = await client.call_tool("sor_estimate_venue_split",
+                                         {"symbol": "SOL", "side": "Long", "sizes": [0.5, 2.0]})
+    estimates = json.loads(result[0].text)
+    assert [e["size"] for e in estimates] == [0.5, 2.0]
+    assert estimates[0]["allocations"][0]["venue_name"] == "Drift"
+    assert estimates[0]["estimated_average_price"] == pytest.approx(101.0)
+    venue_split_model.clear()
@@ -0,0 +1,106 @@
+import asyncio
+import json
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+from fastmcp import Client
+
+from ranger_mcp.workers import RESTART_DELAY_MAX, RESTART_DELAY_MIN, RESTART_RESET_SECONDS, restart_delay
+
+pytestmark = [
+    pytest.mark.anyio,
+    pytest.mark.skipif(not hasattr(socket, "SO_REUSEPORT") or not Path("/proc/self/task").exists(),
+                       reason="needs SO_REUSEPORT and /proc"),
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def worker_pids(supervisor: int) -> set[int]:
+    """The supervisor's live worker processes (not multiprocessing's helpers)."""
+    pids = set()
+    for children in Path(f"/proc/{supervisor}/task").glob("*/children"):
+        for pid in map(int, children.read_text().split()):
+            try:
+                cmdline = Path(f"/proc/{pid}/cmdline").read_bytes()
+            except FileNotFoundError:
+                continue
+            if b"spawn_main" in cmdline and b"resource_tracker" not in cmdline:
+                pids.add(pid)
+    return pids
+
+
+async def serving_workers(port: int, timeout: float = 30.0) -> set[str]:
+    """Opens SSE streams on fresh connections until both workers have answered one."""
+    seen, deadline = set(), time.monotonic() + timeout
+    while seen != {"w0", "w1"} and time.monotonic() < deadline:
+        try:
+            async with httpx.AsyncClient() as client, client.stream("GET", f"http://127.0.0.1:{port}/sse") as stream:
+                async for line in stream.aiter_lines():
+                    if line.startswith("data:"):
+                        seen.add(re.search(r"/messages/(w\d+)/", line).group(1))
+                        break
+        except httpx.TransportError:
+            await asyncio.sleep(0.2)  # Not listening yet
+    return seen
+
+
+async def until(condition, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while not (result := condition()) and time.monotonic() < deadline:
+        await asyncio.sleep(0.1)
+    return result
+
+
+@pytest.fixture
+def hub(tmp_path):
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "ranger_mcp", "--workers", "2"],
+        env={**os.environ, "RANGER_STORE_DIR": str(tmp_path), "FASTMCP_SERVER_PORT": str(port),
+             "FASTMCP_SERVER_LOG_LEVEL": "WARNING"})
+    yield process, port
+    process.send_signal(signal.SIGTERM)
+    try:
+        process.wait(timeout=10)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+
+async def test_workers_share_the_port_and_are_respawned(hub):
+    process, port = hub
+    assert await serving_workers(port) == {"w0", "w1"}
+    # Sessions stay usable whichever worker their POSTs land on
+    for _ in range(4):
+        async with Client(f"http://127.0.0.1:{port}/sse") as client:
+            status = json.loads((await client.call_tool("ranger_status", {}))[0].text)
+        assert "cache" in status
+
+    pids = await until(lambda: len(worker_pids(process.pid)) == 2 and worker_pids(process.pid))
+    killed = min(pids)
+    os.kill(killed, signal.SIGKILL)
+    respawned = await until(lambda: len(worker_pids(process.pid) - pids) == 1 and worker_pids(process.pid))
+    assert respawned and killed not in respawned and len(respawned) == 2
+    assert await serving_workers(port) == {"w0", "w1"}
+
+
+def test_restarts_back_off_while_a_worker_keeps_exiting():
+    delays = [0.0]
+    for _ in range(10):
+        delays.append(restart_delay(delays[-1], uptime=1.0))
+    assert delays[1:4] == [RESTART_DELAY_MIN, 2 * RESTART_DELAY_MIN, 4 * RESTART_DELAY_MIN]
+    assert delays[-1] == RESTART_DELAY_MAX
+    assert restart_delay(RESTART_DELAY_MAX, uptime=RESTART_RESET_SECONDS) == RESTART_DELAY_MIN